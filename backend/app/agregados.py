@@ -0,0 +1,129 @@
+"""
+Agregados de vendas por dia e hora (tabela vendas_agregadas)
+
+Os relatórios e gráficos do desktop precisam de contagens por status e do
+faturamento de um período. Em vez de percorrer todo o histórico de comandas
+e pedidos a cada consulta, cada linha de `vendas_agregadas` guarda, para um
+dia, uma hora, uma origem (comanda ou online) e um status, quantas comandas
+ou pedidos estão nesse status e a soma dos seus totais.
+
+A tabela é mantida na mesma transação que altera as comandas e os pedidos:
+depois de cada flush, a criação, a mudança de status (finalizar, cancelar,
+novo status do pedido...) ou de total vira um delta, que sai do balde do
+status antigo e entra no do novo. O balde é a data e hora de abertura
+(data_abertura / data_pedido), a mesma coluna usada pelos filtros de data das
+listagens.
+
+`recalcular_agregados` reconstrói a tabela a partir do histórico com um
+INSERT ... SELECT ... GROUP BY por origem; é usado pela migração e serve para
+corrigir escritas feitas por fora do ORM.
+"""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, event, extract, func, insert, inspect, literal, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Origem registrada nos agregados e coluna de data usada como balde
+ORIGENS = {
+    models.Comanda: ("comanda", models.Comanda.data_abertura),
+    models.PedidoOnline: ("online", models.PedidoOnline.data_pedido),
+}
+
+STATUS_DESCONHECIDO = "desconhecido"
+
+# Deltas de um flush: (data, hora, origem, status) -> [quantidade, faturamento]
+Deltas = Dict[Tuple, List]
+
+def recalcular_agregados(conn: Connection):
+    """Apaga e reconstrói vendas_agregadas a partir de comandas e pedidos online"""
+    tabela = models.VendaAgregada.__table__
+    conn.execute(delete(tabela))
+    for modelo, (origem, coluna) in ORIGENS.items():
+        dia = func.date(coluna)
+        hora = extract("hour", coluna)
+        status = func.coalesce(modelo.status, STATUS_DESCONHECIDO)
+        conn.execute(
+            insert(tabela).from_select(
+                ["data", "hora", "origem", "status", "quantidade", "faturamento"],
+                select(
+                    dia, hora, literal(origem), status,
+                    func.count(modelo.id), func.coalesce(func.sum(modelo.total), 0.0)
+                )
+                .where(coluna.isnot(None))
+                .group_by(dia, hora, status)
+            )
+        )
+
+def _acumular(deltas: Deltas, obj, status, total, sinal: int):
+    origem, coluna = ORIGENS[type(obj)]
+    momento = getattr(obj, coluna.key)
+    if momento is None:
+        return
+    delta = deltas.setdefault((momento.date(), momento.hour, origem, status or STATUS_DESCONHECIDO), [0, 0.0])
+    delta[0] += sinal
+    delta[1] += sinal * (total or 0.0)
+
+def _valor_anterior(obj, atributo: str):
+    historico = inspect(obj).attrs[atributo].history
+    return historico.deleted[0] if historico.deleted else getattr(obj, atributo)
+
+def _aplicar(conn: Connection, deltas: Deltas):
+    for (data, hora, origem, status), (quantidade, faturamento) in deltas.items():
+        if quantidade == 0 and abs(faturamento) < 1e-9:
+            continue
+        filtro = (
+            models.VendaAgregada.data == data,
+            models.VendaAgregada.hora == hora,
+            models.VendaAgregada.origem == origem,
+            models.VendaAgregada.status == status,
+        )
+        # Mesmo padrão do contador de versão: UPDATE e, se a linha não existir, INSERT
+        resultado = conn.execute(
+            update(models.VendaAgregada).where(*filtro).values(
+                quantidade=models.VendaAgregada.quantidade + quantidade,
+                faturamento=models.VendaAgregada.faturamento + faturamento
+            )
+        )
+        if resultado.rowcount == 0:
+            conn.execute(insert(models.VendaAgregada).values(
+                data=data, hora=hora, origem=origem, status=status,
+                quantidade=quantidade, faturamento=faturamento
+            ))
+
+@event.listens_for(Session, "after_flush")
+def _atualizar_agregados(session, flush_context):
+    deltas: Deltas = {}
+    for obj in session.new:
+        if type(obj) in ORIGENS:
+            _acumular(deltas, obj, obj.status, obj.total, +1)
+    for obj in session.dirty:
+        if type(obj) not in ORIGENS:
+            continue
+        estado = inspect(obj).attrs
+        if not (estado.status.history.has_changes() or estado.total.history.has_changes()):
+            continue
+        _acumular(deltas, obj, _valor_anterior(obj, "status"), _valor_anterior(obj, "total"), -1)
+        _acumular(deltas, obj, obj.status, obj.total, +1)
+    for obj in session.deleted:
+        if type(obj) in ORIGENS:
+            _acumular(deltas, obj, obj.status, obj.total, -1)
+    if deltas:
+        _aplicar(session.connection(), deltas)
+        # Os mesmos deltas vão para o contador em memória depois do commit (contadores.py)
+        pendentes = session.info.setdefault("agregados_pendentes", {})
+        for chave, (quantidade, faturamento) in deltas.items():
+            acumulado = pendentes.setdefault(chave, [0, 0.0])
+            acumulado[0] += quantidade
+            acumulado[1] += faturamento
+
+def _carregar_valor_anterior(target, value, oldvalue, initiator):
+    pass
+
+# active_history: ao atribuir status/total a um objeto expirado, o valor antigo é
+# carregado antes, para que o delta saiba de qual balde tirar a comanda/pedido
+for _modelo in ORIGENS:
+    event.listen(_modelo.status, "set", _carregar_valor_anterior, active_history=True)
+    event.listen(_modelo.total, "set", _carregar_valor_anterior, active_history=True)
@@ -0,0 +1,119 @@
+"""
+Cache do cardápio público (GET /menu/{mesa_id})
+
+Cada cliente que lê o QR code da mesa pede o cardápio, que só muda quando um
+produto muda. Por isso a resposta é montada uma única vez e guardada em
+memória já serializada, junto com o ETag (hash do conteúdo):
+
+- os produtos e as categorias vêm do cache do catálogo (catalogo.py) e as
+  mesas são carregadas todas juntas na primeira requisição depois de uma
+  invalidação;
+- o JSON de cada mesa é gerado na primeira vez em que ela é pedida;
+- qualquer alteração do catálogo, ou um commit que cria, remove ou renumera
+  mesas, descarta o cache (listeners da sessão, como em eventos.py).
+  Mudanças de status das mesas não afetam o cardápio e não invalidam nada, e
+  um rollback também não.
+
+Uma geração é incrementada a cada invalidação, para que um carregamento que
+começou antes do commit não grave no cache um cardápio já desatualizado.
+"""
+import hashlib
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .catalogo import cache_catalogo
+
+class CacheCardapio:
+    """Cardápio serializado por mesa, com ETag forte"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self._catalogo: Optional[Dict] = None
+        self._mesas: Dict[int, int] = {}  # id -> número
+        self._respostas: Dict[int, Tuple[bytes, str]] = {}  # mesa_id -> (json, etag)
+        self.acertos = 0
+        self.falhas = 0
+
+    def invalidar(self):
+        with self._lock:
+            self._geracao += 1
+            self._catalogo = None
+            self._mesas = {}
+            self._respostas = {}
+
+    def obter(self, db: Session, mesa_id: int) -> Optional[Tuple[bytes, str]]:
+        """(JSON, ETag) do cardápio da mesa, ou None se a mesa não existe"""
+        with self._lock:
+            resposta = self._respostas.get(mesa_id)
+            if resposta is not None:
+                self.acertos += 1
+                return resposta
+            self.falhas += 1
+            geracao, catalogo, mesas = self._geracao, self._catalogo, self._mesas
+
+        if catalogo is None:
+            catalogo, mesas = self._carregar(db)
+
+        if mesa_id not in mesas:
+            return None
+        conteudo = json.dumps(
+            {"mesa": {"id": mesa_id, "numero": mesas[mesa_id]}, **catalogo},
+            ensure_ascii=False
+        ).encode("utf-8")
+        resposta = (conteudo, f'"{hashlib.sha256(conteudo).hexdigest()}"')
+
+        with self._lock:
+            # Só grava se nenhum commit invalidou o cache durante a montagem
+            if geracao == self._geracao:
+                self._catalogo, self._mesas = catalogo, mesas
+                self._respostas[mesa_id] = resposta
+        return resposta
+
+    @staticmethod
+    def _carregar(db: Session):
+        mesas = dict(db.execute(select(models.Mesa.id, models.Mesa.numero)).all())
+        catalogo = {
+            "categorias": cache_catalogo.categorias(db),
+            "produtos": [
+                {
+                    "id": p.id,
+                    "nome": p.nome,
+                    "preco": p.preco,
+                    "categoria": p.categoria,
+                    "descricao": p.descricao
+                }
+                for p in cache_catalogo.listar(db)
+            ]
+        }
+        return catalogo, mesas
+
+cache_cardapio = CacheCardapio()
+
+# Produtos: o cardápio é descartado sempre que o catálogo muda
+cache_catalogo.ao_alterar(cache_cardapio.invalidar)
+
+@event.listens_for(Session, "after_flush")
+def _anotar_alteracoes(session, flush_context):
+    mesas_alteradas = any(
+        isinstance(obj, models.Mesa) and inspect(obj).attrs.numero.history.has_changes()
+        for obj in session.dirty
+    )
+    if (mesas_alteradas
+            or any(isinstance(obj, models.Mesa) for obj in session.new)
+            or any(isinstance(obj, models.Mesa) for obj in session.deleted)):
+        session.info["cardapio_alterado"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_cardapio(session):
+    if session.info.pop("cardapio_alterado", False):
+        cache_cardapio.invalidar()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_alteracoes(session, previous_transaction):
+    session.info.pop("cardapio_alterado", None)
@@ -0,0 +1,149 @@
+"""
+Cache do catálogo de produtos
+
+Os produtos mudam raramente e são lidos o tempo todo: listagens, cardápio
+público, inclusão de itens nas comandas e criação de pedidos online. O
+catálogo inteiro é carregado uma única vez, em uma consulta, e mantido em
+memória como um mapa id -> produto (schemas.Produto) mais um índice por
+categoria.
+
+As alterações são aplicadas no cache por escrita direta (write-through): depois
+de cada flush os produtos criados, alterados ou removidos são anotados na
+sessão e, somente após o commit, copiados para o cache (como em eventos.py).
+Assim um POST /produtos/ já aparece na próxima leitura sem recarregar o
+catálogo, e um rollback descarta as anotações.
+
+Quem grava no banco por fora da API (outro processo ou SQL direto) deve
+chamar `cache_catalogo.invalidar()`, ou reiniciar o backend.
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+
+class CacheCatalogo:
+    """Produtos por id e por categoria, com contadores de acertos e falhas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self._produtos: Optional[Dict[int, schemas.Produto]] = None
+        self._por_categoria: Dict[str, List[int]] = {}
+        self._ao_alterar: List[Callable[[], None]] = []
+        self.acertos = 0
+        self.falhas = 0
+
+    def ao_alterar(self, callback: Callable[[], None]):
+        """Registra uma função chamada depois de cada alteração do catálogo"""
+        self._ao_alterar.append(callback)
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "produtos": len(self._produtos) if self._produtos is not None else 0,
+            }
+
+    def invalidar(self):
+        with self._lock:
+            self._geracao += 1
+            self._produtos = None
+            self._por_categoria = {}
+        self._notificar()
+
+    def aplicar(self, alterados: Iterable[schemas.Produto], removidos: Iterable[int]):
+        """Write-through: copia para o cache os produtos gravados por um commit"""
+        with self._lock:
+            self._geracao += 1
+            if self._produtos is not None:
+                # Cópia nova em vez de alterar o dicionário que outras threads podem estar lendo
+                produtos = dict(self._produtos)
+                for produto_id in removidos:
+                    produtos.pop(produto_id, None)
+                for produto in alterados:
+                    produtos[produto.id] = produto
+                self._produtos, self._por_categoria = produtos, self._indexar(produtos)
+        self._notificar()
+
+    def produtos(self, db: Session, ids: Iterable[int]) -> Dict[int, schemas.Produto]:
+        """Produtos encontrados entre `ids` (disponíveis ou não)"""
+        produtos = self._obter(db)[0]
+        return {produto_id: produtos[produto_id] for produto_id in ids if produto_id in produtos}
+
+    def listar(self, db: Session, categoria: Optional[str] = None) -> List[schemas.Produto]:
+        """Produtos disponíveis, em ordem de id, opcionalmente de uma categoria"""
+        produtos, por_categoria = self._obter(db)
+        if categoria is None:
+            ids = produtos.keys()
+        else:
+            ids = por_categoria.get(categoria, [])
+        return [produtos[produto_id] for produto_id in ids if produtos[produto_id].disponivel]
+
+    def categorias(self, db: Session) -> List[str]:
+        """Todas as categorias, inclusive as que só têm produtos indisponíveis"""
+        return list(self._obter(db)[1])
+
+    def _obter(self, db: Session):
+        with self._lock:
+            if self._produtos is not None:
+                self.acertos += 1
+                return self._produtos, self._por_categoria
+            self.falhas += 1
+            geracao = self._geracao
+
+        produtos = {
+            produto.id: schemas.Produto.model_validate(produto)
+            for produto in db.query(models.Produto).order_by(models.Produto.id)
+        }
+        por_categoria = self._indexar(produtos)
+
+        with self._lock:
+            # Só guarda se nenhum commit alterou o catálogo durante a carga
+            if geracao == self._geracao and self._produtos is None:
+                self._produtos, self._por_categoria = produtos, por_categoria
+        return produtos, por_categoria
+
+    @staticmethod
+    def _indexar(produtos: Dict[int, schemas.Produto]) -> Dict[str, List[int]]:
+        por_categoria: Dict[str, List[int]] = {}
+        for produto_id in sorted(produtos):
+            por_categoria.setdefault(produtos[produto_id].categoria, []).append(produto_id)
+        return por_categoria
+
+    def _notificar(self):
+        for callback in self._ao_alterar:
+            callback()
+
+cache_catalogo = CacheCatalogo()
+
+@event.listens_for(Session, "after_flush")
+def _anotar_produtos(session, flush_context):
+    gravados = [obj for obj in list(session.new) + list(session.dirty) if isinstance(obj, models.Produto)]
+    apagados = [obj for obj in session.deleted if isinstance(obj, models.Produto)]
+    if not (gravados or apagados):
+        return
+
+    alterados = session.info.setdefault("catalogo_alterados", {})
+    removidos = session.info.setdefault("catalogo_removidos", set())
+    for obj in gravados:
+        alterados[obj.id] = schemas.Produto.model_validate(obj)
+        removidos.discard(obj.id)
+    for obj in apagados:
+        alterados.pop(obj.id, None)
+        removidos.add(obj.id)
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_produtos(session):
+    alterados = session.info.pop("catalogo_alterados", {})
+    removidos = session.info.pop("catalogo_removidos", set())
+    if alterados or removidos:
+        cache_catalogo.aplicar(alterados.values(), removidos)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_produtos(session, previous_transaction):
+    session.info.pop("catalogo_alterados", None)
+    session.info.pop("catalogo_removidos", None)
@@ -2,6 +2,7 @@
 Configuração e serviço para integração com WhatsApp
 """
 
+import os
 import requests
 import json
 from datetime import datetime
@@ -126,5 +127,26 @@ Obrigado por escolher a Padaria Delícias! 🥖
             print(f"[ERRO] Falha ao enviar confirmação: {e}")
             return False
 
+class WhatsAppServiceLocal:
+    """
+    Provedor local, para testes e desenvolvimento: não acessa a rede e guarda
+    os pedidos "enviados" em memória. `falhas` simula envios que falham antes
+    de o provedor voltar a responder.
+    """
+    def __init__(self, falhas: int = 0):
+        self.enviados: List[Dict] = []
+        self.falhas_restantes = falhas
+    
+    def enviar_pedido_whatsapp(self, pedido: Dict) -> bool:
+        if self.falhas_restantes > 0:
+            self.falhas_restantes -= 1
+            return False
+        self.enviados.append(pedido)
+        return True
+
 # Instância global do serviço
-whatsapp_service = WhatsAppService() 
\ No newline at end of file
+# PADARIA_WHATSAPP_PROVEDOR=local usa o provedor local (sem acesso à API)
+if os.getenv("PADARIA_WHATSAPP_PROVEDOR", "api") == "local":
+    whatsapp_service = WhatsAppServiceLocal()
+else:
+    whatsapp_service = WhatsAppService() 
\ No newline at end of file
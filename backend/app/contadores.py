@@ -0,0 +1,105 @@
+"""
+Contadores de comandas por status (GET /comandas/contadores)
+
+Os cabeçalhos do painel do garçom e da janela principal mostram quantas
+comandas estão abertas, para impressão, aguardando pagamento e fechadas, e o
+faturamento. Em vez de baixar a lista de comandas e filtrá-la a cada
+atualização, a quantidade e o faturamento por dia de abertura e status ficam
+em memória.
+
+O contador é carregado uma única vez, com uma consulta GROUP BY em
+vendas_agregadas, e depois acompanha as transições de status: os deltas que
+agregados.py calcula a cada flush são aplicados aqui somente após o commit, e
+descartados no rollback (como em catalogo.py).
+
+Quem grava no banco por fora da API deve chamar
+`contador_comandas.invalidar()`, ou reiniciar o backend.
+"""
+import threading
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .agregados import Deltas
+
+# dia -> status -> (quantidade, faturamento)
+PorDia = Dict[date, Dict[str, Tuple[int, float]]]
+
+class ContadorComandas:
+    """Quantidade e faturamento de comandas por dia de abertura e status"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self._por_dia: Optional[PorDia] = None
+        self.acertos = 0
+        self.falhas = 0
+
+    def invalidar(self):
+        with self._lock:
+            self._geracao += 1
+            self._por_dia = None
+
+    def aplicar(self, deltas: Deltas):
+        """Soma ao contador os deltas de comandas gravados por um commit"""
+        with self._lock:
+            self._geracao += 1
+            if self._por_dia is None:
+                return
+            for (dia, _hora, origem, status), (quantidade, faturamento) in deltas.items():
+                if origem != "comanda":
+                    continue
+                por_status = self._por_dia.setdefault(dia, {})
+                atual = por_status.get(status, (0, 0.0))
+                por_status[status] = (atual[0] + quantidade, atual[1] + faturamento)
+
+    def totais(self, db: Session, data_inicio: Optional[date] = None,
+               data_fim: Optional[date] = None) -> Dict[str, Tuple[int, float]]:
+        """(quantidade, faturamento) por status das comandas abertas no período"""
+        with self._lock:
+            if self._por_dia is not None:
+                self.acertos += 1
+                return self._somar(self._por_dia, data_inicio, data_fim)
+            self.falhas += 1
+            geracao = self._geracao
+
+        tabela = models.VendaAgregada
+        por_dia: PorDia = {}
+        for linha in db.execute(
+            select(tabela.data, tabela.status, func.sum(tabela.quantidade), func.sum(tabela.faturamento))
+            .where(tabela.origem == "comanda")
+            .group_by(tabela.data, tabela.status)
+        ):
+            por_dia.setdefault(linha[0], {})[linha[1]] = (linha[2] or 0, linha[3] or 0.0)
+
+        with self._lock:
+            # Só guarda se nenhum commit alterou as comandas durante a carga
+            if geracao == self._geracao and self._por_dia is None:
+                self._por_dia = por_dia
+            return self._somar(por_dia, data_inicio, data_fim)
+
+    @staticmethod
+    def _somar(por_dia: PorDia, data_inicio: Optional[date], data_fim: Optional[date]):
+        totais: Dict[str, Tuple[int, float]] = {}
+        for dia, por_status in por_dia.items():
+            if (data_inicio and dia < data_inicio) or (data_fim and dia > data_fim):
+                continue
+            for status, (quantidade, faturamento) in por_status.items():
+                atual = totais.get(status, (0, 0.0))
+                totais[status] = (atual[0] + quantidade, atual[1] + faturamento)
+        return {status: total for status, total in totais.items() if total[0]}
+
+contador_comandas = ContadorComandas()
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_deltas(session):
+    deltas = session.info.pop("agregados_pendentes", None)
+    if deltas:
+        contador_comandas.aplicar(deltas)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_deltas(session, previous_transaction):
+    session.info.pop("agregados_pendentes", None)
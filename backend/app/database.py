@@ -1,16 +1,76 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
-# Criar diretório database se não existir
-os.makedirs("backend/database", exist_ok=True)
+from .configuracoes import get_database_url, DATABASE_POOL_SIZE, DATABASE_MAX_OVERFLOW
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///backend/database/padaria.db"
+SQLALCHEMY_DATABASE_URL = get_database_url()
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# PRAGMAs aplicados em cada nova conexão SQLite.
+# WAL permite leituras simultâneas a uma escrita e, com synchronous=NORMAL,
+# faz um fsync por checkpoint em vez de um por commit. busy_timeout faz a
+# conexão esperar a trava de escrita em vez de falhar com "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,        # ms
+    "mmap_size": 268435456,      # 256 MB
+    "cache_size": -65536,        # valor negativo = KiB (64 MB)
+    "temp_store": "MEMORY",
+}
+
+# Configuração do pool de conexões. O FastAPI executa endpoints síncronos em
+# um threadpool de 40 threads, então o pool deve comportar rajadas sem
+# segurar conexões ociosas para sempre.
+POOL_CONFIG = {
+    "pool_size": DATABASE_POOL_SIZE,
+    "max_overflow": DATABASE_MAX_OVERFLOW,
+    "pool_timeout": 30,
+    "pool_recycle": 3600,
+    "pool_pre_ping": True,
+}
+
+def eh_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _criar_engine_sqlite(url: str, pragmas: dict, pool: dict, **opcoes):
+    """Tudo o que é específico do SQLite: diretório do arquivo, threads e PRAGMAs"""
+    caminho = make_url(url).database
+    if caminho and caminho != ":memory:":
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+
+    connect_args = {"check_same_thread": False}
+    if "busy_timeout" in pragmas:
+        connect_args["timeout"] = pragmas["busy_timeout"] / 1000
+
+    engine = create_engine(url, connect_args=connect_args, **pool, **opcoes)
+
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def _aplicar_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for nome, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nome}={valor}")
+            cursor.close()
+
+    return engine
+
+def criar_engine(url: str = SQLALCHEMY_DATABASE_URL, pragmas: dict = None, pool: dict = None, **opcoes):
+    """Cria o engine do SQLAlchemy para a URL configurada.
+
+    SQLite recebe os PRAGMAs de `pragmas` (padrão SQLITE_PRAGMAS); os demais
+    bancos, como PostgreSQL, usam apenas o pool. `pool` substitui POOL_CONFIG
+    (passe {} para os padrões do SQLAlchemy) e o restante vai para `create_engine`.
+    """
+    pool = POOL_CONFIG if pool is None else pool
+    if eh_sqlite(url):
+        pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+        return _criar_engine_sqlite(url, pragmas, pool, **opcoes)
+    return create_engine(url, **pool, **opcoes)
+
+engine = criar_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -20,4 +80,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -0,0 +1,56 @@
+"""
+Horários livres das mesas para reservas
+
+Uma reserva ocupa a mesa do horário marcado até RESERVA_DURACAO_MINUTOS
+depois. Os horários oferecidos vêm dos turnos (RESERVA_TURNOS), a cada
+RESERVA_INTERVALO_MINUTOS, e um horário está livre se o intervalo que ele
+ocuparia não se sobrepõe ao de nenhuma reserva ativa da mesa. É a mesma
+verificação usada ao criar uma reserva.
+
+As funções daqui não consultam o banco: GET /reservas/disponibilidade busca
+as reservas de todas as mesas em uma única consulta e as agrupa por mesa.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from .configuracoes import RESERVA_INTERVALO_MINUTOS, RESERVA_TURNOS
+
+Intervalo = Tuple[datetime, datetime]
+
+def ler_horario(horario: str) -> Optional[time]:
+    """Converte "HH:MM" em time (None se o formato for inválido)"""
+    try:
+        return datetime.strptime(horario, "%H:%M").time()
+    except (TypeError, ValueError):
+        return None
+
+def intervalo_reserva(data_reserva: datetime, horario_reserva: str, duracao: timedelta) -> Optional[Intervalo]:
+    """Início e fim da ocupação da mesa (data da reserva + horário marcado)"""
+    horario = ler_horario(horario_reserva)
+    if horario is None:
+        return None
+    inicio = datetime.combine(data_reserva.date(), horario)
+    return inicio, inicio + duracao
+
+def se_sobrepoem(a: Intervalo, b: Intervalo) -> bool:
+    """Intervalos semiabertos [inicio, fim): encostar no fim do outro não é conflito"""
+    return a[0] < b[1] and b[0] < a[1]
+
+def horarios_do_dia(dia: date, intervalo: int = RESERVA_INTERVALO_MINUTOS, turnos=RESERVA_TURNOS) -> List[datetime]:
+    """Horários oferecidos no dia, de `intervalo` em `intervalo` minutos dentro de cada turno"""
+    horarios = []
+    passo = timedelta(minutes=intervalo)
+    for primeiro, ultimo in turnos:
+        atual = datetime.combine(dia, ler_horario(primeiro))
+        fim = datetime.combine(dia, ler_horario(ultimo))
+        while atual <= fim:
+            horarios.append(atual)
+            atual += passo
+    return horarios
+
+def horarios_livres(horarios: Iterable[datetime], ocupados: List[Intervalo], duracao: timedelta) -> List[datetime]:
+    """Horários cujo intervalo [horário, horário + duracao) não se sobrepõe a nenhum ocupado"""
+    return [
+        horario for horario in horarios
+        if not any(se_sobrepoem((horario, horario + duracao), ocupado) for ocupado in ocupados)
+    ]
@@ -0,0 +1,117 @@
+"""
+Barramento de eventos em processo, publicado via Server-Sent Events (GET /eventos)
+
+Os eventos são gerados a partir das próprias sessões do SQLAlchemy: depois de
+cada flush as alterações em comandas, itens, pedidos online, reservas, mesas e
+produtos são anotadas na sessão e, somente após o commit, publicadas para
+todos os assinantes. Um rollback descarta as anotações.
+
+Os eventos são avisos ("algo mudou"), não o estado completo: quem recebe
+busca os dados atualizados (por exemplo via GET /sync).
+"""
+import asyncio
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Nome do evento publicado para cada modelo
+TIPOS_EVENTO = {
+    models.Comanda: "comanda",
+    models.ItemComanda: "item_comanda",
+    models.PedidoOnline: "pedido_online",
+    models.Reserva: "reserva",
+    models.Mesa: "mesa",
+    models.Produto: "produto",
+}
+
+# Eventos acumulados por assinante lento antes de começar a descartar
+TAMANHO_MAXIMO_FILA = 500
+
+class BarramentoEventos:
+    """Distribui eventos para filas asyncio, podendo publicar de qualquer thread"""
+
+    def __init__(self):
+        self._assinantes: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    def assinar(self) -> asyncio.Queue:
+        """Cria uma fila para o assinante atual (deve ser chamado dentro do event loop)"""
+        fila = asyncio.Queue(maxsize=TAMANHO_MAXIMO_FILA)
+        with self._lock:
+            self._assinantes.append((asyncio.get_running_loop(), fila))
+        return fila
+
+    def cancelar_assinatura(self, fila: asyncio.Queue):
+        with self._lock:
+            self._assinantes = [(loop, f) for loop, f in self._assinantes if f is not fila]
+
+    def quantidade_assinantes(self) -> int:
+        with self._lock:
+            return len(self._assinantes)
+
+    def publicar(self, evento: Dict):
+        with self._lock:
+            assinantes = list(self._assinantes)
+        for loop, fila in assinantes:
+            try:
+                loop.call_soon_threadsafe(self._entregar, fila, evento)
+            except RuntimeError:
+                # Event loop já encerrado
+                self.cancelar_assinatura(fila)
+
+    @staticmethod
+    def _entregar(fila: asyncio.Queue, evento: Dict):
+        if fila.full():
+            # Assinante lento: descarta o evento mais antigo, o cliente ressincroniza de qualquer forma
+            fila.get_nowait()
+        fila.put_nowait(evento)
+
+barramento = BarramentoEventos()
+
+def _descrever(obj, acao: str) -> Dict:
+    evento = {"tipo": TIPOS_EVENTO[type(obj)], "acao": acao, "id": obj.id}
+    if isinstance(obj, models.ItemComanda):
+        evento["comanda_id"] = obj.comanda_id
+    if hasattr(type(obj), "versao"):
+        # Preenchida no commit, quando a versão é atribuída (versionamento.py)
+        evento["versao"] = None
+    return evento
+
+def completar_versao(session: Session, versao: int):
+    """Preenche a versão de sincronização dos eventos pendentes que ainda não a têm"""
+    for evento in session.info.get("eventos_pendentes", []):
+        if "versao" in evento and evento["versao"] is None:
+            evento["versao"] = versao
+
+def anotar_evento(session: Session, evento: Dict):
+    """Anota um evento para publicar após o commit (gravações feitas sem o ORM, como UPDATE em lote)"""
+    session.info.setdefault("eventos_pendentes", []).append(evento)
+
+@event.listens_for(Session, "after_flush")
+def _anotar_eventos(session, flush_context):
+    pendentes = session.info.setdefault("eventos_pendentes", [])
+    for colecao, acao in ((session.new, "criado"), (session.dirty, "alterado"), (session.deleted, "removido")):
+        for obj in colecao:
+            if type(obj) not in TIPOS_EVENTO:
+                continue
+            if acao == "alterado" and not session.is_modified(obj, include_collections=False):
+                continue
+            pendentes.append(_descrever(obj, acao))
+
+@event.listens_for(Session, "after_commit")
+def _publicar_eventos(session):
+    publicados = set()
+    for evento in session.info.pop("eventos_pendentes", []):
+        chave = (evento["tipo"], evento["id"], evento["acao"])
+        if chave in publicados:
+            continue
+        publicados.add(chave)
+        barramento.publicar(evento)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_eventos(session, previous_transaction):
+    session.info.pop("eventos_pendentes", None)
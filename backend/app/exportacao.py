@@ -0,0 +1,87 @@
+"""
+Exportação de relatórios em CSV e XLSX (GET /relatorios/export)
+
+O relatório é descrito como uma sequência de seções (título, cabeçalho e um
+iterador de linhas), e as linhas vêm direto do cursor do banco à medida que
+a resposta é enviada:
+
+- o CSV é gerado em blocos de LINHAS_POR_BLOCO linhas e enviado por uma
+  StreamingResponse, sem montar o arquivo em memória;
+- o XLSX (opcional, requer openpyxl) é um zip e só pode ser enviado depois de
+  pronto. As linhas são gravadas por um Workbook em modo write_only, que não
+  guarda as linhas em memória, em um arquivo temporário que depois é enviado
+  em blocos e apagado.
+"""
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime
+from typing import Iterable, Iterator, NamedTuple, Sequence
+
+try:
+    from openpyxl import Workbook
+    OPENPYXL_DISPONIVEL = True
+except ImportError:
+    OPENPYXL_DISPONIVEL = False
+
+LINHAS_POR_BLOCO = 500
+TAMANHO_BLOCO_ARQUIVO = 64 * 1024  # bytes
+
+TIPOS_CONTEUDO = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+class Secao(NamedTuple):
+    titulo: str
+    cabecalho: Sequence[str]
+    linhas: Iterable[Sequence]
+
+def gerar_csv(titulo: str, secoes: Iterable[Secao]) -> Iterator[str]:
+    """Todas as seções em um único CSV, separadas por uma linha em branco"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def esvaziar() -> str:
+        conteudo = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return conteudo
+
+    writer.writerow([titulo])
+    writer.writerow([])
+    for secao in secoes:
+        writer.writerow([secao.titulo])
+        writer.writerow(secao.cabecalho)
+        for numero, linha in enumerate(secao.linhas, 1):
+            writer.writerow(linha)
+            if numero % LINHAS_POR_BLOCO == 0:
+                yield esvaziar()
+        writer.writerow([])
+    yield esvaziar()
+
+def _celula(valor):
+    # O Excel não aceita datas com fuso horário
+    if isinstance(valor, datetime) and valor.tzinfo is not None:
+        return valor.replace(tzinfo=None)
+    return valor
+
+def gerar_xlsx(secoes: Iterable[Secao]) -> Iterator[bytes]:
+    """Uma planilha por seção"""
+    workbook = Workbook(write_only=True)
+    for secao in secoes:
+        planilha = workbook.create_sheet(secao.titulo.title()[:31])
+        planilha.append(list(secao.cabecalho))
+        for linha in secao.linhas:
+            planilha.append([_celula(valor) for valor in linha])
+
+    fd, caminho = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(caminho)
+        with open(caminho, "rb") as arquivo:
+            while bloco := arquivo.read(TAMANHO_BLOCO_ARQUIVO):
+                yield bloco
+    finally:
+        os.remove(caminho)
@@ -0,0 +1,157 @@
+"""
+Fila persistente (outbox) de mensagens do WhatsApp
+
+`criar_pedido_online` não chama mais o provedor do WhatsApp durante a
+requisição. A mensagem é gravada em `mensagens_whatsapp` na mesma transação
+do pedido, e uma thread em segundo plano faz o envio:
+
+- busca as mensagens vencidas em lotes de até TAMANHO_LOTE e grava o
+  resultado do lote inteiro em um único commit;
+- em caso de sucesso, marca a mensagem como enviada e o pedido com
+  `whatsapp_enviado`;
+- em caso de falha, agenda uma nova tentativa com espera exponencial
+  (ESPERA_INICIAL, 2x, 4x... até ESPERA_MAXIMA). Depois de MAXIMO_TENTATIVAS,
+  a mensagem fica com status "falhou".
+
+Como a fila fica no banco, mensagens pendentes sobrevivem a uma reinicialização
+do backend.
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+TAMANHO_LOTE = 20
+MAXIMO_TENTATIVAS = 8
+ESPERA_INICIAL = 30  # segundos
+ESPERA_MAXIMA = 3600  # segundos
+INTERVALO_VERIFICACAO = 10  # segundos entre verificações com a fila vazia
+
+def enfileirar_pedido(db: Session, pedido_id: int, pedido_data: Dict) -> models.MensagemWhatsApp:
+    """Adiciona a mensagem do pedido à fila; o commit fica a cargo de quem chama"""
+    mensagem = models.MensagemWhatsApp(
+        pedido_id=pedido_id,
+        conteudo=json.dumps(pedido_data, ensure_ascii=False),
+        status="pendente",
+        tentativas=0,
+        proxima_tentativa=datetime.now()
+    )
+    db.add(mensagem)
+    return mensagem
+
+def calcular_espera(tentativas: int) -> timedelta:
+    """Espera antes da próxima tentativa, dobrando a cada falha"""
+    return timedelta(seconds=min(ESPERA_INICIAL * 2 ** (tentativas - 1), ESPERA_MAXIMA))
+
+class FilaWhatsApp:
+    """Entrega as mensagens pendentes em uma thread em segundo plano"""
+
+    def __init__(self, session_factory=SessionLocal, provedor=None):
+        self.session_factory = session_factory
+        self._provedor = provedor
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+
+    @property
+    def provedor(self):
+        if self._provedor is None:
+            from .config_whatsapp import whatsapp_service
+            self._provedor = whatsapp_service
+        return self._provedor
+
+    def processar_lote(self, agora: datetime = None) -> int:
+        """Tenta enviar um lote de mensagens vencidas e retorna quantas foram processadas"""
+        agora = agora or datetime.now()
+        db = self.session_factory()
+        try:
+            mensagens = (
+                db.query(models.MensagemWhatsApp)
+                .filter(
+                    models.MensagemWhatsApp.status == "pendente",
+                    models.MensagemWhatsApp.proxima_tentativa <= agora
+                )
+                .order_by(models.MensagemWhatsApp.proxima_tentativa, models.MensagemWhatsApp.id)
+                .limit(TAMANHO_LOTE)
+                .all()
+            )
+            if not mensagens:
+                return 0
+
+            enviados = []
+            for mensagem in mensagens:
+                mensagem.tentativas += 1
+                try:
+                    sucesso = self.provedor.enviar_pedido_whatsapp(json.loads(mensagem.conteudo))
+                    erro = None if sucesso else "Provedor não confirmou o envio"
+                except Exception as e:
+                    sucesso, erro = False, str(e)
+
+                if sucesso:
+                    mensagem.status = "enviada"
+                    mensagem.data_envio = datetime.now()
+                    mensagem.ultimo_erro = None
+                    enviados.append(mensagem.pedido_id)
+                elif mensagem.tentativas >= MAXIMO_TENTATIVAS:
+                    mensagem.status = "falhou"
+                    mensagem.ultimo_erro = erro
+                else:
+                    mensagem.proxima_tentativa = agora + calcular_espera(mensagem.tentativas)
+                    mensagem.ultimo_erro = erro
+
+            if enviados:
+                # Pelo ORM (e não UPDATE direto) para versionar o pedido e avisar o desktop
+                for pedido in db.query(models.PedidoOnline).filter(models.PedidoOnline.id.in_(enviados)):
+                    pedido.whatsapp_enviado = True
+
+            db.commit()
+            return len(mensagens)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def processar_pendentes(self) -> int:
+        """Processa lotes até não haver mais mensagens vencidas"""
+        total = 0
+        while not self._parar.is_set():
+            processadas = self.processar_lote()
+            total += processadas
+            if processadas < TAMANHO_LOTE:
+                break
+        return total
+
+    def notificar(self):
+        """Acorda a thread para enviar uma mensagem recém-enfileirada"""
+        self._acordar.set()
+
+    def iniciar(self):
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="fila-whatsapp", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: float = 5):
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _executar(self):
+        while not self._parar.is_set():
+            self._acordar.clear()
+            try:
+                self.processar_pendentes()
+            except Exception as e:
+                print(f"[ERRO] Falha ao processar fila do WhatsApp: {e}")
+            self._acordar.wait(INTERVALO_VERIFICACAO)
+
+fila_whatsapp = FilaWhatsApp()
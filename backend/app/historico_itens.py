@@ -0,0 +1,305 @@
+"""
+Histórico de status dos itens de comanda e tempos de preparo
+
+Cada item passa por pendente -> preparando -> pronto. Cada vez que um item é
+criado ou muda de status, uma linha (item, produto, status, momento) é
+acrescentada a `eventos_itens_comanda`, na mesma transação da gravação; as
+linhas nunca são alteradas.
+
+Calcular percentis sobre meses de eventos exigiria ordenar centenas de
+milhares de intervalos a cada consulta. Por isso, quando um evento fecha um
+intervalo (espera: pendente -> preparando; preparo: preparando -> pronto),
+a duração também é contada em `tempos_itens_agregados`: um histograma por
+produto e outro por hora do início do intervalo, com faixas que crescem 10% a
+cada passo. Cada intervalo entra no histograma do dia e no do mês; o
+relatório usa os meses inteiros do período e os dias só nas pontas, soma as
+faixas e acha p50/p95 com somas acumuladas (funções de janela). Esses
+percentis são o limite superior da faixa: até 10% acima do valor exato, e
+nunca abaixo de 0,1 s. Quando o período tem poucos intervalos
+(LIMITE_PERCENTIL_EXATO), os percentis são calculados exatamente a partir
+dos próprios eventos, que nesse caso são poucos para ler.
+
+O UPDATE em lote de PUT /itens/status não passa pelo flush e chama
+`registrar_eventos` diretamente. `recalcular_tempos` reconstrói o histograma a
+partir dos eventos.
+"""
+import math
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Intervalos medidos: nome -> (status anterior, status novo)
+INTERVALOS = {
+    "espera": ("pendente", "preparando"),
+    "preparo": ("preparando", "pronto"),
+}
+_INTERVALO_POR_TRANSICAO = {transicao: nome for nome, transicao in INTERVALOS.items()}
+_STATUS_FINAIS = {para for _, para in INTERVALOS.values()}
+
+# Cada faixa do histograma vai até 10% além da anterior
+FATOR_FAIXA = 1.1
+
+# Até esta quantidade de intervalos no período, os percentis saem dos eventos (exatos)
+LIMITE_PERCENTIL_EXATO = 2000
+
+# (granularidade, data, dimensao, chave, intervalo, faixa) -> quantidade
+Deltas = Dict[Tuple, int]
+
+def faixa(segundos: float) -> int:
+    return int(math.log1p(max(segundos, 0.0)) / math.log(FATOR_FAIXA))
+
+def limite_faixa(numero: int) -> float:
+    """Maior duração (em segundos) contada na faixa"""
+    return round(math.expm1((numero + 1) * math.log(FATOR_FAIXA)), 1)
+
+def _acumular(deltas: Deltas, produto_id: int, intervalo: str, inicio: datetime, fim: datetime):
+    numero = faixa((fim - inicio).total_seconds())
+    dia = inicio.date()
+    for granularidade, data in (("dia", dia), ("mes", dia.replace(day=1))):
+        for dimensao, chave in (("produto", produto_id), ("hora", inicio.hour)):
+            chave_delta = (granularidade, data, dimensao, chave, intervalo, numero)
+            deltas[chave_delta] = deltas.get(chave_delta, 0) + 1
+
+def _aplicar(conn: Connection, deltas: Deltas):
+    tabela = models.TempoItemAgregado
+    for (granularidade, data, dimensao, chave, intervalo, numero), quantidade in deltas.items():
+        # Mesmo padrão de agregados.py: UPDATE e, se a linha não existir, INSERT
+        resultado = conn.execute(
+            update(tabela)
+            .where(
+                tabela.granularidade == granularidade, tabela.data == data, tabela.dimensao == dimensao,
+                tabela.chave == chave, tabela.intervalo == intervalo, tabela.faixa == numero
+            )
+            .values(quantidade=tabela.quantidade + quantidade)
+        )
+        if resultado.rowcount == 0:
+            conn.execute(insert(tabela).values(
+                granularidade=granularidade, data=data, dimensao=dimensao, chave=chave,
+                intervalo=intervalo, faixa=numero, quantidade=quantidade
+            ))
+
+def registrar_eventos(conn: Connection, eventos: Iterable[Tuple[int, int, str]], momento: datetime = None):
+    """Acrescenta eventos (item_id, produto_id, status) e conta os intervalos que eles fecham"""
+    momento = momento or datetime.now()
+    eventos = list(eventos)
+    if not eventos:
+        return
+
+    # Último evento de cada item que pode fechar um intervalo (criação não fecha nenhum)
+    evento = models.EventoItemComanda
+    item_ids = {item_id for item_id, _, status in eventos if status in _STATUS_FINAIS}
+    anteriores = {}
+    if item_ids:
+        ultimos = (
+            select(func.max(evento.id))
+            .where(evento.item_id.in_(item_ids))
+            .group_by(evento.item_id)
+        )
+        anteriores = {
+            linha.item_id: linha
+            for linha in conn.execute(
+                select(evento.item_id, evento.status, evento.momento).where(evento.id.in_(ultimos))
+            )
+        }
+
+    conn.execute(insert(evento), [
+        {"item_id": item_id, "produto_id": produto_id, "status": status, "momento": momento}
+        for item_id, produto_id, status in eventos
+    ])
+
+    deltas: Deltas = {}
+    for item_id, produto_id, status in eventos:
+        anterior = anteriores.get(item_id)
+        intervalo = anterior and _INTERVALO_POR_TRANSICAO.get((anterior.status, status))
+        if intervalo:
+            _acumular(deltas, produto_id, intervalo, anterior.momento, momento)
+    _aplicar(conn, deltas)
+
+def recalcular_tempos(conn: Connection):
+    """Apaga e reconstrói tempos_itens_agregados a partir de eventos_itens_comanda"""
+    evento = models.EventoItemComanda
+    janela_item = {"partition_by": evento.item_id, "order_by": (evento.momento, evento.id)}
+    consecutivos = select(
+        evento.produto_id,
+        evento.status,
+        evento.momento,
+        func.lag(evento.status).over(**janela_item).label("status_anterior"),
+        func.lag(evento.momento, type_=evento.momento.type).over(**janela_item).label("anterior"),
+    ).subquery()
+
+    deltas: Deltas = {}
+    for linha in conn.execute(select(consecutivos).where(consecutivos.c.status.in_(_STATUS_FINAIS))):
+        intervalo = _INTERVALO_POR_TRANSICAO.get((linha.status_anterior, linha.status))
+        if intervalo:
+            _acumular(deltas, linha.produto_id, intervalo, linha.anterior, linha.momento)
+    conn.execute(delete(models.TempoItemAgregado))
+    if deltas:
+        conn.execute(insert(models.TempoItemAgregado), [
+            {"granularidade": granularidade, "data": data, "dimensao": dimensao, "chave": chave,
+             "intervalo": intervalo, "faixa": numero, "quantidade": quantidade}
+            for (granularidade, data, dimensao, chave, intervalo, numero), quantidade in deltas.items()
+        ])
+
+def _primeiro_dia_mes_seguinte(dia: date) -> date:
+    return (dia.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _filtro_periodo(data_inicio: Optional[date], data_fim: Optional[date]):
+    """Linhas mensais dos meses inteiros do período e diárias dos dias restantes"""
+    tabela = models.TempoItemAgregado
+    # Meses inteiros: de `meses_de` (inclusive) a `meses_ate` (exclusive); None = sem limite
+    meses_de = None
+    if data_inicio:
+        meses_de = data_inicio if data_inicio.day == 1 else _primeiro_dia_mes_seguinte(data_inicio)
+    meses_ate = (data_fim + timedelta(days=1)).replace(day=1) if data_fim else None
+    if meses_de and meses_ate and meses_de >= meses_ate:
+        # Nenhum mês inteiro no período
+        return and_(tabela.granularidade == "dia", tabela.data >= data_inicio, tabela.data <= data_fim)
+
+    meses = [tabela.granularidade == "mes"]
+    dias = []
+    if meses_de:
+        meses.append(tabela.data >= meses_de)
+        dias.append(and_(tabela.data >= data_inicio, tabela.data < meses_de))
+    if meses_ate:
+        meses.append(tabela.data < meses_ate)
+        dias.append(and_(tabela.data >= meses_ate, tabela.data <= data_fim))
+    if not dias:
+        return and_(*meses)
+    return or_(and_(*meses), and_(tabela.granularidade == "dia", or_(*dias)))
+
+def consultar_tempos(db: Session, data_inicio: Optional[date] = None, data_fim: Optional[date] = None):
+    """Quantidade e faixas do p50 e do p95 da espera e do preparo, por produto e por hora.
+
+    Retorna linhas (dimensao, chave, intervalo, quantidade, faixa_p50,
+    faixa_p95); converta as faixas em segundos com `limite_faixa`.
+    """
+    tabela = models.TempoItemAgregado
+    grupo = (tabela.dimensao, tabela.chave, tabela.intervalo)
+    por_faixa = (
+        select(*grupo, tabela.faixa, func.sum(tabela.quantidade).label("quantidade"))
+        .where(_filtro_periodo(data_inicio, data_fim))
+        .group_by(*grupo, tabela.faixa)
+        .subquery()
+    )
+
+    grupo = (por_faixa.c.dimensao, por_faixa.c.chave, por_faixa.c.intervalo)
+    acumulado = select(
+        *grupo,
+        por_faixa.c.faixa,
+        func.sum(por_faixa.c.quantidade).over(partition_by=grupo, order_by=por_faixa.c.faixa).label("acumulado"),
+        func.sum(por_faixa.c.quantidade).over(partition_by=grupo).label("total"),
+    ).subquery()
+
+    def percentil(p: int):
+        # Primeira faixa em que a soma acumulada cobre p% dos intervalos
+        return func.min(case((acumulado.c.acumulado * 100 >= acumulado.c.total * p, acumulado.c.faixa)))
+
+    grupo = (acumulado.c.dimensao, acumulado.c.chave, acumulado.c.intervalo)
+    return db.execute(
+        select(
+            *grupo,
+            func.max(acumulado.c.total).label("quantidade"),
+            percentil(50).label("faixa_p50"),
+            percentil(95).label("faixa_p95"),
+        )
+        .group_by(*grupo)
+        .order_by(*grupo)
+    ).all()
+
+class TemposGrupo(NamedTuple):
+    dimensao: str  # produto ou hora
+    chave: int
+    intervalo: str  # espera ou preparo
+    quantidade: int
+    p50: float  # Segundos
+    p95: float
+    aproximado: bool  # True: limite superior da faixa do histograma
+
+def _duracoes(db: Session, data_inicio: Optional[date], data_fim: Optional[date]):
+    """(produto_id, hora do início, intervalo, segundos) dos intervalos iniciados no período, lidos dos eventos"""
+    evento = models.EventoItemComanda
+    inicio = datetime.combine(data_inicio, time.min) if data_inicio else None
+    fim = datetime.combine(data_fim + timedelta(days=1), time.min) if data_fim else None
+
+    eventos = select(evento)
+    if inicio or fim:
+        # O evento que abre um intervalo do período está no período: basta ler os itens que têm algum
+        itens = select(evento.item_id)
+        if inicio:
+            itens = itens.where(evento.momento >= inicio)
+        if fim:
+            itens = itens.where(evento.momento < fim)
+        eventos = eventos.where(evento.item_id.in_(itens))
+    eventos = eventos.subquery()
+
+    janela_item = {"partition_by": eventos.c.item_id, "order_by": (eventos.c.momento, eventos.c.id)}
+    consecutivos = select(
+        eventos.c.produto_id,
+        eventos.c.status,
+        eventos.c.momento,
+        func.lag(eventos.c.status).over(**janela_item).label("status_anterior"),
+        func.lag(eventos.c.momento, type_=evento.momento.type).over(**janela_item).label("anterior"),
+    ).subquery()
+    consulta = select(consecutivos).where(consecutivos.c.status.in_(_STATUS_FINAIS))
+    if inicio:
+        consulta = consulta.where(consecutivos.c.anterior >= inicio)
+    if fim:
+        consulta = consulta.where(consecutivos.c.anterior < fim)
+
+    for linha in db.execute(consulta):
+        intervalo = _INTERVALO_POR_TRANSICAO.get((linha.status_anterior, linha.status))
+        if intervalo:
+            yield linha.produto_id, linha.anterior.hour, intervalo, (linha.momento - linha.anterior).total_seconds()
+
+def _percentil(ordenados: List[float], p: int) -> float:
+    # Mesmo critério do histograma: primeiro valor que cobre p% dos intervalos
+    return round(ordenados[max(math.ceil(len(ordenados) * p / 100), 1) - 1], 1)
+
+def tempos_por_grupo(
+    db: Session,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    limite_exato: int = LIMITE_PERCENTIL_EXATO,
+) -> List[TemposGrupo]:
+    """Quantidade, p50 e p95 (em segundos) da espera e do preparo, por produto e por hora.
+
+    Com até `limite_exato` intervalos no período, os percentis são exatos,
+    calculados a partir dos eventos; acima disso vêm do histograma
+    (`aproximado`: limite superior da faixa, até 10% acima).
+    """
+    linhas = consultar_tempos(db, data_inicio, data_fim)
+    if sum(linha.quantidade for linha in linhas if linha.dimensao == "produto") > limite_exato:
+        return [
+            TemposGrupo(
+                linha.dimensao, linha.chave, linha.intervalo, linha.quantidade,
+                limite_faixa(linha.faixa_p50), limite_faixa(linha.faixa_p95), True
+            )
+            for linha in linhas
+        ]
+
+    duracoes: Dict[Tuple[str, int, str], List[float]] = {}
+    for produto_id, hora, intervalo, segundos in _duracoes(db, data_inicio, data_fim):
+        duracoes.setdefault(("produto", produto_id, intervalo), []).append(segundos)
+        duracoes.setdefault(("hora", hora, intervalo), []).append(segundos)
+    resultado = []
+    for (dimensao, chave, intervalo), valores in sorted(duracoes.items()):
+        valores.sort()
+        resultado.append(TemposGrupo(
+            dimensao, chave, intervalo, len(valores), _percentil(valores, 50), _percentil(valores, 95), False
+        ))
+    return resultado
+
+@event.listens_for(Session, "after_flush")
+def _registrar_status_itens(session, flush_context):
+    eventos = [(obj.id, obj.produto_id, obj.status) for obj in session.new if isinstance(obj, models.ItemComanda)]
+    eventos.extend(
+        (obj.id, obj.produto_id, obj.status)
+        for obj in session.dirty
+        if isinstance(obj, models.ItemComanda) and inspect(obj).attrs.status.history.has_changes()
+    )
+    registrar_eventos(session.connection(), eventos)
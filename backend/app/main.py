@@ -1,23 +1,44 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request, Query, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-import qrcode
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+from typing import Annotated, List, Optional
+from datetime import datetime, date, timedelta
 import json
 import uuid
-from io import BytesIO
+import asyncio
 import base64
+import hashlib
 import os
+from contextlib import asynccontextmanager
 
-from . import models, schemas
-from .database import engine, get_db
+from . import agregados, disponibilidade, historico_itens, models, schemas, versionamento
+from .cardapio import cache_cardapio
+from .catalogo import cache_catalogo
+from .configuracoes import RESERVA_DURACAO_MINUTOS
+from .contadores import contador_comandas
+from .eventos import anotar_evento, barramento
+from .exportacao import LINHAS_POR_BLOCO, OPENPYXL_DISPONIVEL, TIPOS_CONTEUDO, Secao, gerar_csv, gerar_xlsx
+from .database import get_db
+from .fila_whatsapp import enfileirar_pedido, fila_whatsapp
+from .migracoes import atualizar_banco
+from .qr_codes import chave_qr, folhas_para_bytes, montar_folhas_qr, obter_qr_png, obter_varios_qr_png
+from .versoes_comandas import anotar_comandas, versoes_comandas
 
-# Criar tabelas
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    # Esquema do banco na versão mais recente, qualquer que seja a forma de subir
+    # a API (run_backend.py, run_web.py ou uvicorn direto). `python migrar_banco.py`
+    # faz o mesmo e, no SQLite, guarda antes um backup do arquivo.
+    atualizar_banco()
+    # Entrega das mensagens do WhatsApp em segundo plano
+    fila_whatsapp.iniciar()
+    yield
+    fila_whatsapp.parar()
 
-app = FastAPI(title="Sistema Padaria API", version="2.0.0")
+app = FastAPI(title="Sistema Padaria API", version="2.0.0", lifespan=ciclo_de_vida)
 
 # Configurações
 BASE_URL = "http://localhost:8000"
@@ -47,22 +68,36 @@ def obter_mesa(mesa_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Mesa não encontrada")
     return mesa
 
+# QR codes das mesas
+CACHE_CONTROL_QR_CODE = "public, max-age=86400"
+
+def _menu_url(mesa_id: int) -> str:
+    return f"{BASE_URL}/menu/{mesa_id}"
+
+def _etag_corresponde(request: Request, etag: str) -> bool:
+    """Compara o ETag com o header If-None-Match (que pode ter vários valores ou '*')"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    valores = [valor.strip() for valor in if_none_match.split(",")]
+    return "*" in valores or any(valor.removeprefix("W/") == etag for valor in valores)
+
+def _resposta_com_etag(request: Request, etag: str, gerar_conteudo, media_type: str, headers: dict) -> Response:
+    """304 se o cliente já tem a versão `etag`; senão gera o conteúdo e responde 200"""
+    headers = {"ETag": etag, **headers}
+    if _etag_corresponde(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=gerar_conteudo(), media_type=media_type, headers=headers)
+
 @app.get("/mesas/{mesa_id}/qr-code", response_model=schemas.QRCodeResponse)
 def gerar_qr_code_mesa(mesa_id: int, db: Session = Depends(get_db)):
     mesa = db.query(models.Mesa).filter(models.Mesa.id == mesa_id).first()
     if not mesa:
         raise HTTPException(status_code=404, detail="Mesa não encontrada")
     
-    # Gerar QR Code
-    menu_url = f"{BASE_URL}/menu/{mesa_id}"
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(menu_url)
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="black", back_color="white")
-    buffer = BytesIO()
-    img.save(buffer, format='PNG')
-    qr_code_base64 = base64.b64encode(buffer.getvalue()).decode()
+    # QR Code em cache (veja também /mesas/{mesa_id}/qr-code.png)
+    menu_url = _menu_url(mesa_id)
+    qr_code_base64 = base64.b64encode(obter_qr_png(menu_url)).decode()
     
     return schemas.QRCodeResponse(
         mesa_id=mesa.id,
@@ -71,6 +106,57 @@ def gerar_qr_code_mesa(mesa_id: int, db: Session = Depends(get_db)):
         menu_url=menu_url
     )
 
+@app.get("/mesas/{mesa_id}/qr-code.png")
+def obter_qr_code_png(mesa_id: int, request: Request, db: Session = Depends(get_db)):
+    """QR code da mesa como image/png, com ETag para revalidação (304)"""
+    if not db.query(models.Mesa.id).filter(models.Mesa.id == mesa_id).first():
+        raise HTTPException(status_code=404, detail="Mesa não encontrada")
+    
+    menu_url = _menu_url(mesa_id)
+    return _resposta_com_etag(
+        request,
+        f'"{chave_qr(menu_url)}"',
+        lambda: obter_qr_png(menu_url),
+        "image/png",
+        {"Cache-Control": CACHE_CONTROL_QR_CODE}
+    )
+
+@app.get("/mesas/qr-codes/folha")
+def gerar_folha_qr_codes(
+    request: Request,
+    formato: Annotated[str, Query(pattern="^(pdf|png)$")] = "pdf",
+    colunas: Annotated[int, Query(ge=1, le=6)] = 3,
+    linhas: Annotated[int, Query(ge=1, le=8)] = 4,
+    db: Session = Depends(get_db)
+):
+    """Folhas A4 para impressão com os QR codes de todas as mesas"""
+    mesas = db.query(models.Mesa.id, models.Mesa.numero).order_by(models.Mesa.numero).all()
+    if not mesas:
+        raise HTTPException(status_code=404, detail="Nenhuma mesa cadastrada")
+    
+    menu_urls = [_menu_url(mesa.id) for mesa in mesas]
+    assinatura = "|".join(
+        [formato, str(colunas), str(linhas)]
+        + [f"{mesa.numero}:{chave_qr(url)}" for mesa, url in zip(mesas, menu_urls)]
+    )
+    
+    def gerar_folhas():
+        pngs = obter_varios_qr_png(menu_urls)
+        folhas = montar_folhas_qr([(mesa.numero, png) for mesa, png in zip(mesas, pngs)], colunas, linhas)
+        return folhas_para_bytes(folhas, formato)
+    
+    return _resposta_com_etag(
+        request,
+        f'"{hashlib.sha256(assinatura.encode()).hexdigest()}"',
+        gerar_folhas,
+        "application/pdf" if formato == "pdf" else "image/png",
+        {
+            # As mesas podem mudar: o navegador sempre revalida, e recebe 304 se nada mudou
+            "Cache-Control": "no-cache",
+            "Content-Disposition": f'inline; filename="qr-codes-mesas.{formato}"'
+        }
+    )
+
 @app.put("/mesas/{mesa_id}/reservar")
 def reservar_mesa(mesa_id: int, db: Session = Depends(get_db)):
     mesa = db.query(models.Mesa).filter(models.Mesa.id == mesa_id).first()
@@ -94,14 +180,11 @@ def liberar_mesa(mesa_id: int, db: Session = Depends(get_db)):
 # Endpoints para Produtos
 @app.get("/produtos/", response_model=List[schemas.Produto])
 def listar_produtos(db: Session = Depends(get_db)):
-    return db.query(models.Produto).filter(models.Produto.disponivel == True).all()
+    return cache_catalogo.listar(db)
 
 @app.get("/produtos/categoria/{categoria}", response_model=List[schemas.Produto])
 def listar_produtos_por_categoria(categoria: str, db: Session = Depends(get_db)):
-    return db.query(models.Produto).filter(
-        models.Produto.categoria == categoria,
-        models.Produto.disponivel == True
-    ).all()
+    return cache_catalogo.listar(db, categoria)
 
 @app.post("/produtos/", response_model=schemas.Produto)
 def criar_produto(produto: schemas.ProdutoCreate, db: Session = Depends(get_db)):
@@ -118,36 +201,98 @@ def obter_produto(produto_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Produto não encontrado")
     return produto
 
+# Filtros comuns de listagem
+LIMITE_MAXIMO_LISTAGEM = 1000
+
+def _filtrar_periodo(query, coluna, data_inicio: Optional[date], data_fim: Optional[date]):
+    """Restringe a consulta ao intervalo [data_inicio, data_fim], em dias inteiros"""
+    if data_inicio:
+        query = query.filter(coluna >= datetime.combine(data_inicio, datetime.min.time()))
+    if data_fim:
+        query = query.filter(coluna < datetime.combine(data_fim + timedelta(days=1), datetime.min.time()))
+    return query
+
+def _paginar(query, linhas_por_pagina: Optional[int], response: Response):
+    """Aplica o limite e informa o cursor da próxima página no header X-Proximo-Cursor"""
+    if not linhas_por_pagina:
+        return query.all()
+    linhas = query.limit(linhas_por_pagina + 1).all()
+    if len(linhas) > linhas_por_pagina:
+        linhas = linhas[:linhas_por_pagina]
+        response.headers["X-Proximo-Cursor"] = str(linhas[-1].id)
+    return linhas
+
 # Endpoints para Comandas
+def _consultar_comandas_resumo(db: Session):
+    """Monta a consulta de resumo de comandas em um único SELECT.
+
+    O número da mesa vem de um JOIN e a quantidade de itens de uma subconsulta
+    correlacionada, evitando carregar `comanda.mesa` e `comanda.itens` linha a
+    linha. A subconsulta usa o índice de itens_comanda.comanda_id e só conta os
+    itens das comandas selecionadas pelos filtros.
+    """
+    quantidade_itens = (
+        select(func.count(models.ItemComanda.id))
+        .where(models.ItemComanda.comanda_id == models.Comanda.id)
+        .correlate(models.Comanda)
+        .scalar_subquery()
+    )
+    return (
+        db.query(
+            models.Comanda.id,
+            models.Mesa.numero.label("mesa_numero"),
+            models.Comanda.status,
+            models.Comanda.total,
+            models.Comanda.data_abertura,
+            quantidade_itens.label("quantidade_itens"),
+            models.Comanda.chamando_garcom
+        )
+        .join(models.Mesa, models.Mesa.id == models.Comanda.mesa_id)
+    )
+
+def _montar_comandas_resumo(linhas) -> List[schemas.ComandaResumo]:
+    return [
+        schemas.ComandaResumo(
+            id=linha.id,
+            mesa_numero=linha.mesa_numero,
+            status=linha.status,
+            total=linha.total,
+            data_abertura=linha.data_abertura,
+            quantidade_itens=linha.quantidade_itens,
+            chamando_garcom=bool(linha.chamando_garcom)
+        )
+        for linha in linhas
+    ]
+
 @app.get("/comandas/", response_model=List[schemas.ComandaResumo])
-def listar_comandas(db: Session = Depends(get_db)):
-    comandas = db.query(models.Comanda).all()
-    resultado = []
-    for comanda in comandas:
-        resultado.append(schemas.ComandaResumo(
-            id=comanda.id,
-            mesa_numero=comanda.mesa.numero,
-            status=comanda.status,
-            total=comanda.total,
-            data_abertura=comanda.data_abertura,
-            quantidade_itens=len(comanda.itens)
-        ))
-    return resultado
+def listar_comandas(
+    response: Response,
+    status: Annotated[Optional[List[str]], Query()] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    limite: Annotated[Optional[int], Query(ge=1, le=LIMITE_MAXIMO_LISTAGEM)] = None,
+    apos_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Lista comandas em ordem de abertura, com filtros e paginação por cursor (apos_id)"""
+    query = _consultar_comandas_resumo(db)
+    if status:
+        query = query.filter(models.Comanda.status.in_(status))
+    query = _filtrar_periodo(query, models.Comanda.data_abertura, data_inicio, data_fim)
+    if apos_id is not None:
+        query = query.filter(models.Comanda.id > apos_id)
+    linhas = _paginar(query.order_by(models.Comanda.id), limite, response)
+    return _montar_comandas_resumo(linhas)
 
 @app.get("/comandas/abertas/", response_model=List[schemas.ComandaResumo])
 def listar_comandas_abertas(db: Session = Depends(get_db)):
-    comandas = db.query(models.Comanda).filter(models.Comanda.status == "aberta").all()
-    resultado = []
-    for comanda in comandas:
-        resultado.append(schemas.ComandaResumo(
-            id=comanda.id,
-            mesa_numero=comanda.mesa.numero,
-            status=comanda.status,
-            total=comanda.total,
-            data_abertura=comanda.data_abertura,
-            quantidade_itens=len(comanda.itens)
-        ))
-    return resultado
+    linhas = (
+        _consultar_comandas_resumo(db)
+        .filter(models.Comanda.status == "aberta")
+        .order_by(models.Comanda.id)
+        .all()
+    )
+    return _montar_comandas_resumo(linhas)
 
 @app.get("/comandas/para-impressao/", response_model=List[schemas.ComandaImpressao])
 def listar_comandas_para_impressao(db: Session = Depends(get_db)):
@@ -168,6 +313,33 @@ def listar_comandas_para_impressao(db: Session = Depends(get_db)):
         ))
     return resultado
 
+@app.get("/comandas/contadores", response_model=schemas.ContadoresComandas)
+def contadores_comandas(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Totais por status para os cabeçalhos do desktop, sem listar as comandas"""
+    por_status = contador_comandas.totais(db, data_inicio, data_fim)
+    
+    def quantidade(*status):
+        return sum(por_status[s][0] for s in status if s in por_status)
+    
+    return schemas.ContadoresComandas(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        por_status={
+            status: schemas.TotalVendas(quantidade=total[0], faturamento=round(total[1], 2))
+            for status, total in por_status.items()
+        },
+        total=quantidade(*por_status),
+        abertas=quantidade("aberta"),
+        para_impressao=quantidade("aberta", "impressa"),
+        aguardando_pagamento=quantidade("aguardando_pagamento"),
+        fechadas=quantidade("fechada"),
+        faturamento=round(por_status.get("fechada", (0, 0.0))[1], 2)
+    )
+
 @app.post("/comandas/", response_model=schemas.Comanda)
 def criar_comanda(comanda: schemas.ComandaCreate, db: Session = Depends(get_db)):
     # Verificar se a mesa existe
@@ -261,69 +433,223 @@ def cancelar_comanda(comanda_id: int, db: Session = Depends(get_db)):
     return {"message": "Comanda cancelada com sucesso"}
 
 # Endpoints para Itens da Comanda
-@app.post("/comandas/{comanda_id}/itens/", response_model=schemas.ItemComanda)
-def adicionar_item_comanda(
-    comanda_id: int, 
-    item: schemas.ItemComandaCreate, 
-    db: Session = Depends(get_db)
-):
-    # Verificar se a comanda existe e está aberta
+def _obter_comanda_para_itens(db: Session, comanda_id: int) -> models.Comanda:
+    """Busca a comanda e verifica se ela ainda aceita itens"""
     comanda = db.query(models.Comanda).filter(models.Comanda.id == comanda_id).first()
     if not comanda:
         raise HTTPException(status_code=404, detail="Comanda não encontrada")
     
     if comanda.status not in ["aberta", "impressa"]:
         raise HTTPException(status_code=400, detail="Comanda não está aberta")
-    
-    # Verificar se o produto existe
-    produto = db.query(models.Produto).filter(models.Produto.id == item.produto_id).first()
-    if not produto:
-        raise HTTPException(status_code=404, detail="Produto não encontrado")
-    
-    if not produto.disponivel:
-        raise HTTPException(status_code=400, detail="Produto não disponível")
-    
+    return comanda
 
+def _incluir_itens_comanda(
+    db: Session,
+    comanda: models.Comanda,
+    itens: List[schemas.ItemComandaCreate]
+) -> List[models.ItemComanda]:
+    """Valida os produtos pelo cache do catálogo e adiciona os itens à sessão.
+
+    Atualiza o total da comanda e a devolve para impressão; o commit fica a
+    cargo de quem chama.
+    """
+    produto_ids = {item.produto_id for item in itens}
+    produtos = cache_catalogo.produtos(db, produto_ids)
     
-    # Criar item da comanda
-    db_item = models.ItemComanda(
-        comanda_id=comanda_id,
-        produto_id=item.produto_id,
-        quantidade=item.quantidade,
-        preco_unitario=produto.preco,
-        observacoes=item.observacoes,
-        status=item.status
-    )
-    db.add(db_item)
+    faltando = sorted(produto_ids - produtos.keys())
+    if faltando:
+        detalhe = "Produto não encontrado" if len(produto_ids) == 1 else f"Produtos não encontrados: {faltando}"
+        raise HTTPException(status_code=404, detail=detalhe)
     
-    # Atualizar total da comanda
-    comanda.total += (produto.preco * item.quantidade)
+    indisponiveis = sorted(pid for pid, produto in produtos.items() if not produto.disponivel)
+    if indisponiveis:
+        detalhe = "Produto não disponível" if len(produto_ids) == 1 else f"Produtos não disponíveis: {indisponiveis}"
+        raise HTTPException(status_code=400, detail=detalhe)
+    
+    db_itens = []
+    for item in itens:
+        produto = produtos[item.produto_id]
+        db_itens.append(models.ItemComanda(
+            comanda_id=comanda.id,
+            produto_id=item.produto_id,
+            quantidade=item.quantidade,
+            preco_unitario=produto.preco,
+            observacoes=item.observacoes,
+            status=item.status
+        ))
+        # Atualizar total da comanda
+        comanda.total += produto.preco * item.quantidade
+    db.add_all(db_itens)
     
     # Marcar comanda para impressão
     if comanda.status == "impressa":
         comanda.status = "aberta"
+    return db_itens
+
+def _responder_itens_comanda(db: Session, db_itens: List[models.ItemComanda]) -> List[schemas.ItemComanda]:
+    """Monta a resposta com os produtos do cache do catálogo (chamar após o flush e antes do commit)"""
+    produtos = cache_catalogo.produtos(db, {db_item.produto_id for db_item in db_itens})
+    return [
+        schemas.ItemComanda(
+            id=db_item.id,
+            comanda_id=db_item.comanda_id,
+            produto_id=db_item.produto_id,
+            quantidade=db_item.quantidade,
+            preco_unitario=db_item.preco_unitario,
+            observacoes=db_item.observacoes,
+            status=db_item.status,
+            produto=produtos[db_item.produto_id]
+        )
+        for db_item in db_itens
+    ]
+
+@app.post("/comandas/{comanda_id}/itens/", response_model=schemas.ItemComanda)
+def adicionar_item_comanda(
+    comanda_id: int, 
+    item: schemas.ItemComandaCreate, 
+    db: Session = Depends(get_db)
+):
+    comanda = _obter_comanda_para_itens(db, comanda_id)
+    db_item, = _incluir_itens_comanda(db, comanda, [item])
+    
+    db.flush()
+    resposta, = _responder_itens_comanda(db, [db_item])
+    db.commit()
+    return resposta
+
+@app.post("/comandas/{comanda_id}/itens/lote", response_model=List[schemas.ItemComanda])
+def adicionar_itens_comanda(
+    comanda_id: int,
+    itens: List[schemas.ItemComandaCreate],
+    db: Session = Depends(get_db)
+):
+    """Adiciona vários itens à comanda em uma única transação (ex.: o pedido de uma mesa inteira)"""
+    if not itens:
+        raise HTTPException(status_code=400, detail="Nenhum item informado")
     
+    comanda = _obter_comanda_para_itens(db, comanda_id)
+    db_itens = _incluir_itens_comanda(db, comanda, itens)
+    db.flush()
+    resposta = _responder_itens_comanda(db, db_itens)
     db.commit()
-    db.refresh(db_item)
-    return db_item
+    return resposta
 
 @app.get("/comandas/{comanda_id}/itens/", response_model=List[schemas.ItemComanda])
 def listar_itens_comanda(comanda_id: int, db: Session = Depends(get_db)):
     return db.query(models.ItemComanda).filter(models.ItemComanda.comanda_id == comanda_id).all()
 
+# Status de origem aceitos para cada status de destino (item individual e em lote).
+# O item passa por pendente -> preparando -> pronto, podendo voltar um passo;
+# pular o preparo misturaria a espera com o preparo nos tempos de preparo.
+TRANSICOES_STATUS_ITEM = {
+    "pendente": ["preparando"],
+    "preparando": ["pendente", "pronto"],
+    "pronto": ["preparando"],
+}
+
 @app.put("/itens/{item_id}/status")
 def atualizar_status_item(item_id: int, status: str, db: Session = Depends(get_db)):
     item = db.query(models.ItemComanda).filter(models.ItemComanda.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Item não encontrado")
     
-    if status not in ["pendente", "preparando", "pronto"]:
+    origens = TRANSICOES_STATUS_ITEM.get(status)
+    if origens is None:
         raise HTTPException(status_code=400, detail="Status inválido")
+    if item.status != status and item.status not in origens:
+        raise HTTPException(status_code=400, detail=f"Item {item.status} não pode passar para {status}")
     
     item.status = status
     db.commit()
     return {"message": f"Status do item atualizado para {status}"}
 
+@app.put("/itens/status", response_model=schemas.ResultadoStatusItens)
+def atualizar_status_itens(atualizacao: schemas.AtualizacaoStatusItens, db: Session = Depends(get_db)):
+    """Muda o status de vários itens (ou de todos os itens de uma comanda) de uma vez.
+
+    A mudança é um único UPDATE ... WHERE id IN (...), que só altera os itens
+    de comandas ativas cujo status atual permite a transição; os demais vêm
+    em `ignorados`. Devolve o status geral dos itens das comandas afetadas.
+    """
+    origens = TRANSICOES_STATUS_ITEM.get(atualizacao.status)
+    if origens is None:
+        raise HTTPException(status_code=400, detail="Status inválido")
+    if (atualizacao.item_ids is None) == (atualizacao.comanda_id is None):
+        raise HTTPException(status_code=400, detail="Informe item_ids ou comanda_id")
+
+    if atualizacao.comanda_id is not None:
+        comanda = db.get(models.Comanda, atualizacao.comanda_id)
+        if not comanda:
+            raise HTTPException(status_code=404, detail="Comanda não encontrada")
+        if comanda.status not in STATUS_COMANDAS_ATIVAS:
+            raise HTTPException(status_code=400, detail="Comanda não está ativa")
+        # Ids dos itens da comanda, para informar os que ficaram de fora
+        item_ids = db.execute(
+            select(models.ItemComanda.id).where(models.ItemComanda.comanda_id == comanda.id)
+        ).scalars().all()
+        selecao = models.ItemComanda.comanda_id == comanda.id
+    else:
+        item_ids = sorted(set(atualizacao.item_ids))
+        if not item_ids:
+            raise HTTPException(status_code=400, detail="Nenhum item informado")
+        selecao = models.ItemComanda.id.in_(item_ids)
+
+    # UPDATE em lote não passa pelo flush: versão, histórico, eventos e versões
+    # das comandas são gravados ou anotados aqui, como nas demais gravações
+    alterados = db.execute(
+        update(models.ItemComanda)
+        .where(
+            selecao,
+            models.ItemComanda.status.in_(origens),
+            models.ItemComanda.comanda_id.in_(
+                select(models.Comanda.id).where(models.Comanda.status.in_(STATUS_COMANDAS_ATIVAS))
+            )
+        )
+        .values(status=atualizacao.status)
+        .returning(models.ItemComanda.id, models.ItemComanda.comanda_id, models.ItemComanda.produto_id),
+        execution_options={"synchronize_session": "fetch"}
+    ).all()
+    historico_itens.registrar_eventos(
+        db.connection(),
+        [(item_id, produto_id, atualizacao.status) for item_id, _, produto_id in alterados]
+    )
+
+    versionamento.anotar_alterados(db, models.ItemComanda, [item_id for item_id, _, _ in alterados])
+
+    comanda_ids = {comanda_id for _, comanda_id, _ in alterados}
+    for item_id, comanda_id, _ in alterados:
+        anotar_evento(db, {
+            "tipo": "item_comanda", "acao": "alterado", "id": item_id,
+            "comanda_id": comanda_id, "versao": None
+        })
+    anotar_comandas(db, comanda_ids)
+    if atualizacao.comanda_id is not None:
+        comanda_ids.add(atualizacao.comanda_id)
+
+    # Status distintos dos itens de cada comanda bastam para o status geral
+    status_por_comanda = {}
+    for comanda_id, status in (
+        db.query(models.ItemComanda.comanda_id, models.ItemComanda.status)
+        .filter(models.ItemComanda.comanda_id.in_(comanda_ids))
+        .group_by(models.ItemComanda.comanda_id, models.ItemComanda.status)
+    ):
+        status_por_comanda.setdefault(comanda_id, []).append(status)
+    db.commit()
+
+    atualizados = sorted(item_id for item_id, _, _ in alterados)
+    return schemas.ResultadoStatusItens(
+        status=atualizacao.status,
+        atualizados=atualizados,
+        ignorados=sorted(set(item_ids) - set(atualizados)),
+        comandas=[
+            schemas.StatusItensComanda(
+                comanda_id=comanda_id,
+                status_geral_itens=_status_geral_itens(status_por_comanda.get(comanda_id, []))
+            )
+            for comanda_id in sorted(comanda_ids)
+        ]
+    )
+
 # Endpoints para Garçons
 @app.get("/garcons/", response_model=List[schemas.Garcom])
 def listar_garcons(db: Session = Depends(get_db)):
@@ -406,37 +732,25 @@ def marcar_sincronizada(sinc_id: int, db: Session = Depends(get_db)):
 # Endpoint para obter categorias de produtos
 @app.get("/produtos/categorias/")
 def listar_categorias(db: Session = Depends(get_db)):
-    categorias = db.query(models.Produto.categoria).distinct().all()
-    return [cat[0] for cat in categorias]
+    return cache_catalogo.categorias(db)
 
 # Endpoint para menu público (QR Code)
 @app.get("/menu/{mesa_id}")
-def obter_menu_publico(mesa_id: int, db: Session = Depends(get_db)):
-    """Menu público acessível via QR Code"""
-    mesa = db.query(models.Mesa).filter(models.Mesa.id == mesa_id).first()
-    if not mesa:
+def obter_menu_publico(mesa_id: int, request: Request, db: Session = Depends(get_db)):
+    """Menu público acessível via QR Code (em cache; 304 se o celular já tem a versão atual)"""
+    cardapio = cache_cardapio.obter(db, mesa_id)
+    if cardapio is None:
         raise HTTPException(status_code=404, detail="Mesa não encontrada")
     
-    produtos = db.query(models.Produto).filter(models.Produto.disponivel == True).all()
-    categorias = db.query(models.Produto.categoria).distinct().all()
-    
-    return {
-        "mesa": {
-            "id": mesa.id,
-            "numero": mesa.numero
-        },
-        "categorias": [cat[0] for cat in categorias],
-        "produtos": [
-            {
-                "id": p.id,
-                "nome": p.nome,
-                "preco": p.preco,
-                "categoria": p.categoria,
-                "descricao": p.descricao
-            }
-            for p in produtos
-        ]
-    }
+    conteudo, etag = cardapio
+    return _resposta_com_etag(
+        request,
+        etag,
+        lambda: conteudo,
+        "application/json",
+        # O cardápio muda a qualquer momento: o celular sempre revalida e recebe 304 se nada mudou
+        {"Cache-Control": "no-cache"}
+    )
 
 # Endpoint para página principal
 @app.get("/", response_class=HTMLResponse)
@@ -464,18 +778,36 @@ async def read_root():
 async def criar_pedido_online(pedido: schemas.PedidoOnlineCreate, db: Session = Depends(get_db)):
     """Criar pedido online para entrega"""
     try:
-        # Calcular total do pedido
+        # Produtos do pedido a partir do cache do catálogo
+        produtos = cache_catalogo.produtos(db, {item.produto_id for item in pedido.itens})
+        
+        # Calcular total do pedido e montar os itens
         total = 0
+        itens = []
+        itens_whatsapp = []
         for item in pedido.itens:
-            produto = db.query(models.Produto).filter(models.Produto.id == item.produto_id).first()
+            produto = produtos.get(item.produto_id)
             if not produto:
                 raise HTTPException(status_code=404, detail=f"Produto {item.produto_id} não encontrado")
             if not produto.disponivel:
                 raise HTTPException(status_code=400, detail=f"Produto {produto.nome} não disponível")
 
             total += produto.preco * item.quantidade
+            itens.append({
+                "produto_id": produto.id,
+                "quantidade": item.quantidade,
+                "preco_unitario": produto.preco,
+                "observacoes": item.observacoes
+            })
+            itens_whatsapp.append({
+                "quantidade": item.quantidade,
+                "preco_unitario": produto.preco,
+                "produto": {
+                    "nome": produto.nome
+                }
+            })
         
-        # Criar pedido
+        # Criar pedido e itens na mesma transação
         db_pedido = models.PedidoOnline(
             nome_cliente=pedido.nome_cliente,
             telefone=pedido.telefone,
@@ -485,77 +817,97 @@ async def criar_pedido_online(pedido: schemas.PedidoOnlineCreate, db: Session =
             total=total
         )
         db.add(db_pedido)
-        db.commit()
-        db.refresh(db_pedido)
+        db.flush()
+        if itens:
+            # Um único executemany para todos os itens
+            for dados_item in itens:
+                dados_item["pedido_id"] = db_pedido.id
+            db.execute(insert(models.ItemPedidoOnline), itens)
         
-        # Criar itens do pedido e decrementar estoque
-        for item in pedido.itens:
-            produto = db.query(models.Produto).filter(models.Produto.id == item.produto_id).first()
-            db_item = models.ItemPedidoOnline(
-                pedido_id=db_pedido.id,
-                produto_id=item.produto_id,
-                quantidade=item.quantidade,
-                preco_unitario=produto.preco,
-                observacoes=item.observacoes
-            )
-            db.add(db_item)
-
-        
-        db.commit()
-        
-        # Preparar dados para WhatsApp
-        pedido_data = {
-            "id": db_pedido.id,
+        # Enfileirar mensagem para o WhatsApp na mesma transação do pedido;
+        # o envio é feito em segundo plano (fila_whatsapp), que marca whatsapp_enviado
+        pedido_id = db_pedido.id
+        enfileirar_pedido(db, pedido_id, {
+            "id": pedido_id,
             "nome_cliente": db_pedido.nome_cliente,
             "telefone": db_pedido.telefone,
             "endereco": db_pedido.endereco,
             "forma_pagamento": db_pedido.forma_pagamento,
             "total": db_pedido.total,
             "observacoes": db_pedido.observacoes,
-            "itens": []
-        }
-        
-        # Adicionar itens ao pedido_data
-        for item in pedido.itens:
-            produto = db.query(models.Produto).filter(models.Produto.id == item.produto_id).first()
-            pedido_data["itens"].append({
-                "quantidade": item.quantidade,
-                "preco_unitario": produto.preco,
-                "produto": {
-                    "nome": produto.nome
-                }
-            })
-        
-        # Enviar para WhatsApp
-        from .config_whatsapp import whatsapp_service
-        whatsapp_service.enviar_pedido_whatsapp(pedido_data)
-        
-        # Marcar como enviado
-        db_pedido.whatsapp_enviado = True
+            "itens": itens_whatsapp
+        })
         db.commit()
+        fila_whatsapp.notificar()
         
-        return db_pedido
+        # Recarregar o pedido com itens e produtos em uma única consulta para a resposta
+        return (
+            db.query(models.PedidoOnline)
+            .options(joinedload(models.PedidoOnline.itens).joinedload(models.ItemPedidoOnline.produto))
+            .filter(models.PedidoOnline.id == pedido_id)
+            .one()
+        )
         
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao processar pedido: {str(e)}")
 
+def _consultar_pedidos_online_resumo(db: Session):
+    """Monta a consulta de resumo de pedidos online, contando itens em uma subconsulta correlacionada"""
+    quantidade_itens = (
+        select(func.count(models.ItemPedidoOnline.id))
+        .where(models.ItemPedidoOnline.pedido_id == models.PedidoOnline.id)
+        .correlate(models.PedidoOnline)
+        .scalar_subquery()
+    )
+    return (
+        db.query(
+            models.PedidoOnline.id,
+            models.PedidoOnline.nome_cliente,
+            models.PedidoOnline.telefone,
+            models.PedidoOnline.total,
+            models.PedidoOnline.status,
+            models.PedidoOnline.data_pedido,
+            quantidade_itens.label("quantidade_itens")
+        )
+    )
+
+def _montar_pedidos_online_resumo(linhas) -> List[schemas.PedidoOnlineResumo]:
+    return [
+        schemas.PedidoOnlineResumo(
+            id=linha.id,
+            nome_cliente=linha.nome_cliente,
+            telefone=linha.telefone,
+            total=linha.total,
+            status=linha.status,
+            data_pedido=linha.data_pedido,
+            quantidade_itens=linha.quantidade_itens
+        )
+        for linha in linhas
+    ]
+
 @app.get("/pedidos-online/", response_model=List[schemas.PedidoOnlineResumo])
-def listar_pedidos_online(db: Session = Depends(get_db)):
-    """Listar todos os pedidos online"""
-    pedidos = db.query(models.PedidoOnline).order_by(models.PedidoOnline.data_pedido.desc()).all()
-    resultado = []
-    for pedido in pedidos:
-        resultado.append(schemas.PedidoOnlineResumo(
-            id=pedido.id,
-            nome_cliente=pedido.nome_cliente,
-            telefone=pedido.telefone,
-            total=pedido.total,
-            status=pedido.status,
-            data_pedido=pedido.data_pedido,
-            quantidade_itens=len(pedido.itens)
-        ))
-    return resultado
+def listar_pedidos_online(
+    response: Response,
+    status: Annotated[Optional[List[str]], Query()] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    limite: Annotated[Optional[int], Query(ge=1, le=LIMITE_MAXIMO_LISTAGEM)] = None,
+    antes_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Listar pedidos online, do mais recente ao mais antigo, com paginação por cursor (antes_id)"""
+    query = _consultar_pedidos_online_resumo(db)
+    if status:
+        query = query.filter(models.PedidoOnline.status.in_(status))
+    query = _filtrar_periodo(query, models.PedidoOnline.data_pedido, data_inicio, data_fim)
+    if antes_id is not None:
+        query = query.filter(models.PedidoOnline.id < antes_id)
+    linhas = _paginar(query.order_by(models.PedidoOnline.id.desc()), limite, response)
+    return _montar_pedidos_online_resumo(linhas)
 
 @app.get("/pedidos-online/{pedido_id}", response_model=schemas.PedidoOnline)
 def obter_pedido_online(pedido_id: int, db: Session = Depends(get_db)):
@@ -656,26 +1008,33 @@ def criar_reserva(reserva: schemas.ReservaCreate, db: Session = Depends(get_db))
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
-    # Verificar se a mesa está disponível para reserva
-    if mesa.status == "reservada":
-        raise HTTPException(status_code=400, detail="Mesa já está reservada")
+    duracao = timedelta(minutes=RESERVA_DURACAO_MINUTOS)
+    intervalo = disponibilidade.intervalo_reserva(reserva.data_reserva, reserva.horario_reserva, duracao)
+    if intervalo is None:
+        raise HTTPException(status_code=400, detail="Horário inválido (use HH:MM)")
     
-    # Verificar se não há conflito de horário
-    reservas_existentes = db.query(models.Reserva).filter(
+    # Verificar se não há conflito de horário: a mesa pode ter várias reservas
+    # no dia, desde que os intervalos ocupados não se sobreponham
+    dia = datetime.combine(reserva.data_reserva.date(), datetime.min.time())
+    reservas_existentes = db.query(models.Reserva.data_reserva, models.Reserva.horario_reserva).filter(
         models.Reserva.mesa_id == reserva.mesa_id,
-        models.Reserva.data_reserva == reserva.data_reserva,
-        models.Reserva.status == "ativa"
+        models.Reserva.status == "ativa",
+        models.Reserva.data_reserva >= dia - timedelta(days=1),
+        models.Reserva.data_reserva < dia + timedelta(days=2)
     ).all()
     
-    if reservas_existentes:
-        raise HTTPException(status_code=400, detail="Mesa já reservada para este horário")
+    for existente in reservas_existentes:
+        ocupado = disponibilidade.intervalo_reserva(existente.data_reserva, existente.horario_reserva, duracao)
+        if ocupado and disponibilidade.se_sobrepoem(intervalo, ocupado):
+            raise HTTPException(status_code=400, detail="Mesa já reservada para este horário")
     
     # Criar reserva
     db_reserva = models.Reserva(**reserva.dict())
     db.add(db_reserva)
     
-    # Atualizar status da mesa
-    mesa.status = "reservada"
+    # Atualizar status da mesa (uma mesa ocupada continua ocupada)
+    if mesa.status == "livre":
+        mesa.status = "reservada"
     
     db.commit()
     db.refresh(db_reserva)
@@ -698,6 +1057,66 @@ def listar_reservas(db: Session = Depends(get_db)):
         ))
     return resultado
 
+@app.get("/reservas/disponibilidade", response_model=schemas.DisponibilidadeDia)
+def disponibilidade_reservas(
+    data: date,
+    duracao: Annotated[Optional[int], Query(ge=15, le=480)] = None,
+    db: Session = Depends(get_db)
+):
+    """Horários livres de todas as mesas no dia.
+
+    Uma única consulta traz as mesas com as reservas ativas em torno do dia;
+    um horário está livre se a reserva que começaria nele (durando `duracao`
+    minutos, padrão RESERVA_DURACAO_MINUTOS) não se sobrepõe a nenhuma
+    existente. No dia de hoje, horários que já passaram não são oferecidos.
+    """
+    duracao = duracao or RESERVA_DURACAO_MINUTOS
+    tempo = timedelta(minutes=duracao)
+    dia = datetime.combine(data, datetime.min.time())
+    agora = datetime.now()
+    horarios = [h for h in disponibilidade.horarios_do_dia(data) if h > agora]
+
+    # Reservas do dia anterior também entram: uma reserva tarde da noite pode avançar sobre este dia
+    linhas = db.execute(
+        select(
+            models.Mesa.id, models.Mesa.numero, models.Mesa.status,
+            models.Reserva.data_reserva, models.Reserva.horario_reserva
+        )
+        .outerjoin(models.Reserva, and_(
+            models.Reserva.mesa_id == models.Mesa.id,
+            models.Reserva.status == "ativa",
+            models.Reserva.data_reserva >= dia - timedelta(days=1),
+            models.Reserva.data_reserva < dia + timedelta(days=1)
+        ))
+        .order_by(models.Mesa.numero, models.Mesa.id)
+    ).all()
+
+    # mesa_id -> (linha da mesa, intervalos ocupados); cada reserva ocupa RESERVA_DURACAO_MINUTOS
+    mesas = {}
+    for linha in linhas:
+        _, ocupados = mesas.setdefault(linha.id, (linha, []))
+        if linha.data_reserva is not None:
+            ocupado = disponibilidade.intervalo_reserva(
+                linha.data_reserva, linha.horario_reserva, timedelta(minutes=RESERVA_DURACAO_MINUTOS)
+            )
+            if ocupado:
+                ocupados.append(ocupado)
+
+    return schemas.DisponibilidadeDia(
+        data=data,
+        duracao=duracao,
+        horarios=[h.strftime("%H:%M") for h in horarios],
+        mesas=[
+            schemas.DisponibilidadeMesa(
+                mesa_id=mesa.id,
+                numero=mesa.numero,
+                status=mesa.status,
+                livres=[h.strftime("%H:%M") for h in disponibilidade.horarios_livres(horarios, ocupados, tempo)]
+            )
+            for mesa, ocupados in mesas.values()
+        ]
+    )
+
 @app.get("/reservas/mesa/{mesa_id}")
 def obter_reservas_mesa(mesa_id: int, db: Session = Depends(get_db)):
     """Obter reservas de uma mesa específica"""
@@ -745,33 +1164,507 @@ def cancelar_reserva(reserva_id: int, db: Session = Depends(get_db)):
     db.commit()
     return {"message": "Reserva cancelada com sucesso"}
 
-@app.get("/comandas/{comanda_id}/status")
-def status_comanda(comanda_id: int, db: Session = Depends(get_db)):
-    comanda = db.query(models.Comanda).filter(models.Comanda.id == comanda_id).first()
-    if not comanda:
-        raise HTTPException(status_code=404, detail="Comanda não encontrada")
-    itens = db.query(models.ItemComanda).filter(models.ItemComanda.comanda_id == comanda_id).all()
-    status_itens = [item.status for item in itens]
-    # Lógica para status geral dos itens
+# ============================================================================
+# ENDPOINTS PARA RELATÓRIOS
+# ============================================================================
+
+def _consultar_vendas_agregadas(db: Session, colunas, data_inicio: Optional[date], data_fim: Optional[date]):
+    """Soma os agregados do período agrupando pelas `colunas` (veja agregados.py)"""
+    query = db.query(
+        *colunas,
+        func.sum(models.VendaAgregada.quantidade).label("quantidade"),
+        func.sum(models.VendaAgregada.faturamento).label("faturamento")
+    )
+    if data_inicio:
+        query = query.filter(models.VendaAgregada.data >= data_inicio)
+    if data_fim:
+        query = query.filter(models.VendaAgregada.data <= data_fim)
+    return query.group_by(*colunas).order_by(*colunas).all()
+
+@app.get("/relatorios/vendas", response_model=List[schemas.VendaAgregada])
+def relatorio_vendas(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    agrupamento: Annotated[str, Query(pattern="^(dia|hora)$")] = "dia",
+    db: Session = Depends(get_db)
+):
+    """Quantidade e faturamento por dia (ou por dia e hora), origem e status"""
+    colunas = [models.VendaAgregada.data]
+    if agrupamento == "hora":
+        colunas.append(models.VendaAgregada.hora)
+    colunas += [models.VendaAgregada.origem, models.VendaAgregada.status]
+    
+    return [
+        schemas.VendaAgregada(
+            data=linha.data,
+            hora=linha.hora if agrupamento == "hora" else None,
+            origem=linha.origem,
+            status=linha.status,
+            quantidade=linha.quantidade,
+            faturamento=round(linha.faturamento, 2)
+        )
+        for linha in _consultar_vendas_agregadas(db, colunas, data_inicio, data_fim)
+        if linha.quantidade
+    ]
+
+@app.get("/relatorios/resumo", response_model=schemas.ResumoVendas)
+def relatorio_resumo(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Totais do período por origem e status (contadores e faturamento do desktop)"""
+    resumo = schemas.ResumoVendas(data_inicio=data_inicio, data_fim=data_fim)
+    colunas = [models.VendaAgregada.origem, models.VendaAgregada.status]
+    for linha in _consultar_vendas_agregadas(db, colunas, data_inicio, data_fim):
+        if not linha.quantidade:
+            continue
+        totais = resumo.comandas if linha.origem == "comanda" else resumo.pedidos_online
+        totais[linha.status] = schemas.TotalVendas(
+            quantidade=linha.quantidade,
+            faturamento=round(linha.faturamento, 2)
+        )
+    return resumo
+
+@app.get("/relatorios/produtos-mais-vendidos", response_model=List[schemas.ProdutoMaisVendido])
+def relatorio_produtos_mais_vendidos(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    limite: Annotated[int, Query(ge=1, le=100)] = 10,
+    ordenar_por: Annotated[str, Query(pattern="^(quantidade|faturamento)$")] = "quantidade",
+    db: Session = Depends(get_db)
+):
+    """Produtos mais vendidos no período, somando comandas e pedidos online (exceto cancelados)"""
+    itens_comanda = _filtrar_periodo(
+        select(
+            models.ItemComanda.produto_id,
+            models.ItemComanda.quantidade,
+            (models.ItemComanda.quantidade * models.ItemComanda.preco_unitario).label("valor")
+        )
+        .join(models.Comanda, models.Comanda.id == models.ItemComanda.comanda_id)
+        .where(models.Comanda.status != "cancelado"),
+        models.Comanda.data_abertura, data_inicio, data_fim
+    )
+    itens_online = _filtrar_periodo(
+        select(
+            models.ItemPedidoOnline.produto_id,
+            models.ItemPedidoOnline.quantidade,
+            (models.ItemPedidoOnline.quantidade * models.ItemPedidoOnline.preco_unitario).label("valor")
+        )
+        .join(models.PedidoOnline, models.PedidoOnline.id == models.ItemPedidoOnline.pedido_id)
+        .where(models.PedidoOnline.status != "cancelado"),
+        models.PedidoOnline.data_pedido, data_inicio, data_fim
+    )
+    itens = itens_comanda.union_all(itens_online).subquery()
+    
+    # Um único GROUP BY sobre os itens das duas origens
+    quantidade = func.sum(itens.c.quantidade)
+    faturamento = func.coalesce(func.sum(itens.c.valor), 0.0)
+    ordem = quantidade if ordenar_por == "quantidade" else faturamento
+    linhas = db.execute(
+        select(
+            models.Produto.id, models.Produto.nome, models.Produto.categoria,
+            quantidade.label("quantidade"), faturamento.label("faturamento")
+        )
+        .join(itens, itens.c.produto_id == models.Produto.id)
+        .group_by(models.Produto.id, models.Produto.nome, models.Produto.categoria)
+        .order_by(ordem.desc(), models.Produto.id)
+        .limit(limite)
+    ).all()
+    
+    return [
+        schemas.ProdutoMaisVendido(
+            produto_id=linha.id,
+            nome=linha.nome,
+            categoria=linha.categoria,
+            quantidade=linha.quantidade,
+            faturamento=round(linha.faturamento, 2)
+        )
+        for linha in linhas
+    ]
+
+@app.get("/relatorios/tempos-preparo", response_model=schemas.TemposPreparo)
+def relatorio_tempos_preparo(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """p50 e p95 da espera (pendente -> preparando) e do preparo (preparando -> pronto), por produto e por hora.
+
+    Os tempos são em segundos. Com até historico_itens.LIMITE_PERCENTIL_EXATO
+    intervalos no período, os percentis são exatos, calculados a partir dos
+    eventos dos itens. Acima disso vêm do histograma mantido por
+    historico_itens.py e são o limite superior da faixa do percentil (até 10%
+    acima do valor exato); nesse caso `aproximado` é true. Os produtos vêm em
+    ordem do p95 de preparo, os mais lentos primeiro.
+    """
+    relatorio = schemas.TemposPreparo(data_inicio=data_inicio, data_fim=data_fim)
+    por_produto = {}
+    por_hora = {}
+    for linha in historico_itens.tempos_por_grupo(db, data_inicio, data_fim):
+        if linha.dimensao == "produto":
+            grupo = por_produto.setdefault(linha.chave, schemas.TemposPreparoProduto(produto_id=linha.chave, nome=""))
+        else:
+            grupo = por_hora.setdefault(linha.chave, schemas.TemposPreparoHora(hora=linha.chave))
+        setattr(grupo, linha.intervalo, schemas.TemposItens(
+            quantidade=linha.quantidade, p50=linha.p50, p95=linha.p95, aproximado=linha.aproximado
+        ))
+    
+    for produto_id, produto in cache_catalogo.produtos(db, por_produto.keys()).items():
+        por_produto[produto_id].nome = produto.nome
+    relatorio.por_produto = sorted(
+        por_produto.values(),
+        key=lambda grupo: (grupo.preparo.p95 is None, -(grupo.preparo.p95 or 0), grupo.produto_id)
+    )
+    relatorio.por_hora = list(por_hora.values())
+    return relatorio
+
+def _secoes_relatorio(db: Session, data_inicio: Optional[date], data_fim: Optional[date], status: Optional[List[str]]):
+    """Seções do relatório exportado; as linhas são lidas do cursor só quando consumidas"""
+    def resumo():
+        totais = relatorio_resumo(data_inicio=data_inicio, data_fim=data_fim, db=db)
+        for origem, por_status in (("comanda", totais.comandas), ("online", totais.pedidos_online)):
+            for nome_status, total in por_status.items():
+                if not status or nome_status in status:
+                    yield [origem, nome_status, total.quantidade, total.faturamento]
+    
+    def comandas():
+        query = _consultar_comandas_resumo(db).add_columns(models.Comanda.data_fechamento)
+        if status:
+            query = query.filter(models.Comanda.status.in_(status))
+        query = _filtrar_periodo(query, models.Comanda.data_abertura, data_inicio, data_fim)
+        for c in query.order_by(models.Comanda.id).yield_per(LINHAS_POR_BLOCO):
+            yield [c.id, c.mesa_numero, c.status, round(c.total or 0.0, 2), c.quantidade_itens, c.data_abertura, c.data_fechamento]
+    
+    def pedidos_online():
+        query = _consultar_pedidos_online_resumo(db)
+        if status:
+            query = query.filter(models.PedidoOnline.status.in_(status))
+        query = _filtrar_periodo(query, models.PedidoOnline.data_pedido, data_inicio, data_fim)
+        for p in query.order_by(models.PedidoOnline.id).yield_per(LINHAS_POR_BLOCO):
+            yield [p.id, p.nome_cliente, p.telefone, p.status, round(p.total or 0.0, 2), p.quantidade_itens, p.data_pedido]
+    
+    def produtos():
+        for p in cache_catalogo.listar(db):
+            yield [p.nome, p.categoria, p.preco, p.descricao or ""]
+    
+    return [
+        Secao("RESUMO", ["ORIGEM", "STATUS", "QUANTIDADE", "FATURAMENTO"], resumo()),
+        Secao("COMANDAS", ["COMANDA", "MESA", "STATUS", "TOTAL", "ITENS", "DATA ABERTURA", "DATA FECHAMENTO"], comandas()),
+        Secao("PEDIDOS ONLINE", ["PEDIDO ONLINE", "CLIENTE", "TELEFONE", "STATUS", "TOTAL", "ITENS", "DATA PEDIDO"], pedidos_online()),
+        Secao("PRODUTOS", ["PRODUTO", "CATEGORIA", "PREÇO", "DESCRIÇÃO"], produtos()),
+    ]
+
+@app.get("/relatorios/export")
+def exportar_relatorio(
+    formato: Annotated[str, Query(pattern="^(csv|xlsx)$")] = "csv",
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    status: Annotated[Optional[List[str]], Query()] = None,
+    db: Session = Depends(get_db)
+):
+    """Relatório de comandas, pedidos online e produtos, gerado enquanto é enviado"""
+    if formato == "xlsx" and not OPENPYXL_DISPONIVEL:
+        raise HTTPException(status_code=400, detail="Exportação em XLSX requer o pacote openpyxl")
+    
+    # A resposta é gerada depois que o endpoint retorna e a sessão da requisição
+    # é fechada, então o gerador usa uma sessão própria
+    sessao = Session(bind=db.get_bind())
+    secoes = _secoes_relatorio(sessao, data_inicio, data_fim, status)
+    agora = datetime.now()
+    
+    def gerar():
+        try:
+            if formato == "csv":
+                yield from gerar_csv(f"RELATÓRIO PADARIA - {agora.strftime('%d/%m/%Y %H:%M:%S')}", secoes)
+            else:
+                yield from gerar_xlsx(secoes)
+        finally:
+            sessao.close()
+    
+    nome_arquivo = f"relatorio_padaria_{agora.strftime('%Y%m%d_%H%M%S')}.{formato}"
+    return StreamingResponse(
+        gerar(),
+        media_type=TIPOS_CONTEUDO[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}"'}
+    )
+
+# Endpoint de sincronização incremental do desktop
+STATUS_COMANDAS_ATIVAS = ["aberta", "impressa", "aguardando_pagamento"]
+STATUS_PEDIDOS_FINALIZADOS = ["entregue", "cancelado"]
+
+@app.get("/sync", response_model=schemas.SincronizacaoDelta)
+def sincronizar_alteracoes(since: int = 0, db: Session = Depends(get_db)):
+    """Retorna o que mudou desde a versão `since`.
+
+    Com since=0 (ou uma versão que o servidor não conhece) devolve um retrato
+    inicial: todas as mesas e produtos, as comandas ativas ou abertas hoje e
+    os pedidos online do dia ou ainda em andamento.
+    """
+    atual = versionamento.versao_atual(db)
+    completo = since <= 0 or since > atual
+    comandas = _consultar_comandas_resumo(db)
+    pedidos = _consultar_pedidos_online_resumo(db)
+    produtos = db.query(models.Produto)
+    mesas = db.query(models.Mesa)
+    removidos = schemas.RegistrosRemovidos()
+
+    if completo:
+        inicio_do_dia = datetime.combine(date.today(), datetime.min.time())
+        comandas = comandas.filter(or_(
+            models.Comanda.status.in_(STATUS_COMANDAS_ATIVAS),
+            models.Comanda.data_abertura >= inicio_do_dia
+        ))
+        pedidos = pedidos.filter(or_(
+            models.PedidoOnline.status.notin_(STATUS_PEDIDOS_FINALIZADOS),
+            models.PedidoOnline.data_pedido >= inicio_do_dia
+        ))
+    else:
+        comandas = comandas.filter(models.Comanda.versao > since)
+        pedidos = pedidos.filter(models.PedidoOnline.versao > since)
+        produtos = produtos.filter(models.Produto.versao > since)
+        mesas = mesas.filter(models.Mesa.versao > since)
+        removidos_sync = db.query(models.RegistroRemovido).filter(
+            models.RegistroRemovido.versao > since,
+            models.RegistroRemovido.tabela.in_(versionamento.MODELOS_VERSIONADOS)
+        )
+        for registro in removidos_sync:
+            getattr(removidos, registro.tabela).append(registro.registro_id)
+
+    # Ordenado em memória: um ORDER BY id faria o SQLite percorrer a tabela
+    # inteira pela chave primária em vez de usar os índices de versao
+    por_id = lambda linha: linha.id
+    return schemas.SincronizacaoDelta(
+        versao=atual,
+        completo=completo,
+        comandas=_montar_comandas_resumo(sorted(comandas.all(), key=por_id)),
+        produtos=sorted(produtos.all(), key=por_id),
+        mesas=sorted(mesas.all(), key=por_id),
+        pedidos_online=_montar_pedidos_online_resumo(sorted(pedidos.all(), key=por_id)),
+        removidos=removidos
+    )
+
+# Endpoint de eventos em tempo real (Server-Sent Events)
+INTERVALO_KEEPALIVE_EVENTOS = 15  # segundos
+
+@app.get("/eventos")
+async def stream_eventos(request: Request):
+    """Envia, em tempo real, avisos de alteração em comandas, itens, pedidos online e reservas"""
+    fila = barramento.assinar()
+
+    async def gerar():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    evento = await asyncio.wait_for(fila.get(), timeout=INTERVALO_KEEPALIVE_EVENTOS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {evento['tipo']}\ndata: {json.dumps(evento)}\n\n"
+        finally:
+            barramento.cancelar_assinatura(fila)
+
+    return StreamingResponse(
+        gerar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Espera máxima de GET /comandas/{id}/status?aguardar=N (long-poll)
+ESPERA_MAXIMA_STATUS_COMANDA = 30  # segundos
+
+def _status_geral_itens(status_itens: List[str]) -> str:
+    """Resume o status dos itens de uma comanda"""
     if all(s == "pronto" for s in status_itens) and status_itens:
-        status_geral = "pronto"
+        return "pronto"
     elif any(s == "preparando" for s in status_itens):
-        status_geral = "preparando"
+        return "preparando"
     elif all(s == "pendente" for s in status_itens):
-        status_geral = "pendente"
-    else:
-        status_geral = "parcial"
+        return "pendente"
+    return "parcial"
+
+def _consultar_status_comanda(db: Session, comanda_id: int) -> dict:
+    """Comanda, número da mesa e itens com o nome do produto, em uma única consulta"""
+    linhas = (
+        db.query(
+            models.Comanda.id,
+            models.Comanda.status,
+            models.Mesa.numero,
+            models.ItemComanda.status.label("status_item"),
+            models.Produto.nome
+        )
+        .outerjoin(models.Mesa, models.Mesa.id == models.Comanda.mesa_id)
+        .outerjoin(models.ItemComanda, models.ItemComanda.comanda_id == models.Comanda.id)
+        .outerjoin(models.Produto, models.Produto.id == models.ItemComanda.produto_id)
+        .filter(models.Comanda.id == comanda_id)
+        .order_by(models.ItemComanda.id)
+        .all()
+    )
+    if not linhas:
+        raise HTTPException(status_code=404, detail="Comanda não encontrada")
+    # Sem itens, o LEFT JOIN devolve uma linha com status_item nulo
+    itens = [
+        {"produto": linha.nome or "", "status": linha.status_item}
+        for linha in linhas if linha.status_item is not None
+    ]
     return {
-        "comanda_id": comanda.id,
-        "mesa_numero": comanda.mesa.numero if comanda.mesa else None,
-        "status_comanda": comanda.status,
-        "status_geral_itens": status_geral,
-        "itens": [
-            {"produto": item.produto.nome if item.produto else "", "status": item.status}
-            for item in itens
-        ]
+        "comanda_id": linhas[0].id,
+        "mesa_numero": linhas[0].numero,
+        "status_comanda": linhas[0].status,
+        "status_geral_itens": _status_geral_itens([item["status"] for item in itens]),
+        "itens": itens
     }
 
+@app.get("/comandas/{comanda_id}/status")
+async def status_comanda(
+    comanda_id: int,
+    request: Request,
+    response: Response,
+    versao: Optional[str] = None,
+    aguardar: Annotated[int, Query(ge=0, le=ESPERA_MAXIMA_STATUS_COMANDA)] = 0,
+    db: Session = Depends(get_db)
+):
+    """Status da comanda e dos seus itens (tablets).
+    
+    O cliente pode enviar a versão que já conhece (header If-None-Match com o
+    ETag recebido, ou ?versao=). Se a comanda não mudou, a resposta é 304 sem
+    consultar o banco; com ?aguardar=N a requisição espera até N segundos por
+    uma alteração antes de responder 304 (long-poll).
+    """
+    # A versão é lida antes da consulta: se a comanda mudar no meio, o cliente
+    # recebe dados novos com a versão antiga e apenas busca de novo
+    atual = versoes_comandas.versao(comanda_id)
+    etag = f'"{atual}"'
+    
+    def conhecida():
+        return versao == atual or _etag_corresponde(request, etag)
+    
+    if conhecida() and aguardar:
+        await versoes_comandas.aguardar(comanda_id, atual, aguardar)
+        atual = versoes_comandas.versao(comanda_id)
+        etag = f'"{atual}"'
+    if conhecida():
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    
+    resultado = await run_in_threadpool(_consultar_status_comanda, db, comanda_id)
+    resultado["versao"] = atual
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return resultado
+
+# Painel da cozinha
+STATUS_ITENS_COZINHA = ["pendente", "preparando"]
+
+def _consultar_itens_cozinha(db: Session, since: int, completo: bool):
+    """Itens com a comanda, a mesa e o nome do produto, em uma única consulta.
+
+    No retrato completo, apenas os itens na fila (pendentes ou em preparo, de
+    comandas ativas). Na atualização incremental, os itens alterados depois de
+    `since`, por eles mesmos ou pela comanda, mesa ou produto; quem já saiu da
+    fila também vem, para o cliente removê-lo.
+    """
+    query = (
+        db.query(
+            models.ItemComanda.id,
+            models.ItemComanda.comanda_id,
+            models.Mesa.numero.label("mesa_numero"),
+            models.ItemComanda.produto_id,
+            models.Produto.nome.label("produto"),
+            models.ItemComanda.quantidade,
+            models.ItemComanda.observacoes,
+            models.ItemComanda.status,
+            models.Comanda.status.label("status_comanda"),
+            models.Comanda.data_abertura
+        )
+        .join(models.Comanda, models.Comanda.id == models.ItemComanda.comanda_id)
+        .outerjoin(models.Mesa, models.Mesa.id == models.Comanda.mesa_id)
+        .outerjoin(models.Produto, models.Produto.id == models.ItemComanda.produto_id)
+    )
+    if completo:
+        query = query.filter(
+            models.Comanda.status.in_(STATUS_COMANDAS_ATIVAS),
+            models.ItemComanda.status.in_(STATUS_ITENS_COZINHA)
+        )
+    else:
+        # Comandas encerradas antes de `since` já saíram do painel do cliente
+        query = query.filter(
+            or_(models.Comanda.status.in_(STATUS_COMANDAS_ATIVAS), models.Comanda.versao > since),
+            or_(
+                models.ItemComanda.versao > since,
+                models.Comanda.versao > since,
+                models.Mesa.versao > since,
+                models.Produto.versao > since
+            )
+        )
+    return query.order_by(models.ItemComanda.id).all()
+
+def _agrupar_itens_cozinha(itens: List[schemas.ItemCozinha]):
+    """Agrupa os itens por produto e por mesa, na ordem do item mais antigo"""
+    por_produto = {}
+    por_mesa = {}
+    for item in itens:
+        grupo = por_produto.setdefault(
+            item.produto_id,
+            schemas.GrupoProdutoCozinha(produto_id=item.produto_id, produto=item.produto)
+        )
+        setattr(grupo, item.status, getattr(grupo, item.status) + item.quantidade)
+        grupo.itens.append(item.id)
+
+        mesa = por_mesa.setdefault(item.mesa_numero, schemas.GrupoMesaCozinha(mesa_numero=item.mesa_numero))
+        if item.comanda_id not in mesa.comandas:
+            mesa.comandas.append(item.comanda_id)
+        mesa.itens.append(item.id)
+    return list(por_produto.values()), list(por_mesa.values())
+
+@app.get("/cozinha/painel", response_model=schemas.PainelCozinha)
+def painel_cozinha(since: int = 0, db: Session = Depends(get_db)):
+    """Fila da cozinha: itens pendentes e em preparo das comandas ativas.
+
+    Com since=0 (ou uma versão que o servidor não conhece) devolve a fila
+    inteira. Com a versão da resposta anterior, devolve apenas os itens que
+    mudaram: os que continuam na fila em `itens` e os que saíram em
+    `removidos`; os grupos por produto e por mesa trazem só os itens da
+    resposta, e o cliente reagrupa a fila que mantém.
+    """
+    atual = versionamento.versao_atual(db)
+    completo = since <= 0 or since > atual
+
+    itens = []
+    removidos = []
+    for linha in _consultar_itens_cozinha(db, since, completo):
+        if linha.status_comanda in STATUS_COMANDAS_ATIVAS and linha.status in STATUS_ITENS_COZINHA:
+            itens.append(schemas.ItemCozinha(
+                id=linha.id,
+                comanda_id=linha.comanda_id,
+                mesa_numero=linha.mesa_numero,
+                produto_id=linha.produto_id,
+                produto=linha.produto or "",
+                quantidade=linha.quantidade,
+                observacoes=linha.observacoes,
+                status=linha.status,
+                data_abertura=linha.data_abertura
+            ))
+        else:
+            removidos.append(linha.id)
+    if not completo:
+        removidos.extend(
+            registro_id for registro_id, in db.query(models.RegistroRemovido.registro_id).filter(
+                models.RegistroRemovido.tabela == models.ItemComanda.__tablename__,
+                models.RegistroRemovido.versao > since
+            )
+        )
+
+    por_produto, por_mesa = _agrupar_itens_cozinha(itens)
+    return schemas.PainelCozinha(
+        versao=atual,
+        completo=completo,
+        itens=itens,
+        por_produto=por_produto,
+        por_mesa=por_mesa,
+        removidos=removidos
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
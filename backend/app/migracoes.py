@@ -0,0 +1,362 @@
+"""
+Migrações versionadas do esquema do banco de dados
+
+Cada migração tem um número crescente e é aplicada uma única vez; os números
+já aplicados ficam registrados na tabela `migracoes_esquema`. Para levar um
+banco (novo ou antigo) até a versão mais recente, use `atualizar_banco()` ou
+o script da raiz `python migrar_banco.py`.
+
+Os bancos existentes foram criados em momentos diferentes e alterados à mão
+pelos antigos scripts add_*.py, então cada migração confere o que já existe
+antes de criar tabelas, colunas ou índices. Assim ela pode ser aplicada
+sobre qualquer um desses estados.
+
+Cada migração descreve o próprio esquema (tabelas em um MetaData só dela,
+colunas e índices por nome) e não consulta models.py: alterar um modelo não
+muda o que uma migração já publicada faz. Para alterar o esquema: mude o
+modelo em models.py e acrescente aqui uma nova função com
+`@migracao(<próximo número>, "<descrição>")` que faça a mesma mudança. Nunca
+altere uma migração que já foi publicada.
+"""
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    func, inspect, select, text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from .agregados import recalcular_agregados
+from .database import engine as engine_padrao
+
+class Migracao(NamedTuple):
+    versao: int
+    descricao: str
+    aplicar: Callable[[Connection], None]
+
+MIGRACOES: List[Migracao] = []
+
+def migracao(versao: int, descricao: str):
+    """Registra a função decorada como a migração de número `versao`"""
+    def registrar(funcao):
+        MIGRACOES.append(Migracao(versao, descricao, funcao))
+        MIGRACOES.sort(key=lambda m: m.versao)
+        return funcao
+    return registrar
+
+# Tabela de controle das migrações (também fixa: não depende de models.py)
+_controle = Table(
+    "migracoes_esquema", MetaData(),
+    Column("versao", Integer, primary_key=True),
+    Column("descricao", String, nullable=False),
+    Column("data_aplicacao", DateTime(timezone=True), server_default=func.now()),
+)
+
+# Utilitários usados pelas migrações
+
+def _referencia(metadata: MetaData, nome: str):
+    """Tabela já existente referenciada por chave estrangeira (não é criada)"""
+    if nome not in metadata.tables:
+        Table(nome, metadata, Column("id", Integer, primary_key=True))
+
+def _criar_tabelas(conn: Connection, *tabelas: Table):
+    """Cria as tabelas (com seus índices) que ainda não existem"""
+    for tabela in tabelas:
+        tabela.create(conn, checkfirst=True)
+
+def _adicionar_coluna(conn: Connection, tabela: str, coluna: str, definicao: str):
+    """ALTER TABLE ... ADD COLUMN, se a coluna ainda não existir"""
+    colunas = {col["name"] for col in inspect(conn).get_columns(tabela)}
+    if coluna not in colunas:
+        conn.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}"))
+
+def _criar_indice(conn: Connection, nome: str, tabela: str, *colunas: str, unico: bool = False):
+    """CREATE INDEX, se o índice ainda não existir"""
+    existentes = {indice["name"] for indice in inspect(conn).get_indexes(tabela)}
+    if nome not in existentes:
+        unique = "UNIQUE " if unico else ""
+        conn.execute(text(f"CREATE {unique}INDEX {nome} ON {tabela} ({', '.join(colunas)})"))
+
+def _remover_indice(conn: Connection, tabela: str, nome: str):
+    """DROP INDEX, se o índice existir"""
+    existentes = {indice["name"] for indice in inspect(conn).get_indexes(tabela)}
+    if nome in existentes:
+        conn.execute(text(f"DROP INDEX {nome}"))
+
+# Migrações
+
+@migracao(1, "Tabelas iniciais do sistema")
+def _tabelas_iniciais(conn):
+    m = MetaData()
+    _criar_tabelas(
+        conn,
+        Table(
+            "mesas", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("numero", Integer, unique=True, index=True),
+            Column("status", String),
+            Column("qr_code", String),
+        ),
+        Table(
+            "produtos", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("nome", String, index=True),
+            Column("preco", Float),
+            Column("categoria", String, index=True),
+            Column("descricao", Text),
+            Column("disponivel", Boolean),
+        ),
+        Table(
+            "comandas", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("mesa_id", Integer, ForeignKey("mesas.id")),
+            Column("status", String),
+            Column("total", Float),
+            Column("data_abertura", DateTime(timezone=True), server_default=func.now()),
+            Column("data_fechamento", DateTime(timezone=True)),
+            Column("data_impressao", DateTime(timezone=True)),
+            Column("observacoes", Text),
+            Column("chamando_garcom", Boolean),
+        ),
+        Table(
+            "itens_comanda", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("comanda_id", Integer, ForeignKey("comandas.id")),
+            Column("produto_id", Integer, ForeignKey("produtos.id")),
+            Column("quantidade", Integer),
+            Column("preco_unitario", Float),
+            Column("observacoes", Text),
+            Column("status", String),
+        ),
+        Table(
+            "garcons", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("nome", String, index=True),
+            Column("codigo", String, unique=True, index=True),
+            Column("ativo", Boolean),
+        ),
+        Table(
+            "atendimentos_garcom", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("garcom_id", Integer, ForeignKey("garcons.id")),
+            Column("comanda_id", Integer, ForeignKey("comandas.id")),
+            Column("data_atendimento", DateTime(timezone=True), server_default=func.now()),
+            Column("tipo", String),
+        ),
+        Table(
+            "sincronizacoes_offline", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("dispositivo_id", String, index=True),
+            Column("tipo_operacao", String),
+            Column("tabela", String),
+            Column("dados_json", Text),
+            Column("data_criacao", DateTime(timezone=True), server_default=func.now()),
+            Column("sincronizado", Boolean),
+            Column("data_sincronizacao", DateTime(timezone=True)),
+        ),
+        Table(
+            "clientes", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("nome", String, index=True),
+            Column("telefone", String, unique=True, index=True),
+            Column("endereco", Text),
+            Column("data_cadastro", DateTime(timezone=True), server_default=func.now()),
+        ),
+        Table(
+            "reservas", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("mesa_id", Integer, ForeignKey("mesas.id")),
+            Column("cliente_id", Integer, ForeignKey("clientes.id")),
+            Column("data_reserva", DateTime(timezone=True), nullable=False),
+            Column("horario_reserva", String, nullable=False),
+            Column("status", String),
+            Column("observacoes", Text),
+            Column("data_criacao", DateTime(timezone=True), server_default=func.now()),
+        ),
+        Table(
+            "pedidos_online", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("nome_cliente", String, index=True),
+            Column("telefone", String, index=True),
+            Column("endereco", Text),
+            Column("forma_pagamento", String),
+            Column("total", Float),
+            Column("status", String),
+            Column("observacoes", Text),
+            Column("data_pedido", DateTime(timezone=True), server_default=func.now()),
+            Column("data_confirmacao", DateTime(timezone=True)),
+            Column("data_entrega", DateTime(timezone=True)),
+            Column("whatsapp_enviado", Boolean),
+        ),
+        Table(
+            "itens_pedido_online", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("pedido_id", Integer, ForeignKey("pedidos_online.id")),
+            Column("produto_id", Integer, ForeignKey("produtos.id")),
+            Column("quantidade", Integer),
+            Column("preco_unitario", Float),
+            Column("observacoes", Text),
+        ),
+    )
+
+@migracao(2, "Campo chamando_garcom em comandas e status/qr_code em mesas")
+def _chamando_garcom(conn):
+    _adicionar_coluna(conn, "comandas", "chamando_garcom", "BOOLEAN DEFAULT FALSE")
+    _adicionar_coluna(conn, "mesas", "status", "VARCHAR DEFAULT 'livre'")
+    _adicionar_coluna(conn, "mesas", "qr_code", "VARCHAR")
+
+@migracao(3, "Versão de sincronização incremental")
+def _versao_sincronizacao(conn):
+    for tabela in ("mesas", "produtos", "comandas", "pedidos_online"):
+        _adicionar_coluna(conn, tabela, "versao", "INTEGER NOT NULL DEFAULT 0")
+        _criar_indice(conn, f"ix_{tabela}_versao", tabela, "versao")
+    m = MetaData()
+    _criar_tabelas(
+        conn,
+        Table(
+            "versao_sincronizacao", m,
+            Column("id", Integer, primary_key=True),
+            Column("valor", Integer, nullable=False),
+        ),
+        Table(
+            "registros_removidos", m,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("tabela", String, nullable=False),
+            Column("registro_id", Integer, nullable=False),
+            Column("versao", Integer, nullable=False, index=True),
+        ),
+    )
+
+@migracao(4, "Índices nas colunas de filtro de comandas, itens e reservas")
+def _indices_filtros(conn):
+    _criar_indice(conn, "ix_comandas_status", "comandas", "status")
+    _criar_indice(conn, "ix_comandas_data_abertura", "comandas", "data_abertura")
+    _criar_indice(conn, "ix_itens_comanda_comanda_id", "itens_comanda", "comanda_id")
+    _criar_indice(conn, "ix_reservas_mesa_id_status", "reservas", "mesa_id", "status")
+
+@migracao(5, "Índices compostos de comandas e reservas, pedidos online e sincronizações pendentes")
+def _indices_compostos(conn):
+    _criar_indice(conn, "ix_comandas_mesa_id_status", "comandas", "mesa_id", "status")
+    # O índice (mesa_id, status, data_reserva) substitui o (mesa_id, status) da migração 4
+    _remover_indice(conn, "reservas", "ix_reservas_mesa_id_status")
+    _criar_indice(conn, "ix_reservas_mesa_id_status_data_reserva", "reservas", "mesa_id", "status", "data_reserva")
+    _criar_indice(conn, "ix_pedidos_online_data_pedido", "pedidos_online", "data_pedido")
+    _criar_indice(conn, "ix_itens_pedido_online_pedido_id", "itens_pedido_online", "pedido_id")
+    _criar_indice(conn, "ix_sincronizacoes_offline_sincronizado", "sincronizacoes_offline", "sincronizado")
+
+@migracao(6, "Fila de mensagens do WhatsApp")
+def _fila_whatsapp(conn):
+    m = MetaData()
+    _referencia(m, "pedidos_online")
+    _criar_tabelas(conn, Table(
+        "mensagens_whatsapp", m,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("pedido_id", Integer, ForeignKey("pedidos_online.id"), index=True),
+        Column("conteudo", Text, nullable=False),
+        Column("status", String),
+        Column("tentativas", Integer),
+        Column("proxima_tentativa", DateTime(timezone=True), nullable=False),
+        Column("ultimo_erro", Text),
+        Column("data_criacao", DateTime(timezone=True), server_default=func.now()),
+        Column("data_envio", DateTime(timezone=True)),
+        Index("ix_mensagens_whatsapp_status_proxima_tentativa", "status", "proxima_tentativa"),
+    ))
+
+@migracao(7, "Agregados de vendas por dia e hora")
+def _vendas_agregadas(conn):
+    _criar_tabelas(conn, Table(
+        "vendas_agregadas", MetaData(),
+        Column("id", Integer, primary_key=True, index=True),
+        Column("data", Date, nullable=False),
+        Column("hora", Integer, nullable=False),
+        Column("origem", String, nullable=False),
+        Column("status", String, nullable=False),
+        Column("quantidade", Integer, nullable=False),
+        Column("faturamento", Float, nullable=False),
+        Index("ix_vendas_agregadas_data_hora_origem_status", "data", "hora", "origem", "status", unique=True),
+    ))
+    # Preenchimento inicial: só lê colunas de comandas e pedidos_online que
+    # existem desde a migração 1 e grava as colunas criadas acima
+    recalcular_agregados(conn)
+
+@migracao(8, "Versão de sincronização dos itens de comanda (painel da cozinha)")
+def _versao_itens_comanda(conn):
+    _adicionar_coluna(conn, "itens_comanda", "versao", "INTEGER NOT NULL DEFAULT 0")
+    _criar_indice(conn, "ix_itens_comanda_versao", "itens_comanda", "versao")
+
+@migracao(9, "Histórico de status dos itens de comanda e tempos de preparo")
+def _eventos_itens_comanda(conn):
+    m = MetaData()
+    _criar_tabelas(
+        conn,
+        Table(
+            "eventos_itens_comanda", m,
+            Column("id", Integer, primary_key=True),
+            Column("item_id", Integer, nullable=False, index=True),
+            Column("produto_id", Integer, nullable=False),
+            Column("status", String, nullable=False),
+            Column("momento", DateTime, nullable=False, index=True),
+        ),
+        Table(
+            "tempos_itens_agregados", m,
+            Column("id", Integer, primary_key=True),
+            Column("granularidade", String, nullable=False),
+            Column("data", Date, nullable=False),
+            Column("dimensao", String, nullable=False),
+            Column("chave", Integer, nullable=False),
+            Column("intervalo", String, nullable=False),
+            Column("faixa", Integer, nullable=False),
+            Column("quantidade", Integer, nullable=False),
+            Index("ix_tempos_itens_agregados_granularidade_data_dimensao_chave_intervalo_faixa",
+                  "granularidade", "data", "dimensao", "chave", "intervalo", "faixa", unique=True),
+        ),
+    )
+
+# Execução
+
+def versao_esquema(conn: Connection) -> int:
+    """Número da última migração aplicada (0 para um banco sem controle de migrações)"""
+    if not inspect(conn).has_table(_controle.name):
+        return 0
+    return conn.execute(select(func.max(_controle.c.versao))).scalar() or 0
+
+def versao_mais_recente() -> int:
+    return MIGRACOES[-1].versao if MIGRACOES else 0
+
+def migracoes_pendentes(engine: Engine = None) -> List[Migracao]:
+    engine = engine or engine_padrao
+    with engine.connect() as conn:
+        atual = versao_esquema(conn)
+    return [m for m in MIGRACOES if m.versao > atual]
+
+def _travar_migracoes(conn: Connection):
+    """Trava a aplicação de migrações até o fim da transação.
+
+    A API aplica as migrações ao iniciar, então vários workers podem tentar ao
+    mesmo tempo; com a trava, o segundo espera o primeiro e encontra a
+    migração já registrada.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"LOCK TABLE {_controle.name} IN SHARE ROW EXCLUSIVE MODE"))
+    else:
+        # No SQLite, a primeira escrita abre a transação de escrita, que é exclusiva
+        conn.execute(_controle.update().where(_controle.c.versao < 0).values(versao=_controle.c.versao))
+
+def atualizar_banco(engine: Engine = None) -> List[Migracao]:
+    """Aplica, em ordem, todas as migrações pendentes e retorna as que foram aplicadas"""
+    engine = engine or engine_padrao
+    with engine.begin() as conn:
+        conn.execute(CreateTable(_controle, if_not_exists=True))
+
+    aplicadas = []
+    for m in migracoes_pendentes(engine):
+        # Uma transação por migração: se uma falhar, as anteriores continuam registradas
+        with engine.begin() as conn:
+            _travar_migracoes(conn)
+            if versao_esquema(conn) >= m.versao:
+                continue  # Aplicada por outro processo enquanto esperávamos a trava
+            m.aplicar(conn)
+            conn.execute(_controle.insert().values(versao=m.versao, descricao=m.descricao))
+        aplicadas.append(m)
+    return aplicadas
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -10,6 +10,7 @@ class Mesa(Base):
     numero = Column(Integer, unique=True, index=True)
     status = Column(String, default="livre")  # livre, ocupada, reservada
     qr_code = Column(String, nullable=True)  # URL do QR Code
+    versao = Column(Integer, default=0, nullable=False, index=True)  # Versão de sincronização
     
     comandas = relationship("Comanda", back_populates="mesa")
     reservas = relationship("Reserva", back_populates="mesa")
@@ -23,21 +24,26 @@ class Produto(Base):
     categoria = Column(String, index=True)
     descricao = Column(Text, nullable=True)
     disponivel = Column(Boolean, default=True)  # Para controle de estoque
+    versao = Column(Integer, default=0, nullable=False, index=True)  # Versão de sincronização
     
     itens = relationship("ItemComanda", back_populates="produto")
 
 class Comanda(Base):
     __tablename__ = "comandas"
+    __table_args__ = (
+        Index("ix_comandas_mesa_id_status", "mesa_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     mesa_id = Column(Integer, ForeignKey("mesas.id"))
-    status = Column(String, default="aberta")  # aberta, aguardando_pagamento, fechada, impressa
+    status = Column(String, default="aberta", index=True)  # aberta, aguardando_pagamento, fechada, impressa
     total = Column(Float, default=0.0)
-    data_abertura = Column(DateTime(timezone=True), server_default=func.now())
+    data_abertura = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     data_fechamento = Column(DateTime(timezone=True), nullable=True)
     data_impressao = Column(DateTime(timezone=True), nullable=True)
     observacoes = Column(Text, nullable=True)  # Observações especiais
     chamando_garcom = Column(Boolean, default=False)  # Novo campo
+    versao = Column(Integer, default=0, nullable=False, index=True)  # Versão de sincronização
     
     mesa = relationship("Mesa", back_populates="comandas")
     itens = relationship("ItemComanda", back_populates="comanda")
@@ -46,12 +52,13 @@ class ItemComanda(Base):
     __tablename__ = "itens_comanda"
     
     id = Column(Integer, primary_key=True, index=True)
-    comanda_id = Column(Integer, ForeignKey("comandas.id"))
+    comanda_id = Column(Integer, ForeignKey("comandas.id"), index=True)
     produto_id = Column(Integer, ForeignKey("produtos.id"))
     quantidade = Column(Integer, default=1)
     preco_unitario = Column(Float)
     observacoes = Column(Text, nullable=True)  # Observações do item
     status = Column(String, default="pendente")  # pendente, preparando, pronto
+    versao = Column(Integer, default=0, nullable=False, index=True)  # Versão de sincronização (painel da cozinha)
     
     comanda = relationship("Comanda", back_populates="itens")
     produto = relationship("Produto", back_populates="itens")
@@ -86,7 +93,7 @@ class SincronizacaoOffline(Base):
     tabela = Column(String)  # comandas, itens_comanda, etc.
     dados_json = Column(Text)  # Dados da operação
     data_criacao = Column(DateTime(timezone=True), server_default=func.now())
-    sincronizado = Column(Boolean, default=False)
+    sincronizado = Column(Boolean, default=False, index=True)
     data_sincronizacao = Column(DateTime(timezone=True), nullable=True)
 
 class Cliente(Base):
@@ -102,6 +109,10 @@ class Cliente(Base):
 
 class Reserva(Base):
     __tablename__ = "reservas"
+    __table_args__ = (
+        # Atende tanto (mesa_id, status) quanto (mesa_id, data_reserva, status)
+        Index("ix_reservas_mesa_id_status_data_reserva", "mesa_id", "status", "data_reserva"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     mesa_id = Column(Integer, ForeignKey("mesas.id"))
@@ -126,10 +137,11 @@ class PedidoOnline(Base):
     total = Column(Float)
     status = Column(String, default="pendente")  # pendente, confirmado, preparando, entregando, entregue, cancelado
     observacoes = Column(Text, nullable=True)
-    data_pedido = Column(DateTime(timezone=True), server_default=func.now())
+    data_pedido = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     data_confirmacao = Column(DateTime(timezone=True), nullable=True)
     data_entrega = Column(DateTime(timezone=True), nullable=True)
     whatsapp_enviado = Column(Boolean, default=False)
+    versao = Column(Integer, default=0, nullable=False, index=True)  # Versão de sincronização
     
     itens = relationship("ItemPedidoOnline", back_populates="pedido")
 
@@ -137,11 +149,90 @@ class ItemPedidoOnline(Base):
     __tablename__ = "itens_pedido_online"
     
     id = Column(Integer, primary_key=True, index=True)
-    pedido_id = Column(Integer, ForeignKey("pedidos_online.id"))
+    pedido_id = Column(Integer, ForeignKey("pedidos_online.id"), index=True)
     produto_id = Column(Integer, ForeignKey("produtos.id"))
     quantidade = Column(Integer, default=1)
     preco_unitario = Column(Float)
     observacoes = Column(Text, nullable=True)
     
     pedido = relationship("PedidoOnline", back_populates="itens")
-    produto = relationship("Produto") 
\ No newline at end of file
+    produto = relationship("Produto")
+
+class MensagemWhatsApp(Base):
+    __tablename__ = "mensagens_whatsapp"
+    __table_args__ = (
+        Index("ix_mensagens_whatsapp_status_proxima_tentativa", "status", "proxima_tentativa"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    pedido_id = Column(Integer, ForeignKey("pedidos_online.id"), index=True)
+    conteudo = Column(Text, nullable=False)  # JSON com os dados do pedido
+    status = Column(String, default="pendente")  # pendente, enviada, falhou
+    tentativas = Column(Integer, default=0)
+    proxima_tentativa = Column(DateTime(timezone=True), nullable=False)
+    ultimo_erro = Column(Text, nullable=True)
+    data_criacao = Column(DateTime(timezone=True), server_default=func.now())
+    data_envio = Column(DateTime(timezone=True), nullable=True)
+
+class VendaAgregada(Base):
+    """Totais de comandas e pedidos online por dia, hora e status (mantidos por agregados.py)"""
+    __tablename__ = "vendas_agregadas"
+    __table_args__ = (
+        Index("ix_vendas_agregadas_data_hora_origem_status", "data", "hora", "origem", "status", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    data = Column(Date, nullable=False)  # Data de abertura da comanda / do pedido
+    hora = Column(Integer, nullable=False)  # 0 a 23
+    origem = Column(String, nullable=False)  # comanda, online
+    status = Column(String, nullable=False)  # Status atual das comandas/pedidos contados
+    quantidade = Column(Integer, nullable=False, default=0)
+    faturamento = Column(Float, nullable=False, default=0.0)  # Soma dos totais
+
+class VersaoSincronizacao(Base):
+    __tablename__ = "versao_sincronizacao"
+    
+    id = Column(Integer, primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)  # Última versão atribuída
+
+class RegistroRemovido(Base):
+    __tablename__ = "registros_removidos"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    tabela = Column(String, nullable=False)
+    registro_id = Column(Integer, nullable=False)
+    versao = Column(Integer, nullable=False, index=True)
+
+class EventoItemComanda(Base):
+    """Mudanças de status dos itens de comanda, só acrescentadas (mantidas por historico_itens.py)"""
+    __tablename__ = "eventos_itens_comanda"
+    
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, nullable=False, index=True)
+    produto_id = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)  # Status que o item passou a ter
+    momento = Column(DateTime, nullable=False, index=True)
+
+class TempoItemAgregado(Base):
+    """Histograma dos tempos de espera e preparo dos itens por dia e por mês (mantido por historico_itens.py)"""
+    __tablename__ = "tempos_itens_agregados"
+    __table_args__ = (
+        Index("ix_tempos_itens_agregados_granularidade_data_dimensao_chave_intervalo_faixa",
+              "granularidade", "data", "dimensao", "chave", "intervalo", "faixa", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    granularidade = Column(String, nullable=False)  # dia, mes
+    data = Column(Date, nullable=False)  # Dia (ou primeiro dia do mês) do início do intervalo
+    dimensao = Column(String, nullable=False)  # produto, hora
+    chave = Column(Integer, nullable=False)  # produto_id ou hora (0 a 23) do início do intervalo
+    intervalo = Column(String, nullable=False)  # espera, preparo
+    faixa = Column(Integer, nullable=False)  # Veja historico_itens.faixa
+    quantidade = Column(Integer, nullable=False, default=0)
+
+class MigracaoEsquema(Base):
+    __tablename__ = "migracoes_esquema"
+    
+    versao = Column(Integer, primary_key=True)  # Número da migração aplicada
+    descricao = Column(String, nullable=False)
+    data_aplicacao = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,158 @@
+"""
+Cache dos QR codes das mesas
+
+O QR code de uma mesa depende só da URL do cardápio, então cada imagem é
+gerada uma única vez. O PNG é guardado em disco (QR_CODE_CACHE_DIR) com o nome
+derivado do hash da URL e dos parâmetros de desenho, e os mais usados também
+ficam em um LRU limitado em memória. Se a URL ou o desenho mudarem, a chave
+muda também, e o arquivo antigo simplesmente deixa de ser usado.
+
+Montar a matriz do QR code é Python puro e segura o GIL, então threads não
+geram imagens em paralelo. A folha de impressão gera os que faltam no cache
+em processos separados (ProcessPoolExecutor sobre `renderizar_qr`) e grava
+o resultado em disco no processo da API.
+"""
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+from .configuracoes import QR_CODE_CACHE_DIR
+
+# Parâmetros de desenho; fazem parte da chave do cache
+QR_BOX_SIZE = 10
+QR_BORDA = 5
+
+TAMANHO_CACHE_MEMORIA = 256  # imagens mantidas em memória
+MAXIMO_PROCESSOS_RENDERIZACAO = 8
+
+# Folha para impressão: A4 em 150 dpi
+TAMANHO_FOLHA = (1240, 1754)
+ALTURA_LEGENDA = 70
+
+def chave_qr(menu_url: str) -> str:
+    """Chave do cache: hash da URL e dos parâmetros de desenho (usada também como ETag)"""
+    conteudo = f"{menu_url}|box={QR_BOX_SIZE}|borda={QR_BORDA}"
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+def renderizar_qr(menu_url: str) -> bytes:
+    """Gera o PNG do QR code, sem cache"""
+    qr = qrcode.QRCode(version=1, box_size=QR_BOX_SIZE, border=QR_BORDA)
+    qr.add_data(menu_url)
+    qr.make(fit=True)
+
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def _gravar_atomicamente(caminho: str, conteudo: bytes):
+    """Grava em um arquivo temporário e renomeia, para nunca expor um PNG incompleto"""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+def _caminho_qr(menu_url: str) -> str:
+    return os.path.join(QR_CODE_CACHE_DIR, f"{chave_qr(menu_url)}.png")
+
+def _ler_do_disco(menu_url: str) -> Optional[bytes]:
+    try:
+        with open(_caminho_qr(menu_url), "rb") as arquivo:
+            return arquivo.read()
+    except FileNotFoundError:
+        return None
+
+def _gravar_em_disco(menu_url: str, png: bytes) -> bool:
+    try:
+        _gravar_atomicamente(_caminho_qr(menu_url), png)
+        return True
+    except OSError as e:
+        # Sem disco o QR code continua sendo servido, apenas não é persistido
+        print(f"[AVISO] Não foi possível gravar QR code em cache: {e}")
+        return False
+
+@lru_cache(maxsize=TAMANHO_CACHE_MEMORIA)
+def obter_qr_png(menu_url: str) -> bytes:
+    """PNG do QR code: memória, depois disco e, por último, gera e grava em disco"""
+    png = _ler_do_disco(menu_url)
+    if png is None:
+        png = renderizar_qr(menu_url)
+        _gravar_em_disco(menu_url, png)
+    return png
+
+def obter_varios_qr_png(menu_urls: List[str]) -> List[bytes]:
+    """PNGs de várias URLs; os que não estão em disco são gerados em paralelo, em processos"""
+    faltando = [url for url in dict.fromkeys(menu_urls) if not os.path.exists(_caminho_qr(url))]
+    gerados = {}
+    processos = min(MAXIMO_PROCESSOS_RENDERIZACAO, os.cpu_count() or 1, len(faltando))
+    if processos > 1:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            gerados = dict(zip(faltando, executor.map(renderizar_qr, faltando)))
+        # Os gravados saem do disco pelo obter_qr_png abaixo, que também enche o LRU
+        gerados = {url: png for url, png in gerados.items() if not _gravar_em_disco(url, png)}
+    # Com uma CPU só, os que faltam são gerados aqui mesmo pelo obter_qr_png
+    return [gerados.get(url) or obter_qr_png(url) for url in menu_urls]
+
+def _fonte_legenda(tamanho: int):
+    try:
+        return ImageFont.load_default(size=tamanho)
+    except TypeError:
+        # Pillow < 10.1 só tem a fonte bitmap fixa
+        return ImageFont.load_default()
+
+def montar_folhas_qr(mesas: List[Tuple[int, bytes]], colunas: int = 3, linhas: int = 4) -> List[Image.Image]:
+    """Distribui os QR codes (número da mesa, PNG) em folhas A4 com a legenda "Mesa N" """
+    largura_folha, altura_folha = TAMANHO_FOLHA
+    largura_celula = largura_folha // colunas
+    altura_celula = altura_folha // linhas
+    lado_qr = min(largura_celula, altura_celula - ALTURA_LEGENDA) - 20
+    fonte = _fonte_legenda(36)
+    por_folha = colunas * linhas
+
+    folhas = []
+    for inicio in range(0, len(mesas), por_folha):
+        folha = Image.new("RGB", TAMANHO_FOLHA, "white")
+        desenho = ImageDraw.Draw(folha)
+        for posicao, (numero, png) in enumerate(mesas[inicio:inicio + por_folha]):
+            x = (posicao % colunas) * largura_celula
+            y = (posicao // colunas) * altura_celula
+            # Linha de corte em volta de cada QR code
+            desenho.rectangle([x, y, x + largura_celula - 1, y + altura_celula - 1], outline="#cccccc")
+
+            qr = Image.open(BytesIO(png)).convert("RGB").resize((lado_qr, lado_qr), Image.NEAREST)
+            folha.paste(qr, (x + (largura_celula - lado_qr) // 2, y + 10))
+
+            legenda = f"Mesa {numero}"
+            largura_texto = desenho.textlength(legenda, font=fonte)
+            desenho.text(
+                (x + (largura_celula - largura_texto) / 2, y + 10 + lado_qr + 10),
+                legenda, fill="black", font=fonte
+            )
+        folhas.append(folha)
+    return folhas
+
+def folhas_para_bytes(folhas: List[Image.Image], formato: str) -> bytes:
+    """PDF com uma página por folha, ou PNG com as folhas uma abaixo da outra"""
+    buffer = BytesIO()
+    if formato == "pdf":
+        folhas[0].save(buffer, format="PDF", save_all=True, append_images=folhas[1:], resolution=150)
+    else:
+        largura, altura = TAMANHO_FOLHA
+        imagem = Image.new("RGB", (largura, altura * len(folhas)), "white")
+        for indice, folha in enumerate(folhas):
+            imagem.paste(folha, (0, indice * altura))
+        imagem.save(buffer, format="PNG")
+    return buffer.getvalue()
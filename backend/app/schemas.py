@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import date, datetime
 
 # Schemas para Mesa
 class MesaBase(BaseModel):
@@ -53,6 +53,21 @@ class ItemComanda(ItemComandaBase):
     class Config:
         from_attributes = True
 
+class AtualizacaoStatusItens(BaseModel):
+    status: str  # pendente, preparando, pronto
+    item_ids: Optional[List[int]] = None  # Ou comanda_id: todos os itens da comanda
+    comanda_id: Optional[int] = None
+
+class StatusItensComanda(BaseModel):
+    comanda_id: int
+    status_geral_itens: str  # pendente, preparando, pronto, parcial
+
+class ResultadoStatusItens(BaseModel):
+    status: str
+    atualizados: List[int] = []
+    ignorados: List[int] = []  # Itens pedidos (ou da comanda) que não existem, não estão em comanda ativa ou não podem ir para o status
+    comandas: List[StatusItensComanda] = []
+
 # Schemas para Comanda
 class ComandaBase(BaseModel):
     mesa_id: int
@@ -200,6 +215,18 @@ class ReservaResumo(BaseModel):
     class Config:
         from_attributes = True
 
+class DisponibilidadeMesa(BaseModel):
+    mesa_id: int
+    numero: int
+    status: str
+    livres: List[str]  # Horários "HH:MM" ainda livres no dia
+
+class DisponibilidadeDia(BaseModel):
+    data: date
+    duracao: int  # Minutos que cada reserva ocupa a mesa
+    horarios: List[str]  # Todos os horários oferecidos no dia
+    mesas: List[DisponibilidadeMesa]
+
 # Schemas para QR Code
 class QRCodeResponse(BaseModel):
     mesa_id: int
@@ -258,4 +285,112 @@ class PedidoOnlineResumo(BaseModel):
     quantidade_itens: int
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+# Schemas para sincronização incremental (GET /sync)
+class RegistrosRemovidos(BaseModel):
+    comandas: List[int] = []
+    produtos: List[int] = []
+    mesas: List[int] = []
+    pedidos_online: List[int] = []
+
+class SincronizacaoDelta(BaseModel):
+    versao: int
+    completo: bool  # True quando o cliente deve descartar o estado local
+    comandas: List[ComandaResumo] = []
+    produtos: List[Produto] = []
+    mesas: List[Mesa] = []
+    pedidos_online: List[PedidoOnlineResumo] = []
+    removidos: RegistrosRemovidos
+
+# Schemas para o painel da cozinha (GET /cozinha/painel)
+class ItemCozinha(BaseModel):
+    id: int
+    comanda_id: int
+    mesa_numero: Optional[int] = None
+    produto_id: int
+    produto: str
+    quantidade: int
+    observacoes: Optional[str] = None
+    status: str  # pendente, preparando
+    data_abertura: Optional[datetime] = None  # Da comanda
+
+class GrupoProdutoCozinha(BaseModel):
+    produto_id: int
+    produto: str
+    pendente: int = 0  # Quantidade a preparar
+    preparando: int = 0
+    itens: List[int] = []
+
+class GrupoMesaCozinha(BaseModel):
+    mesa_numero: Optional[int] = None
+    comandas: List[int] = []
+    itens: List[int] = []
+
+class PainelCozinha(BaseModel):
+    versao: int
+    completo: bool  # True quando o cliente deve descartar o estado local
+    itens: List[ItemCozinha] = []
+    por_produto: List[GrupoProdutoCozinha] = []
+    por_mesa: List[GrupoMesaCozinha] = []
+    removidos: List[int] = []  # Itens que saíram da fila (prontos, comanda encerrada ou removidos)
+
+# Schemas para relatórios (agregados de vendas)
+class VendaAgregada(BaseModel):
+    data: date
+    hora: Optional[int] = None  # Preenchida apenas no agrupamento por hora
+    origem: str  # comanda, online
+    status: str
+    quantidade: int
+    faturamento: float
+
+class TotalVendas(BaseModel):
+    quantidade: int = 0
+    faturamento: float = 0.0
+
+class ResumoVendas(BaseModel):
+    data_inicio: Optional[date] = None
+    data_fim: Optional[date] = None
+    comandas: Dict[str, TotalVendas] = {}  # Por status
+    pedidos_online: Dict[str, TotalVendas] = {}  # Por status
+
+class ContadoresComandas(BaseModel):
+    data_inicio: Optional[date] = None
+    data_fim: Optional[date] = None
+    por_status: Dict[str, TotalVendas] = {}
+    total: int = 0
+    abertas: int = 0
+    para_impressao: int = 0  # aberta ou impressa
+    aguardando_pagamento: int = 0
+    fechadas: int = 0
+    faturamento: float = 0.0  # Das comandas fechadas
+
+class TemposItens(BaseModel):
+    quantidade: int = 0
+    p50: Optional[float] = None  # Segundos
+    p95: Optional[float] = None
+    aproximado: bool = False  # p50/p95 são o limite superior da faixa do histograma (até 10% acima)
+
+class TemposPreparoGrupo(BaseModel):
+    espera: TemposItens = TemposItens()  # pendente -> preparando
+    preparo: TemposItens = TemposItens()  # preparando -> pronto
+
+class TemposPreparoProduto(TemposPreparoGrupo):
+    produto_id: int
+    nome: str
+
+class TemposPreparoHora(TemposPreparoGrupo):
+    hora: int  # Hora do início do intervalo
+
+class TemposPreparo(BaseModel):
+    data_inicio: Optional[date] = None
+    data_fim: Optional[date] = None
+    por_produto: List[TemposPreparoProduto] = []
+    por_hora: List[TemposPreparoHora] = []
+
+class ProdutoMaisVendido(BaseModel):
+    produto_id: int
+    nome: str
+    categoria: str
+    quantidade: int
+    faturamento: float
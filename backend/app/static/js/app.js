@@ -100,20 +100,43 @@ async function loadProducts() {
     }
 }
 
-// Carregar mesas da API
-async function loadMesas() {
+// Disponibilidade do dia escolhido (GET /reservas/disponibilidade)
+let disponibilidadeDia = null;
+
+function dataDeHoje() {
+    return new Date().toISOString().split('T')[0];
+}
+
+// Carregar mesas e horários livres do dia em uma única requisição
+async function loadMesas(data) {
+    const campoData = document.getElementById('dataDisponibilidade');
+    data = data || (campoData && campoData.value) || dataDeHoje();
+    if (campoData) campoData.value = data;
+    
     try {
-        const response = await fetch(`${CONFIG.API_BASE_URL}/mesas/`);
+        const response = await fetch(`${CONFIG.API_BASE_URL}/reservas/disponibilidade?data=${data}`);
         if (!response.ok) throw new Error('Erro ao carregar mesas');
         
-        const mesas = await response.json();
-        renderMesas(mesas);
+        disponibilidadeDia = await response.json();
+        renderMesas(disponibilidadeDia.mesas.map(mesa => ({
+            id: mesa.mesa_id,
+            numero: mesa.numero,
+            status: mesa.status,
+            livres: mesa.livres
+        })));
     } catch (error) {
         console.error('Erro ao carregar mesas:', error);
         showError('Erro ao carregar mesas. Tente novamente.');
     }
 }
 
+// Horários livres de uma mesa no dia carregado
+function horariosLivresMesa(mesaId) {
+    if (!disponibilidadeDia) return [];
+    const mesa = disponibilidadeDia.mesas.find(m => m.mesa_id === mesaId);
+    return mesa ? mesa.livres : [];
+}
+
 // Renderizar mesas
 function renderMesas(mesas) {
     const mesasGrid = document.getElementById('mesasGrid');
@@ -161,9 +184,10 @@ function createMesaCard(mesa) {
     
     const statusText = statusTexts[mesa.status] || mesa.status.toUpperCase();
     
-    // Botão baseado no status
+    // Botão baseado nos horários livres do dia (uma mesa ocupada agora pode ser reservada para depois)
+    const livres = mesa.livres || [];
     let actionButton = '';
-    if (mesa.status === 'livre') {
+    if (livres.length > 0) {
         actionButton = `
             <button class="mesa-btn reservar" onclick="abrirModalReserva(${mesa.id})">
                 <i class="fas fa-bookmark"></i>
@@ -192,6 +216,11 @@ function createMesaCard(mesa) {
         </div>
         <div class="mesa-numero">Mesa ${mesa.numero}</div>
         <div class="mesa-status ${mesa.status}">${statusText}</div>
+        <div class="mesa-horarios">
+            ${livres.length > 0
+                ? `${livres.length} horário(s) livre(s): ${livres.join(', ')}`
+                : 'Sem horários livres neste dia'}
+        </div>
         <div class="mesa-actions">
             ${actionButton}
         </div>
@@ -873,14 +902,34 @@ document.addEventListener('click', (e) => {
 let mesaSelecionada = null;
 let clienteAtual = null;
 
+// Preencher o select de horários com os horários livres da mesa selecionada
+function preencherHorarios(selectId) {
+    const select = document.getElementById(selectId);
+    const livres = horariosLivresMesa(mesaSelecionada);
+    select.innerHTML = livres.length > 0
+        ? '<option value="">Selecione o horário</option>' +
+          livres.map(horario => `<option value="${horario}">${horario}</option>`).join('')
+        : '<option value="">Nenhum horário livre nesta data</option>';
+}
+
+// Ao trocar a data no modal, recarregar a disponibilidade do dia (uma requisição)
+async function trocarDataReserva(campoId, selectId) {
+    const data = document.getElementById(campoId).value;
+    if (!data) return;
+    await loadMesas(data);
+    preencherHorarios(selectId);
+}
+
 // Abrir modal de reserva
 function abrirModalReserva(mesaId) {
     mesaSelecionada = mesaId;
     document.getElementById('reservaModal').classList.add('show');
     
-    // Definir data mínima como hoje
-    const hoje = new Date().toISOString().split('T')[0];
+    // Definir data mínima como hoje e começar pelo dia exibido nas mesas
+    const hoje = dataDeHoje();
     document.getElementById('dataReserva').min = hoje;
+    document.getElementById('dataReserva').value = disponibilidadeDia ? disponibilidadeDia.data : hoje;
+    preencherHorarios('horarioReserva');
 }
 
 // Fechar modal de reserva
@@ -899,9 +948,11 @@ function abrirModalClienteExistente(cliente) {
     document.getElementById('clienteTelefoneExibicao').textContent = cliente.telefone;
     document.getElementById('clienteEnderecoExibicao').textContent = cliente.endereco;
     
-    // Definir data mínima como hoje
-    const hoje = new Date().toISOString().split('T')[0];
+    // Definir data mínima como hoje e começar pelo dia exibido nas mesas
+    const hoje = dataDeHoje();
     document.getElementById('dataReservaExistente').min = hoje;
+    document.getElementById('dataReservaExistente').value = disponibilidadeDia ? disponibilidadeDia.data : hoje;
+    preencherHorarios('horarioReservaExistente');
     
     document.getElementById('clienteModal').classList.add('show');
 }
@@ -941,6 +992,18 @@ document.addEventListener('DOMContentLoaded', function() {
     if (reservaForm) {
         reservaForm.addEventListener('submit', handleReservaForm);
     }
+    
+    const campos = [
+        ['dataDisponibilidade', null],
+        ['dataReserva', 'horarioReserva'],
+        ['dataReservaExistente', 'horarioReservaExistente']
+    ];
+    campos.forEach(([campoId, selectId]) => {
+        const campo = document.getElementById(campoId);
+        if (!campo) return;
+        campo.min = dataDeHoje();
+        campo.addEventListener('change', () => selectId ? trocarDataReserva(campoId, selectId) : loadMesas(campo.value));
+    });
 });
 
 // Processar formulário de reserva
@@ -955,9 +1018,13 @@ async function handleReservaForm(e) {
         const clienteResponse = await fetch(`${CONFIG.API_BASE_URL}/clientes/telefone/${telefone}`);
         
         if (clienteResponse.ok) {
-            // Cliente existe - mostrar modal de cliente existente
+            // Cliente existe - mostrar modal de cliente existente (mantendo a mesa e a data escolhidas)
             const cliente = await clienteResponse.json();
+            const mesaId = mesaSelecionada;
+            const data = formData.get('dataReserva');
             closeReservaModal();
+            mesaSelecionada = mesaId;
+            if (data && (!disponibilidadeDia || disponibilidadeDia.data !== data)) await loadMesas(data);
             abrirModalClienteExistente(cliente);
             return;
         }
@@ -0,0 +1,99 @@
+"""
+Versionamento de alterações para a sincronização incremental (GET /sync e
+GET /cozinha/painel)
+
+Toda vez que uma transação grava mesas, produtos, comandas, itens de comanda
+ou pedidos online, ela recebe um novo número de versão, tirado de um contador
+de linha única (`versao_sincronizacao`). Os registros inseridos ou alterados
+recebem essa versão na coluna `versao`, e os removidos deixam uma marca em
+`registros_removidos`.
+
+O número só é tirado no commit: os flushes apenas anotam em session.info quais
+registros mudaram, e antes do COMMIT um UPDATE no contador reserva a versão e
+outro grava a coluna `versao` desses registros. A trava da linha do contador
+vale até o commit, então as versões ficam visíveis em ordem crescente (quem
+sincroniza até a versão N nunca perde uma versão menor confirmada depois),
+mas cada transação segura a trava só durante o próprio commit, não do
+primeiro flush até o fim.
+"""
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import eventos, models
+
+# Modelos sincronizados com o desktop, indexados pelo nome da coleção em /sync
+MODELOS_VERSIONADOS = {
+    "comandas": models.Comanda,
+    "produtos": models.Produto,
+    "mesas": models.Mesa,
+    "pedidos_online": models.PedidoOnline,
+}
+
+# Os itens de comanda também recebem versão (para GET /cozinha/painel?since=),
+# mas não fazem parte do /sync
+_TIPOS_VERSIONADOS = tuple(MODELOS_VERSIONADOS.values()) + (models.ItemComanda,)
+
+def versao_atual(db: Session) -> int:
+    """Retorna a última versão atribuída (0 se nada foi gravado ainda)"""
+    valor = db.execute(
+        select(models.VersaoSincronizacao.valor).where(models.VersaoSincronizacao.id == 1)
+    ).scalar()
+    return valor or 0
+
+def proxima_versao(db: Session) -> int:
+    """Reserva um novo número de versão na transação da sessão (trava o contador até o commit)"""
+    conexao = db.connection()
+    resultado = conexao.execute(
+        update(models.VersaoSincronizacao)
+        .where(models.VersaoSincronizacao.id == 1)
+        .values(valor=models.VersaoSincronizacao.valor + 1)
+    )
+    if resultado.rowcount == 0:
+        conexao.execute(models.VersaoSincronizacao.__table__.insert().values(id=1, valor=1))
+        return 1
+    return conexao.execute(
+        select(models.VersaoSincronizacao.valor).where(models.VersaoSincronizacao.id == 1)
+    ).scalar()
+
+def anotar_alterados(session: Session, modelo, ids):
+    """Anota registros gravados sem o ORM (UPDATE em lote) para receberem a versão no commit"""
+    session.info.setdefault("versao_alterados", {}).setdefault(modelo.__table__, set()).update(ids)
+
+@event.listens_for(Session, "after_flush")
+def _anotar_alterados(session, flush_context):
+    alterados = [obj for obj in session.new if isinstance(obj, _TIPOS_VERSIONADOS)] + [
+        obj for obj in session.dirty
+        if isinstance(obj, _TIPOS_VERSIONADOS) and session.is_modified(obj, include_collections=False)
+    ]
+    for obj in alterados:
+        anotar_alterados(session, type(obj), [obj.id])
+    removidos = session.info.setdefault("versao_removidos", [])
+    for obj in session.deleted:
+        if isinstance(obj, _TIPOS_VERSIONADOS):
+            removidos.append((obj.__tablename__, obj.id))
+
+@event.listens_for(Session, "before_commit")
+def _atribuir_versao(session):
+    # before_commit vem antes do flush final do commit: grava o que falta
+    # para que as últimas alterações também sejam anotadas
+    session.flush()
+    alterados = session.info.pop("versao_alterados", {})
+    removidos = session.info.pop("versao_removidos", [])
+    if not (alterados or removidos):
+        return
+
+    versao = proxima_versao(session)
+    conexao = session.connection()
+    for tabela, ids in alterados.items():
+        conexao.execute(update(tabela).where(tabela.c.id.in_(sorted(ids))).values(versao=versao))
+    if removidos:
+        conexao.execute(insert(models.RegistroRemovido), [
+            {"tabela": tabela, "registro_id": registro_id, "versao": versao}
+            for tabela, registro_id in removidos
+        ])
+    eventos.completar_versao(session, versao)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_alterados(session, previous_transaction):
+    session.info.pop("versao_alterados", None)
+    session.info.pop("versao_removidos", None)
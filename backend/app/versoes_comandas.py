@@ -0,0 +1,135 @@
+"""
+Versões das comandas em memória, para GET /comandas/{id}/status
+
+Os tablets perguntam o status da comanda a cada poucos segundos, e quase
+sempre nada mudou. Cada comanda tem aqui um número de versão, incrementado
+depois do commit que altera a comanda ou os seus itens (mesma anotação em
+session.info usada por eventos.py). O cliente envia a versão que já conhece
+e, se ela ainda é a atual, recebe 304 sem nenhuma consulta ao banco, ou
+espera (long-poll) até a comanda mudar.
+
+A versão inclui um identificador do processo e uma geração global, que muda
+quando mesas ou produtos são alterados (número da mesa e nome dos produtos
+fazem parte da resposta). Como o mapa fica na memória de um único processo,
+gravações feitas por fora da API (outro processo ou SQL direto) não mudam a
+versão; nesse caso chame `versoes_comandas.alterar_todas()`.
+"""
+import asyncio
+import threading
+import uuid
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Atributos de outros modelos que fazem parte da resposta do status da comanda
+ATRIBUTOS_EXIBIDOS = {models.Mesa: "numero", models.Produto: "nome"}
+
+class VersoesComandas:
+    """Versão de cada comanda e esperas (long-poll) por uma nova versão"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processo = uuid.uuid4().hex[:8]
+        self._geracao = 0
+        self._versoes: Dict[int, int] = {}
+        self._aguardando: Dict[int, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+    def versao(self, comanda_id: int) -> str:
+        with self._lock:
+            return self._versao(comanda_id)
+
+    def _versao(self, comanda_id: int) -> str:
+        return f"{self._processo}-{self._geracao}-{self._versoes.get(comanda_id, 0)}"
+
+    def alterar(self, comanda_ids: Iterable[int]):
+        """Nova versão para as comandas; acorda quem espera por elas"""
+        with self._lock:
+            despertar = []
+            for comanda_id in set(comanda_ids):
+                self._versoes[comanda_id] = self._versoes.get(comanda_id, 0) + 1
+                despertar.extend(self._aguardando.get(comanda_id, []))
+        self._despertar(despertar)
+
+    def alterar_todas(self):
+        with self._lock:
+            self._geracao += 1
+            despertar = [espera for esperas in self._aguardando.values() for espera in esperas]
+        self._despertar(despertar)
+
+    async def aguardar(self, comanda_id: int, versao: str, timeout: float) -> bool:
+        """Espera a comanda deixar de estar na versão `versao`; False se o tempo acabou"""
+        espera = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self._versao(comanda_id) != versao:
+                return True
+            self._aguardando.setdefault(comanda_id, []).append(espera)
+        try:
+            await asyncio.wait_for(espera[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                esperas = self._aguardando.get(comanda_id, [])
+                if espera in esperas:
+                    esperas.remove(espera)
+                if not esperas:
+                    self._aguardando.pop(comanda_id, None)
+
+    def quantidade_aguardando(self) -> int:
+        with self._lock:
+            return sum(len(esperas) for esperas in self._aguardando.values())
+
+    @staticmethod
+    def _despertar(esperas):
+        # O commit acontece na thread da requisição; o evento é do event loop do long-poll
+        for loop, evento in esperas:
+            try:
+                loop.call_soon_threadsafe(evento.set)
+            except RuntimeError:
+                # Event loop já encerrado
+                pass
+
+versoes_comandas = VersoesComandas()
+
+def anotar_comandas(session: Session, comanda_ids: Iterable[int]):
+    """Anota comandas alteradas sem o ORM (UPDATE em lote); a versão muda após o commit"""
+    session.info.setdefault("comandas_alteradas", set()).update(comanda_ids)
+
+@event.listens_for(Session, "after_flush")
+def _anotar_comandas(session, flush_context):
+    alteradas = set()
+    todas = False
+    for colecao in (session.new, session.dirty, session.deleted):
+        for obj in colecao:
+            if colecao is session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            if isinstance(obj, models.Comanda):
+                alteradas.add(obj.id)
+            elif isinstance(obj, models.ItemComanda):
+                alteradas.add(obj.comanda_id)
+            elif isinstance(obj, tuple(ATRIBUTOS_EXIBIDOS)) and colecao is not session.new:
+                # Só o número da mesa e o nome do produto aparecem na resposta
+                atributo = ATRIBUTOS_EXIBIDOS[type(obj)]
+                if colecao is session.deleted or inspect(obj).attrs[atributo].history.has_changes():
+                    todas = True
+    if alteradas:
+        anotar_comandas(session, alteradas)
+    if todas:
+        session.info["comandas_todas_alteradas"] = True
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_versoes(session):
+    alteradas = session.info.pop("comandas_alteradas", None)
+    if session.info.pop("comandas_todas_alteradas", False):
+        versoes_comandas.alterar_todas()
+    elif alteradas:
+        versoes_comandas.alterar(alteradas)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_versoes(session, previous_transaction):
+    session.info.pop("comandas_alteradas", None)
+    session.info.pop("comandas_todas_alteradas", None)
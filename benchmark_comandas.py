@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark da listagem de comandas (GET /comandas/)
+
+Popula um banco SQLite temporário com volumes crescentes de comandas e mede
+quantas consultas SQL e quanto tempo cada chamada de `listar_comandas` leva.
+O número de consultas deve permanecer constante, independente do volume.
+"""
+import os
+import sys
+import tempfile
+import time
+
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import models
+from backend.app.main import listar_comandas
+
+VOLUMES = [100, 1000, 5000]
+ITENS_POR_COMANDA = 3
+NUMERO_MESAS = 20
+
+def popular_banco(session, quantidade_comandas):
+    """Cria mesas, produtos, comandas e itens para o benchmark"""
+    mesas = [models.Mesa(numero=i, status="livre") for i in range(1, NUMERO_MESAS + 1)]
+    produtos = [
+        models.Produto(nome=f"Produto {i}", preco=2.5 + i, categoria="Pães", disponivel=True)
+        for i in range(1, 11)
+    ]
+    session.add_all(mesas + produtos)
+    session.flush()
+
+    for i in range(quantidade_comandas):
+        comanda = models.Comanda(
+            mesa_id=mesas[i % NUMERO_MESAS].id,
+            status="fechada" if i % 4 else "aberta",
+            total=0.0
+        )
+        session.add(comanda)
+        session.flush()
+        for j in range(ITENS_POR_COMANDA):
+            produto = produtos[(i + j) % len(produtos)]
+            session.add(models.ItemComanda(
+                comanda_id=comanda.id,
+                produto_id=produto.id,
+                quantidade=1,
+                preco_unitario=produto.preco
+            ))
+            comanda.total += produto.preco
+    session.commit()
+
+def medir(quantidade_comandas):
+    """Retorna (consultas, segundos, linhas) para uma chamada de listar_comandas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        session = Session()
+        popular_banco(session, quantidade_comandas)
+        session.close()
+
+        consultas = []
+
+        def contar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(engine, "before_cursor_execute", contar)
+        session = Session()
+        try:
+            inicio = time.perf_counter()
+            resultado = listar_comandas(Response(), db=session)
+            duracao = time.perf_counter() - inicio
+        finally:
+            session.close()
+            event.remove(engine, "before_cursor_execute", contar)
+            engine.dispose()
+
+        return len(consultas), duracao, len(resultado)
+
+def main():
+    print("🍞 Benchmark - GET /comandas/")
+    print("=" * 60)
+    print(f"{'Comandas':>10} {'Consultas':>10} {'Tempo (ms)':>12}")
+
+    contagens = []
+    for volume in VOLUMES:
+        consultas, duracao, linhas = medir(volume)
+        assert linhas == volume, f"Esperado {volume} comandas, obtido {linhas}"
+        contagens.append(consultas)
+        print(f"{volume:>10} {consultas:>10} {duracao * 1000:>12.1f}")
+
+    print("=" * 60)
+    if len(set(contagens)) == 1:
+        print(f"✅ Consultas por requisição constantes: {contagens[0]}")
+        return 0
+    print(f"❌ Consultas por requisição variam com o volume: {contagens}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
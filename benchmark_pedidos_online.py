@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark da criação de pedidos online (POST /pedidos-online/)
+
+Cria pedidos com 1, 10 e 50 itens em um banco SQLite temporário e mede
+quantas consultas SQL e quanto tempo cada chamada de `criar_pedido_online`
+leva. Os produtos vêm do cache do catálogo (carregado em uma única consulta)
+e os itens são gravados em um único executemany, então o número de consultas
+deve ser o mesmo para qualquer tamanho de pedido.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import models, schemas
+from backend.app.database import criar_engine
+from backend.app.main import criar_pedido_online
+
+TAMANHOS_PEDIDO = [1, 10, 50]
+REPETICOES = 20
+NUMERO_PRODUTOS = 50
+
+def popular_banco(session):
+    produtos = [
+        models.Produto(nome=f"Produto {i}", preco=2.5 + i, categoria="Pães", disponivel=True)
+        for i in range(1, NUMERO_PRODUTOS + 1)
+    ]
+    session.add_all(produtos)
+    session.commit()
+    return [produto.id for produto in produtos]
+
+def montar_pedido(produto_ids, quantidade_itens):
+    return schemas.PedidoOnlineCreate(
+        nome_cliente="Cliente Benchmark",
+        telefone="(11) 99999-0000",
+        endereco="Rua das Flores, 123",
+        forma_pagamento="pix",
+        itens=[
+            schemas.ItemPedidoOnlineCreate(
+                produto_id=produto_ids[i % len(produto_ids)],
+                quantidade=1 + i % 3,
+                preco_unitario=0
+            )
+            for i in range(quantidade_itens)
+        ]
+    )
+
+def medir(Session, engine, produto_ids, quantidade_itens):
+    """Retorna (consultas por pedido, milissegundos por pedido)"""
+    pedido = montar_pedido(produto_ids, quantidade_itens)
+    consultas = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    duracao = 0.0
+    for _ in range(REPETICOES):
+        session = Session()
+        consultas.clear()
+        event.listen(engine, "before_cursor_execute", contar)
+        try:
+            inicio = time.perf_counter()
+            resultado = asyncio.run(criar_pedido_online(pedido, db=session))
+            duracao += time.perf_counter() - inicio
+            assert len(resultado.itens) == quantidade_itens
+        finally:
+            event.remove(engine, "before_cursor_execute", contar)
+            session.close()
+
+    return len(consultas), duracao / REPETICOES * 1000
+
+def main():
+    print("🍞 Benchmark - POST /pedidos-online/")
+    print("=" * 60)
+    print(f"{'Itens':>10} {'Consultas':>10} {'Tempo (ms)':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = criar_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        session = Session()
+        produto_ids = popular_banco(session)
+        session.close()
+
+        contagens = []
+        for tamanho in TAMANHOS_PEDIDO:
+            consultas, ms = medir(Session, engine, produto_ids, tamanho)
+            contagens.append(consultas)
+            print(f"{tamanho:>10} {consultas:>10} {ms:>12.2f}")
+        engine.dispose()
+
+    print("=" * 60)
+    if len(set(contagens)) == 1:
+        print(f"✅ Consultas por pedido constantes: {contagens[0]}")
+        return 0
+    print(f"❌ Consultas por pedido variam com o número de itens: {contagens}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
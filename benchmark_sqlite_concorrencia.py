@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concorrência do SQLite: configuração padrão x WAL + PRAGMAs
+
+Simula vários terminais (tablets, site e desktop) usando o mesmo banco ao
+mesmo tempo: cada thread alterna leituras da lista de comandas com inclusões
+de itens em comandas abertas. Compara o engine que a API usava antes de
+`criar_engine()` (create_engine só com check_same_thread=False: rollback
+journal, timeout de 5 s do sqlite3 e pool padrão) com o de `criar_engine()`
+(WAL, synchronous=NORMAL, busy_timeout, mmap_size, cache_size e pool
+configurado).
+
+Uso: python benchmark_sqlite_concorrencia.py [diretório]
+O banco temporário é criado no diretório informado (padrão: o diretório
+temporário do sistema). Rode no mesmo disco do banco real: em tmpfs o fsync
+é gratuito e a diferença entre as configurações quase desaparece. O
+resultado depende do disco e do número de CPUs; compare as duas linhas na
+mesma máquina em vez de números absolutos.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import models, schemas
+from backend.app.database import criar_engine
+from backend.app.main import adicionar_item_comanda, listar_comandas
+from backend.app.migracoes import atualizar_banco
+
+TERMINAIS = 8
+OPERACOES_POR_TERMINAL = 150
+PROPORCAO_ESCRITAS = 0.3
+NUMERO_MESAS = 20
+
+# Nome -> função que cria o engine a partir da URL
+CONFIGURACOES = {
+    "padrão (rollback journal)": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+    "criar_engine (WAL + PRAGMAs)": criar_engine,
+}
+
+def popular_banco(Session):
+    session = Session()
+    mesas = [models.Mesa(numero=i, status="ocupada") for i in range(1, NUMERO_MESAS + 1)]
+    produtos = [
+        models.Produto(nome=f"Produto {i}", preco=2.0 + i, categoria="Pães", disponivel=True)
+        for i in range(1, 11)
+    ]
+    session.add_all(mesas + produtos)
+    session.flush()
+    comandas = [models.Comanda(mesa_id=mesa.id, status="aberta", total=0.0) for mesa in mesas]
+    session.add_all(comandas)
+    session.commit()
+    ids = ([c.id for c in comandas], [p.id for p in produtos])
+    session.close()
+    return ids
+
+def terminal(Session, comanda_ids, produto_ids, latencias, erros, semente):
+    aleatorio = random.Random(semente)
+    for _ in range(OPERACOES_POR_TERMINAL):
+        session = Session()
+        inicio = time.perf_counter()
+        try:
+            if aleatorio.random() < PROPORCAO_ESCRITAS:
+                item = schemas.ItemComandaCreate(
+                    produto_id=aleatorio.choice(produto_ids),
+                    quantidade=1,
+                    preco_unitario=0
+                )
+                adicionar_item_comanda(aleatorio.choice(comanda_ids), item, db=session)
+            else:
+                listar_comandas(Response(), db=session)
+            latencias.append(time.perf_counter() - inicio)
+        except Exception as e:
+            session.rollback()
+            erros.append(str(e).splitlines()[0])
+        finally:
+            session.close()
+
+def medir(fabrica, diretorio=None):
+    with tempfile.TemporaryDirectory(dir=diretorio) as tmp:
+        engine = fabrica(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        atualizar_banco(engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        comanda_ids, produto_ids = popular_banco(Session)
+
+        latencias, erros = [], []
+        threads = [
+            threading.Thread(target=terminal, args=(Session, comanda_ids, produto_ids, latencias, erros, i))
+            for i in range(TERMINAIS)
+        ]
+        inicio = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+        engine.dispose()
+
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95) - 1] if latencias else 0
+    return len(latencias) / duracao, p95, erros
+
+def main():
+    diretorio = sys.argv[1] if len(sys.argv) > 1 else None
+    print("🍞 Benchmark de concorrência - SQLite")
+    print(f"   {TERMINAIS} terminais x {OPERACOES_POR_TERMINAL} operações "
+          f"({int(PROPORCAO_ESCRITAS * 100)}% escritas)")
+    print("=" * 72)
+    print(f"{'Configuração':<32} {'ops/s':>10} {'p95 (ms)':>10} {'erros':>8}")
+
+    for nome, fabrica in CONFIGURACOES.items():
+        vazao, p95, erros = medir(fabrica, diretorio)
+        print(f"{nome:<32} {vazao:>10.1f} {p95 * 1000:>10.1f} {len(erros):>8}")
+        for erro in sorted(set(erros))[:3]:
+            print(f"   ⚠️  {erro}")
+
+    print("=" * 72)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
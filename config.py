@@ -8,9 +8,20 @@ BACKEND_HOST = "0.0.0.0"  # Aceita conexões de qualquer IP
 BACKEND_PORT = 8000
 BACKEND_URL = f"http://localhost:{BACKEND_PORT}"
 
-# Configurações do Banco de Dados
-DATABASE_URL = "sqlite:///database/padaria.db"
-DATABASE_PATH = "database/padaria.db"
+# Configurações do Banco de Dados, QR codes e reservas
+# Definidas no pacote do backend (backend/app/configuracoes.py) para que a API
+# funcione sem depender deste arquivo; reexportadas aqui para os scripts.
+from backend.app.configuracoes import (
+    DATABASE_PATH,
+    DATABASE_URL,
+    DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW,
+    QR_CODE_CACHE_DIR,
+    RESERVA_DURACAO_MINUTOS,
+    RESERVA_INTERVALO_MINUTOS,
+    RESERVA_TURNOS,
+    get_database_url,
+)
 
 # Configurações de Rede
 # Altere este IP para o IP da sua máquina na rede local
@@ -105,10 +116,6 @@ def get_backend_url():
         return NETWORK_URL
     return BACKEND_URL
 
-def get_database_url():
-    """Retorna a URL do banco de dados"""
-    return DATABASE_URL
-
 def create_database_directory():
     """Cria o diretório do banco se não existir"""
-    os.makedirs("database", exist_ok=True) 
\ No newline at end of file
+    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True) 
\ No newline at end of file
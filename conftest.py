@@ -0,0 +1,104 @@
+"""
+Banco temporário e utilitários compartilhados pelos testes
+
+Cada teste que recebe `banco` ganha um SQLite novo, criado pelas migrações,
+como (engine, Session), com os caches em memória vazios. `popular` grava os
+dados básicos que o teste pedir e `contar_consultas` captura o SQL emitido.
+O pytest carrega este arquivo sozinho; o main() dos arquivos de teste usa
+`executar_testes`, que monta o mesmo banco fora do pytest.
+"""
+import inspect
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import models
+from backend.app.cardapio import cache_cardapio
+from backend.app.catalogo import cache_catalogo
+from backend.app.contadores import contador_comandas
+from backend.app.database import criar_engine
+from backend.app.migracoes import atualizar_banco
+
+# Produtos disponíveis para `popular`: nome -> (preço, categoria, disponível)
+PRODUTOS = {
+    "Pão Francês": (0.5, "Pães", True),
+    "Pão de queijo": (1.5, "Pães", True),
+    "Café": (3.5, "Bebidas", True),
+    "Pão na chapa": (6.0, "Lanches", True),
+    "Torta": (9.0, "Doces", False),
+}
+
+@contextmanager
+def banco_temporario():
+    """SQLite novo com as migrações aplicadas; apagado ao sair"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = criar_engine(f"sqlite:///{os.path.join(tmp, 'padaria.db')}")
+        atualizar_banco(engine)
+        # Os caches são globais do processo: não podem trazer dados do banco anterior
+        for cache in (cache_cardapio, cache_catalogo, contador_comandas):
+            cache.invalidar()
+        try:
+            yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        finally:
+            engine.dispose()
+
+@pytest.fixture
+def banco():
+    with banco_temporario() as (engine, Session):
+        yield engine, Session
+
+def popular(Session, mesas=0, produtos=(), clientes=0):
+    """Grava as mesas 1..`mesas`, os `produtos` (nomes de PRODUTOS; ids na ordem
+    dada) e `clientes` clientes"""
+    db = Session()
+    db.add_all([models.Mesa(numero=numero) for numero in range(1, mesas + 1)])
+    for nome in produtos:
+        preco, categoria, disponivel = PRODUTOS[nome]
+        db.add(models.Produto(nome=nome, preco=preco, categoria=categoria, disponivel=disponivel))
+    db.add_all([
+        models.Cliente(nome=f"Cliente {i}", telefone=f"(11) 99999-{i:04d}", endereco="Rua das Flores, 123")
+        for i in range(1, clientes + 1)
+    ])
+    db.commit()
+    db.close()
+
+@contextmanager
+def contar_consultas(engine, com_parametros=False):
+    """Lista, preenchida durante o bloco, do SQL emitido pelo engine
+    (pares (sql, parâmetros) com `com_parametros`)"""
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append((statement, parameters) if com_parametros else statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        yield consultas
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+def executar_testes(titulo, testes):
+    """Roda os testes fora do pytest (main() dos arquivos); retorna o código de saída"""
+    print(f"🍞 {titulo}")
+    print("=" * 60)
+    falhas = 0
+    for teste in testes:
+        try:
+            if "banco" in inspect.signature(teste).parameters:
+                with banco_temporario() as banco:
+                    teste(banco)
+            else:
+                teste()
+            print(f"✅ {teste.__name__}")
+        except AssertionError as e:
+            falhas += 1
+            print(f"❌ {teste.__name__}: {e}")
+    print("=" * 60)
+    return 1 if falhas else 0
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Script para copiar um banco padaria.db (SQLite) para outro banco, por exemplo
+PostgreSQL, em lotes
+
+Uso:
+    python copiar_banco.py [--origem URL] [--destino URL] [--lote N]
+
+Por padrão a origem é o arquivo SQLite do backend e o destino é a URL
+configurada em PADARIA_DATABASE_URL (veja config.py). O destino é levado à
+versão mais recente pelas migrações e as tabelas precisam estar vazias. Colunas que existem só
+na origem (ex.: 'estoque') são ignoradas, e as que existem só no destino
+ficam com o valor padrão.
+
+As linhas são copiadas sem o ORM, então as tabelas derivadas (agregados de
+vendas e histograma dos tempos de preparo) que a origem não tem são
+reconstruídas no destino no fim da cópia. Se a API já estiver rodando sobre
+o destino, reinicie-a: os contadores de comandas ficam em memória.
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import func, inspect, select, text
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DATABASE_PATH, get_database_url
+from backend.app import historico_itens, models
+from backend.app.agregados import recalcular_agregados
+from backend.app.contadores import contador_comandas
+from backend.app.database import criar_engine
+from backend.app.migracoes import atualizar_banco
+
+TAMANHO_LOTE = 1000
+
+def copiar_tabela(origem, destino, tabela, tamanho_lote):
+    """Copia uma tabela em lotes e retorna a quantidade de linhas copiadas"""
+    colunas_origem = {col["name"] for col in inspect(origem).get_columns(tabela.name)}
+    colunas = [col for col in tabela.columns if col.name in colunas_origem]
+
+    with destino.connect() as conn_destino:
+        existentes = conn_destino.execute(select(func.count()).select_from(tabela)).scalar()
+    if existentes:
+        raise RuntimeError(f"Tabela '{tabela.name}' já possui {existentes} linhas no destino")
+
+    copiadas = 0
+    with origem.connect() as conn_origem:
+        resultado = conn_origem.execution_options(stream_results=True).execute(
+            select(*colunas).order_by(tabela.primary_key.columns.values()[0])
+        )
+        while True:
+            lote = resultado.fetchmany(tamanho_lote)
+            if not lote:
+                break
+            with destino.begin() as conn_destino:
+                conn_destino.execute(tabela.insert(), [dict(linha._mapping) for linha in lote])
+            copiadas += len(lote)
+            print(f"   {tabela.name}: {copiadas} linhas copiadas...", end="\r")
+    return copiadas
+
+def ajustar_sequencias(destino, tabelas):
+    """No PostgreSQL, avança as sequências de id para depois dos ids copiados"""
+    if destino.dialect.name != "postgresql":
+        return
+    with destino.begin() as conn:
+        for tabela in tabelas:
+            if "id" not in tabela.columns:
+                continue
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{tabela.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {tabela.name}), 0) + 1, false)"
+            ))
+
+def reconstruir_derivadas(destino, tabelas_origem):
+    """Reconstrói no destino as tabelas derivadas que não vieram da origem"""
+    with destino.begin() as conn:
+        if models.VendaAgregada.__tablename__ not in tabelas_origem:
+            recalcular_agregados(conn)
+            print("✅ vendas_agregadas: reconstruída a partir das comandas e pedidos")
+        if models.TempoItemAgregado.__tablename__ not in tabelas_origem:
+            historico_itens.recalcular_tempos(conn)
+            print("✅ tempos_itens_agregados: reconstruída a partir dos eventos dos itens")
+    contador_comandas.invalidar()
+
+def copiar_banco(url_origem, url_destino, tamanho_lote=TAMANHO_LOTE):
+    origem = criar_engine(url_origem)
+    destino = criar_engine(url_destino)
+    try:
+        atualizar_banco(destino)
+        tabelas_origem = set(inspect(origem).get_table_names())
+        # migracoes_esquema não é copiada: o destino registra as próprias migrações
+        tabelas = [
+            t for t in models.Base.metadata.sorted_tables
+            if t.name in tabelas_origem and t.name != models.MigracaoEsquema.__tablename__
+        ]
+
+        for tabela in tabelas:
+            copiadas = copiar_tabela(origem, destino, tabela, tamanho_lote)
+            print(f"✅ {tabela.name}: {copiadas} linhas copiadas          ")
+
+        ajustar_sequencias(destino, tabelas)
+        reconstruir_derivadas(destino, tabelas_origem)
+    finally:
+        origem.dispose()
+        destino.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Copia o banco da padaria para outro banco em lotes")
+    parser.add_argument("--origem", default=f"sqlite:///{DATABASE_PATH}", help="URL do banco de origem")
+    parser.add_argument("--destino", default=get_database_url(), help="URL do banco de destino")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Linhas por lote")
+    args = parser.parse_args()
+
+    if args.origem == args.destino:
+        print("❌ Origem e destino são o mesmo banco. Defina PADARIA_DATABASE_URL ou use --destino.")
+        return 1
+
+    print("🍞 Copiando banco de dados da padaria...")
+    print(f"   Origem:  {args.origem}")
+    print(f"   Destino: {args.destino}")
+    print("=" * 60)
+
+    try:
+        copiar_banco(args.origem, args.destino, args.lote)
+    except Exception as e:
+        print(f"\n❌ Erro ao copiar banco: {e}")
+        return 1
+
+    print("\n🎉 Cópia concluída com sucesso!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
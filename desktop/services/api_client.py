@@ -1,19 +1,42 @@
 import requests
 import json
+import os
+import threading
+from datetime import date
 from typing import List, Dict, Any
 
 class APIClient:
+    COLECOES_SINCRONIZADAS = ("comandas", "produtos", "mesas", "pedidos_online")
+    
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
-        self.session = requests.Session()
-    
-    def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
+        # Uma requests.Session por thread (ver `session`)
+        self._local = threading.local()
+        # Estado local mantido por sincronizar(), indexado por coleção e id
+        self.versao_sincronizada = 0
+        self.estado_local = {colecao: {} for colecao in self.COLECOES_SINCRONIZADAS}
+    
+    @property
+    def session(self) -> requests.Session:
+        """Sessão HTTP da thread atual.
+
+        O ExecutorRequisicoes chama o cliente de várias threads ao mesmo tempo, e
+        uma requests.Session não pode ser compartilhada entre threads.
+        """
+        sessao = getattr(self._local, "session", None)
+        if sessao is None:
+            sessao = self._local.session = requests.Session()
+        return sessao
+    
+    def _make_request(self, method: str, endpoint: str, data: Dict = None, params: Dict = None) -> Dict:
         """Faz uma requisição para a API"""
         url = f"{self.base_url}{endpoint}"
+        if params:
+            params = {chave: valor for chave, valor in params.items() if valor is not None}
         
         try:
             if method == "GET":
-                response = self.session.get(url)
+                response = self.session.get(url, params=params)
             elif method == "POST":
                 response = self.session.post(url, json=data)
             elif method == "PUT":
@@ -74,9 +97,17 @@ class APIClient:
         return self._make_request("GET", "/produtos/categorias/") or []
     
     # Métodos para Comandas
-    def listar_comandas(self) -> List[Dict]:
-        """Lista todas as comandas"""
-        return self._make_request("GET", "/comandas/") or []
+    def listar_comandas(self, status: List[str] = None, data_inicio: date = None, data_fim: date = None,
+                        limite: int = None, apos_id: int = None) -> List[Dict]:
+        """Lista comandas, opcionalmente filtradas por status e período (datas inclusivas)"""
+        params = {
+            "status": status,
+            "data_inicio": data_inicio,
+            "data_fim": data_fim,
+            "limite": limite,
+            "apos_id": apos_id
+        }
+        return self._make_request("GET", "/comandas/", params=params) or []
     
     def listar_comandas_abertas(self) -> List[Dict]:
         """Lista comandas abertas"""
@@ -86,6 +117,18 @@ class APIClient:
         """Lista comandas que precisam ser impressas"""
         return self._make_request("GET", "/comandas/para-impressao/") or []
     
+    def obter_painel_cozinha(self, desde: int = 0) -> Dict:
+        """Fila da cozinha agrupada por produto e por mesa (incremental com a versão anterior)"""
+        return self._make_request("GET", "/cozinha/painel", params={"since": desde})
+    
+    def obter_contadores_comandas(self, data_inicio: date = None, data_fim: date = None) -> Dict:
+        """Quantidade de comandas por status e faturamento das fechadas, sem baixar a lista"""
+        params = {"data_inicio": data_inicio, "data_fim": data_fim}
+        return self._make_request("GET", "/comandas/contadores", params=params) or {
+            "por_status": {}, "total": 0, "abertas": 0, "para_impressao": 0,
+            "aguardando_pagamento": 0, "fechadas": 0, "faturamento": 0.0
+        }
+    
     def criar_comanda(self, mesa_id: int, observacoes: str = None) -> Dict:
         """Cria uma nova comanda"""
         data = {"mesa_id": mesa_id}
@@ -119,7 +162,24 @@ class APIClient:
             "status": "pendente"
         }
         return self._make_request("POST", f"/comandas/{comanda_id}/itens/", data)
-    
+
+    def adicionar_itens_comanda(self, comanda_id: int, itens: List[Dict]) -> List[Dict]:
+        """Adiciona vários itens à comanda em uma única requisição.
+
+        Cada item é um dict com produto_id, quantidade e, opcionalmente, observacoes.
+        """
+        data = [
+            {
+                "produto_id": item["produto_id"],
+                "quantidade": item.get("quantidade", 1),
+                "preco_unitario": 0,  # Será calculado pelo backend
+                "observacoes": item.get("observacoes"),
+                "status": "pendente"
+            }
+            for item in itens
+        ]
+        return self._make_request("POST", f"/comandas/{comanda_id}/itens/lote", data)
+
     def listar_itens_comanda(self, comanda_id: int) -> List[Dict]:
         """Lista itens de uma comanda"""
         return self._make_request("GET", f"/comandas/{comanda_id}/itens/") or []
@@ -127,6 +187,11 @@ class APIClient:
     def atualizar_status_item(self, item_id: int, status: str) -> Dict:
         """Atualiza status de um item"""
         return self._make_request("PUT", f"/itens/{item_id}/status?status={status}")
+
+    def atualizar_status_itens(self, status: str, item_ids: List[int] = None, comanda_id: int = None) -> Dict:
+        """Atualiza o status de vários itens, ou de todos os itens da comanda, em uma única requisição"""
+        data = {"status": status, "item_ids": item_ids, "comanda_id": comanda_id}
+        return self._make_request("PUT", "/itens/status", data)
     
     def chamar_garcom(self, comanda_id: int, garcom_id: int = None) -> Dict:
         """Chama o garçom para uma mesa"""
@@ -177,9 +242,17 @@ class APIClient:
         return self._make_request("GET", f"/menu/{mesa_id}")
     
     # Métodos para Pedidos Online
-    def listar_pedidos_online(self) -> List[Dict]:
-        """Lista todos os pedidos online"""
-        return self._make_request("GET", "/pedidos-online/") or []
+    def listar_pedidos_online(self, status: List[str] = None, data_inicio: date = None, data_fim: date = None,
+                              limite: int = None, antes_id: int = None) -> List[Dict]:
+        """Lista pedidos online do mais recente ao mais antigo, com filtros opcionais"""
+        params = {
+            "status": status,
+            "data_inicio": data_inicio,
+            "data_fim": data_fim,
+            "limite": limite,
+            "antes_id": antes_id
+        }
+        return self._make_request("GET", "/pedidos-online/", params=params) or []
     
     def obter_pedido_online(self, pedido_id: int) -> Dict:
         """Obtém detalhes de um pedido online"""
@@ -242,6 +315,11 @@ class APIClient:
     def obter_reservas_mesa(self, mesa_id: int) -> Dict:
         """Obtém reservas de uma mesa específica"""
         return self._make_request("GET", f"/reservas/mesa/{mesa_id}")
+
+    def obter_disponibilidade_reservas(self, data: date, duracao: int = None) -> Dict:
+        """Horários livres de todas as mesas no dia (duracao em minutos; padrão do servidor)"""
+        params = {"data": data, "duracao": duracao}
+        return self._make_request("GET", "/reservas/disponibilidade", params=params) or {"mesas": []}
     
     def criar_reserva(self, mesa_id: int, cliente_id: int, data_reserva: str, 
                      horario_reserva: str, observacoes: str = None) -> Dict:
@@ -258,4 +336,106 @@ class APIClient:
     
     def cancelar_reserva(self, reserva_id: int) -> Dict:
         """Cancela uma reserva"""
-        return self._make_request("PUT", f"/reservas/{reserva_id}/cancelar") 
\ No newline at end of file
+        return self._make_request("PUT", f"/reservas/{reserva_id}/cancelar")
+    
+    # ============================================================================
+    # MÉTODOS PARA RELATÓRIOS
+    # ============================================================================
+    
+    def obter_resumo_vendas(self, data_inicio: date = None, data_fim: date = None) -> Dict:
+        """Quantidade e faturamento por status de comandas e pedidos online no período"""
+        params = {"data_inicio": data_inicio, "data_fim": data_fim}
+        return self._make_request("GET", "/relatorios/resumo", params=params) or {
+            "comandas": {}, "pedidos_online": {}
+        }
+    
+    def listar_vendas_agregadas(self, data_inicio: date = None, data_fim: date = None,
+                                agrupamento: str = "dia") -> List[Dict]:
+        """Vendas por dia (ou por dia e hora), origem e status"""
+        params = {"data_inicio": data_inicio, "data_fim": data_fim, "agrupamento": agrupamento}
+        return self._make_request("GET", "/relatorios/vendas", params=params) or []
+    
+    def listar_produtos_mais_vendidos(self, data_inicio: date = None, data_fim: date = None,
+                                      limite: int = 10, ordenar_por: str = "quantidade") -> List[Dict]:
+        """Produtos mais vendidos no período (comandas e pedidos online)"""
+        params = {"data_inicio": data_inicio, "data_fim": data_fim, "limite": limite, "ordenar_por": ordenar_por}
+        return self._make_request("GET", "/relatorios/produtos-mais-vendidos", params=params) or []
+
+    def obter_tempos_preparo(self, data_inicio: date = None, data_fim: date = None) -> Dict:
+        """p50 e p95 da espera e do preparo dos itens, por produto e por hora"""
+        params = {"data_inicio": data_inicio, "data_fim": data_fim}
+        return self._make_request("GET", "/relatorios/tempos-preparo", params=params) or {
+            "por_produto": [], "por_hora": []
+        }
+
+    def baixar_relatorio(self, caminho: str, formato: str = "csv", data_inicio: date = None,
+                         data_fim: date = None, status: List[str] = None) -> bool:
+        """Salva em `caminho` o relatório exportado, gravando em blocos enquanto é baixado"""
+        params = {"formato": formato, "data_inicio": data_inicio, "data_fim": data_fim, "status": status}
+        params = {chave: valor for chave, valor in params.items() if valor is not None}
+        parcial = f"{caminho}.parcial"
+        try:
+            with self.session.get(f"{self.base_url}/relatorios/export", params=params, stream=True) as response:
+                response.raise_for_status()
+                with open(parcial, "wb") as arquivo:
+                    for bloco in response.iter_content(chunk_size=64 * 1024):
+                        arquivo.write(bloco)
+            os.replace(parcial, caminho)
+            return True
+        except (requests.exceptions.RequestException, OSError) as e:
+            print(f"Erro ao baixar relatório: {e}")
+            if os.path.exists(parcial):
+                os.remove(parcial)
+            return False
+    
+    # ============================================================================
+    # SINCRONIZAÇÃO INCREMENTAL
+    # ============================================================================
+    
+    def sincronizar(self) -> List[str]:
+        """Aplica ao estado local as alterações desde a última versão vista.
+        
+        Retorna os nomes das coleções que mudaram (vazio se nada mudou ou se a
+        requisição falhou).
+        """
+        return self.aplicar_alteracoes(self.buscar_alteracoes(self.versao_sincronizada))
+    
+    def buscar_alteracoes(self, desde: int) -> Dict:
+        """Busca as alterações desde a versão `desde`, sem tocar no estado local.
+        
+        Pode ser chamado fora da thread da interface; o resultado é passado
+        depois para aplicar_alteracoes.
+        """
+        delta = self._make_request("GET", "/sync", params={"since": desde})
+        if delta is not None:
+            delta["desde"] = desde
+        return delta
+    
+    def aplicar_alteracoes(self, delta: Dict) -> List[str]:
+        """Aplica ao estado local um resultado de buscar_alteracoes.
+        
+        Um delta calculado a partir de outra versão (o estado local mudou
+        enquanto a requisição estava em andamento) é descartado.
+        """
+        if delta is None or delta["desde"] != self.versao_sincronizada:
+            return []
+        
+        alteradas = []
+        for colecao, registros in self.estado_local.items():
+            if delta["completo"]:
+                registros.clear()
+            atualizados = delta.get(colecao, [])
+            removidos = delta["removidos"].get(colecao, [])
+            for registro in atualizados:
+                registros[registro["id"]] = registro
+            for registro_id in removidos:
+                registros.pop(registro_id, None)
+            if delta["completo"] or atualizados or removidos:
+                alteradas.append(colecao)
+        
+        self.versao_sincronizada = delta["versao"]
+        return alteradas
+    
+    def registros_sincronizados(self, colecao: str) -> List[Dict]:
+        """Retorna os registros de uma coleção do estado local, ordenados por id"""
+        return [registro for _, registro in sorted(self.estado_local[colecao].items())]
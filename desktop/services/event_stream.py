@@ -0,0 +1,76 @@
+import json
+import time
+import requests
+from PyQt5.QtCore import QThread, pyqtSignal
+
+class EventStream(QThread):
+    """Assina o stream de eventos do backend (GET /eventos) em uma thread separada.
+
+    Cada evento recebido é entregue na thread da interface pelo sinal
+    `evento_recebido`. Quando a conexão cai, `conexao_alterada(False)` é emitido
+    e a thread tenta reconectar com espera crescente.
+    """
+    evento_recebido = pyqtSignal(dict)
+    conexao_alterada = pyqtSignal(bool)
+
+    ESPERA_MAXIMA_RECONEXAO = 30  # segundos
+    # Maior que o keepalive do servidor (15 s), para detectar conexões mortas
+    TIMEOUT_LEITURA = 45
+
+    def __init__(self, base_url: str, parent=None):
+        super().__init__(parent)
+        self.url = f"{base_url}/eventos"
+        self._ativo = True
+        self._resposta = None
+
+    def run(self):
+        espera = 1
+        while self._ativo:
+            try:
+                with requests.get(self.url, stream=True, timeout=(5, self.TIMEOUT_LEITURA)) as resposta:
+                    resposta.raise_for_status()
+                    self._resposta = resposta
+                    self.conexao_alterada.emit(True)
+                    espera = 1
+                    self._ler_eventos(resposta)
+            except (requests.exceptions.RequestException, AttributeError, ValueError) as e:
+                if self._ativo:
+                    print(f"Stream de eventos desconectado: {e}")
+            finally:
+                self._resposta = None
+
+            if not self._ativo:
+                break
+            self.conexao_alterada.emit(False)
+            self._aguardar(espera)
+            espera = min(espera * 2, self.ESPERA_MAXIMA_RECONEXAO)
+
+    def _aguardar(self, segundos: float):
+        """Espera interrompível por parar()"""
+        limite = time.monotonic() + segundos
+        while self._ativo and time.monotonic() < limite:
+            self.msleep(100)
+
+    def _ler_eventos(self, resposta):
+        dados = []
+        for linha in resposta.iter_lines(decode_unicode=True):
+            if not self._ativo:
+                return
+            if linha is None:
+                continue
+            if linha == "":
+                if dados:
+                    self.evento_recebido.emit(json.loads("\n".join(dados)))
+                    dados = []
+            elif linha.startswith("data:"):
+                dados.append(linha[5:].strip())
+
+    def parar(self):
+        """Encerra o stream e aguarda a thread terminar"""
+        self._ativo = False
+        if self._resposta is not None:
+            try:
+                self._resposta.close()
+            except Exception:
+                pass
+        self.wait(2000)
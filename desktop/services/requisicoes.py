@@ -0,0 +1,90 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+class _Tarefa(QRunnable):
+    """Executa uma chamada do APIClient em uma thread do pool"""
+
+    def __init__(self, executor: "ExecutorRequisicoes", chave: Tuple, funcao: Callable, args, kwargs):
+        super().__init__()
+        self.executor = executor
+        self.chave = chave
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            resultado, erro = self.funcao(*self.args, **self.kwargs), None
+        except Exception as e:
+            resultado, erro = None, e
+        # Emitido em outra thread: o Qt entrega o sinal na thread da interface
+        self.executor.concluida.emit(self.chave, resultado, erro)
+
+class ExecutorRequisicoes(QObject):
+    """Faz as chamadas do APIClient fora da thread da interface.
+
+    `executar("listar_comandas", status=[...], ao_concluir=...)` chama o método
+    do APIClient em um QThreadPool e entrega o resultado ao callback na thread
+    da interface, onde os widgets podem ser alterados. Chamadas iguais (mesmo
+    método e argumentos) feitas enquanto a primeira ainda está em andamento não
+    geram outra requisição: todas recebem o mesmo resultado.
+
+    O executor é compartilhado pelas telas que usam o mesmo APIClient, para que
+    os pedidos repetidos de telas diferentes também sejam agrupados.
+
+    As threads do pool chamam o mesmo APIClient ao mesmo tempo; cada uma usa a
+    própria requests.Session (APIClient.session é por thread).
+    """
+    concluida = pyqtSignal(object, object, object)  # chave, resultado, erro
+
+    MAXIMO_THREADS = 4
+
+    def __init__(self, api_client, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(self.MAXIMO_THREADS)
+        # Chamadas em andamento -> callbacks (ao_concluir, ao_falhar) que aguardam o resultado
+        self._em_andamento: Dict[Tuple, List[Tuple[Optional[Callable], Optional[Callable]]]] = {}
+        self.concluida.connect(self._entregar)
+
+    def executar(self, metodo: str, *args, ao_concluir: Callable = None, ao_falhar: Callable = None, **kwargs) -> bool:
+        """Chama `api_client.<metodo>(*args, **kwargs)` em segundo plano.
+
+        Retorna False quando a mesma chamada já estava em andamento (o callback
+        recebe o resultado dela).
+        """
+        chave = (metodo, repr(args), repr(sorted(kwargs.items())))
+        aguardando = self._em_andamento.get(chave)
+        if aguardando is not None:
+            aguardando.append((ao_concluir, ao_falhar))
+            return False
+
+        self._em_andamento[chave] = [(ao_concluir, ao_falhar)]
+        self._pool.start(_Tarefa(self, chave, getattr(self.api_client, metodo), args, kwargs))
+        return True
+
+    def em_andamento(self) -> int:
+        return len(self._em_andamento)
+
+    def parar(self, espera_ms: int = 2000):
+        """Descarta as chamadas que ainda não começaram e aguarda as demais"""
+        self._pool.clear()
+        self._pool.waitForDone(espera_ms)
+        self._em_andamento.clear()
+
+    def _entregar(self, chave, resultado, erro):
+        for ao_concluir, ao_falhar in self._em_andamento.pop(chave, []):
+            # Uma exceção não tratada em um slot encerraria o aplicativo: erros da
+            # requisição e do próprio callback vão para ao_falhar
+            try:
+                if erro is not None:
+                    raise erro
+                if ao_concluir is not None:
+                    ao_concluir(resultado)
+            except Exception as e:
+                if ao_falhar is not None:
+                    ao_falhar(e)
+                else:
+                    print(f"Erro na requisição {chave[0]}: {e}")
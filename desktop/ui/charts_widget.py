@@ -9,13 +9,15 @@ try:
 except ImportError:
     MATPLOTLIB_AVAILABLE = False
     print("Matplotlib não está disponível. Instale com: pip install matplotlib numpy")
-from collections import Counter, defaultdict
+from collections import defaultdict
 from datetime import datetime, timedelta
+from ..services.requisicoes import ExecutorRequisicoes
 
 class ChartsWidget(QWidget):
-    def __init__(self, api_client):
+    def __init__(self, api_client, requisicoes: ExecutorRequisicoes = None):
         super().__init__()
         self.api_client = api_client
+        self.requisicoes = requisicoes or ExecutorRequisicoes(api_client, self)
         self.init_ui()
         
     def init_ui(self):
@@ -124,69 +126,56 @@ class ChartsWidget(QWidget):
         else:
             return hoje, hoje
     
-    def filter_data_by_date(self, data_list, date_field="data_abertura"):
-        """Filtra dados por intervalo de datas"""
-        inicio, fim = self.get_date_range()
-        filtered_data = []
-        
-        for item in data_list:
-            try:
-                # Tentar diferentes formatos de data
-                if isinstance(item.get(date_field), str):
-                    # Se for string, tentar converter
-                    if 'T' in item[date_field]:  # Formato ISO
-                        item_date = datetime.fromisoformat(item[date_field].replace('Z', '+00:00')).date()
-                    else:  # Formato simples
-                        item_date = datetime.strptime(item[date_field], '%Y-%m-%d').date()
-                else:
-                    # Se já for datetime
-                    item_date = item[date_field].date()
-                
-                if inicio <= item_date <= fim:
-                    filtered_data.append(item)
-            except (ValueError, TypeError, AttributeError):
-                # Se não conseguir converter a data, incluir o item
-                filtered_data.append(item)
-        
-        return filtered_data
-        
     def atualizar_graficos(self):
         """Atualiza todos os gráficos com dados atuais"""
         if not MATPLOTLIB_AVAILABLE:
             return
             
-        try:
-            self.status_label.setText("Atualizando gráficos...")
-            
-            # Buscar dados
-            comandas = self.api_client.listar_comandas()
-            pedidos_online = self.api_client.listar_pedidos_online()
-            
-            # Filtrar por período
-            comandas_filtradas = self.filter_data_by_date(comandas, "data_abertura")
-            pedidos_filtrados = self.filter_data_by_date(pedidos_online, "data_pedido")
-            
-            # Atualizar cada gráfico
-            self.atualizar_grafico_pedidos(comandas_filtradas, pedidos_filtrados)
-            self.atualizar_grafico_produtos(comandas_filtradas, pedidos_filtrados)
-            self.atualizar_grafico_status(comandas_filtradas, pedidos_filtrados)
-            
-            # Atualizar status
-            periodo = self.combo_periodo.currentText()
-            self.status_label.setText(f"Gráficos atualizados - Período: {periodo}")
-            
-        except Exception as e:
-            print(f"Erro ao atualizar gráficos: {e}")
-            self.status_label.setText(f"Erro ao atualizar gráficos: {e}")
+        self.status_label.setText("Atualizando gráficos...")
+        
+        # Contagens por status vêm dos agregados do servidor (algumas linhas por período),
+        # buscadas em segundo plano; cada gráfico é desenhado quando seus dados chegam
+        inicio, fim = self.get_date_range()
+        self.requisicoes.executar(
+            "obter_resumo_vendas", data_inicio=inicio, data_fim=fim,
+            ao_concluir=lambda resumo: self.exibir_resumo(resumo, (inicio, fim)),
+            ao_falhar=self.exibir_erro
+        )
+        self.requisicoes.executar(
+            "listar_produtos_mais_vendidos", data_inicio=inicio, data_fim=fim, limite=8,
+            ao_concluir=lambda top_produtos: self.exibir_produtos(top_produtos, (inicio, fim)),
+            ao_falhar=self.exibir_erro
+        )
     
-    def atualizar_grafico_pedidos(self, comandas, pedidos_online):
+    def exibir_resumo(self, resumo, periodo):
+        # Resposta de um período que já não está selecionado
+        if periodo != self.get_date_range():
+            return
+        self.atualizar_grafico_pedidos(resumo)
+        self.atualizar_grafico_status(resumo)
+        self.status_label.setText(f"Gráficos atualizados - Período: {self.combo_periodo.currentText()}")
+    
+    def exibir_produtos(self, top_produtos, periodo):
+        if periodo == self.get_date_range():
+            self.atualizar_grafico_produtos(top_produtos)
+    
+    def exibir_erro(self, erro):
+        print(f"Erro ao atualizar gráficos: {erro}")
+        self.status_label.setText(f"Erro ao atualizar gráficos: {erro}")
+    
+    @staticmethod
+    def _quantidade(totais, *status):
+        """Soma as quantidades dos status informados (todos, se nenhum for informado)"""
+        return sum(total["quantidade"] for nome, total in totais.items() if not status or nome in status)
+    
+    def atualizar_grafico_pedidos(self, resumo):
         """Gráfico 1: Pedidos Online vs Presentes"""
         self.figure1.clear()
         ax = self.figure1.add_subplot(111)
         
         # Contar pedidos
-        total_presentes = len(comandas)
-        total_online = len(pedidos_online)
+        total_presentes = self._quantidade(resumo["comandas"])
+        total_online = self._quantidade(resumo["pedidos_online"])
         
         # Dados para o gráfico
         labels = ['Pedidos Presentes', 'Pedidos Online']
@@ -208,31 +197,11 @@ class ChartsWidget(QWidget):
             # Removido texto de legenda
         self.canvas1.draw()
     
-    def atualizar_grafico_produtos(self, comandas, pedidos_online):
-        """Gráfico 2: Produtos Mais Pedidos"""
+    def atualizar_grafico_produtos(self, top_produtos):
+        """Gráfico 2: Produtos Mais Pedidos (já somados e ordenados pelo servidor)"""
         self.figure2.clear()
         ax = self.figure2.add_subplot(111)
         
-        # Coletar dados de produtos
-        produtos_count = Counter()
-        
-        # Produtos de comandas presenciais
-        for comanda in comandas:
-            for item in comanda.get('itens', []):
-                produto_nome = item.get('produto', {}).get('nome', 'Produto Desconhecido')
-                quantidade = item.get('quantidade', 1)
-                produtos_count[produto_nome] += quantidade
-        
-        # Produtos de pedidos online
-        for pedido in pedidos_online:
-            for item in pedido.get('itens', []):
-                produto_nome = item.get('produto', {}).get('nome', 'Produto Desconhecido')
-                quantidade = item.get('quantidade', 1)
-                produtos_count[produto_nome] += quantidade
-        
-        # Pegar os 8 produtos mais vendidos
-        top_produtos = produtos_count.most_common(8)
-        
         if not top_produtos:
             # Se não há dados, mostrar mensagem
             ax.text(0.5, 0.5, 'Nenhum produto vendido no período', 
@@ -240,8 +209,8 @@ class ChartsWidget(QWidget):
             ax.set_title('Produtos Mais Pedidos', fontweight='bold')
         else:
             # Preparar dados para o gráfico
-            nomes = [prod[0] for prod in top_produtos]
-            quantidades = [prod[1] for prod in top_produtos]
+            nomes = [prod['nome'] for prod in top_produtos]
+            quantidades = [prod['quantidade'] for prod in top_produtos]
             
             # Criar gráfico de barras
             bars = ax.barh(nomes, quantidades, color='#ff7f0e')
@@ -259,27 +228,18 @@ class ChartsWidget(QWidget):
         self.figure2.tight_layout()
         self.canvas2.draw()
     
-    def atualizar_grafico_status(self, comandas, pedidos_online):
+    def atualizar_grafico_status(self, resumo):
         """Gráfico 3: Status dos Pedidos (Cancelados, Abertos, Fechados)"""
         self.figure3.clear()
         ax = self.figure3.add_subplot(111)
         
-        # Contar status das comandas
-        status_comandas = Counter()
-        for comanda in comandas:
-            status = comanda.get('status', 'desconhecido')
-            status_comandas[status] += 1
-        
-        # Contar status dos pedidos online
-        status_online = Counter()
-        for pedido in pedidos_online:
-            status = pedido.get('status', 'desconhecido')
-            status_online[status] += 1
-        
-        # Combinar dados
-        total_abertos = status_comandas.get('aberta', 0)
-        total_fechados = status_comandas.get('fechada', 0) + status_comandas.get('aguardando_pagamento', 0)
-        total_cancelados = status_comandas.get('cancelado', 0) + status_online.get('cancelado', 0)
+        # Combinar dados das comandas e dos pedidos online
+        total_abertos = self._quantidade(resumo["comandas"], 'aberta')
+        total_fechados = self._quantidade(resumo["comandas"], 'fechada', 'aguardando_pagamento')
+        total_cancelados = (
+            self._quantidade(resumo["comandas"], 'cancelado')
+            + self._quantidade(resumo["pedidos_online"], 'cancelado')
+        )
         
         # Dados para o gráfico
         labels = ['Abertos', 'Fechados', 'Cancelados']
@@ -5,15 +5,28 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QColor, QPalette
 from PyQt5.QtMultimedia import QSound
 from ..services.api_client import APIClient
+from ..services.event_stream import EventStream
+from ..services.requisicoes import ExecutorRequisicoes
+from datetime import date
 
 class GarcomPanel(QWidget):
-    def __init__(self, api_client: APIClient):
+    # Status de comanda correspondentes a cada opção do filtro
+    FILTROS_STATUS = {
+        "Abertas": ["aberta"],
+        "Para Impressão": ["aberta", "impressa"],
+        "Aguardando Pagamento": ["aguardando_pagamento"]
+    }
+    
+    def __init__(self, api_client: APIClient, requisicoes: ExecutorRequisicoes = None):
         super().__init__()
         self.api_client = api_client
+        # Compartilhado com as outras telas para agrupar requisições iguais
+        self.requisicoes = requisicoes or ExecutorRequisicoes(api_client, self)
         self.chamada_alerta_widget = None
         self.chamada_alerta_sound = None
         self.chamada_comanda_id = None
         self.chamadas_fila = []  # Fila de comandas chamando garçom
+        self.atualizacao_pendente = False
         self.init_ui()
         self.setup_timer()
         
@@ -82,25 +95,76 @@ class GarcomPanel(QWidget):
         layout.addWidget(stats_group)
         
     def setup_timer(self):
-        """Configura timer para atualização automática"""
+        """Configura as atualizações automáticas.
+        
+        O painel é atualizado pelos eventos de comanda do backend; o timer de
+        10 segundos só fica ligado enquanto o stream de eventos estiver desconectado.
+        """
         self.timer = QTimer()
         self.timer.timeout.connect(self.atualizar_comandas)
         self.timer.start(10000)  # Atualiza a cada 10 segundos
         
-    def atualizar_comandas(self):
-        """Atualiza a lista de comandas e exibe alerta de chamada de garçom se necessário"""
-        try:
-            comandas = self.api_client.listar_comandas()
+        # Agrupa rajadas de eventos em uma única atualização
+        self.timer_eventos = QTimer()
+        self.timer_eventos.setSingleShot(True)
+        self.timer_eventos.timeout.connect(self.atualizar_apos_evento)
+        
+        self.event_stream = EventStream(self.api_client.base_url, self)
+        self.event_stream.evento_recebido.connect(self.processar_evento)
+        self.event_stream.conexao_alterada.connect(self.on_conexao_eventos)
+        self.event_stream.start()
+        
+    def on_conexao_eventos(self, conectado):
+        """Liga ou desliga o polling conforme o estado do stream de eventos"""
+        if conectado:
+            self.timer.stop()
+            self.atualizar_comandas()
+        elif not self.timer.isActive():
+            self.timer.start(10000)
             
-            # Filtrar comandas
-            filtro = self.combo_filter.currentText()
-            if filtro == "Abertas":
-                comandas = [c for c in comandas if c["status"] == "aberta"]
-            elif filtro == "Para Impressão":
-                comandas = [c for c in comandas if c["status"] in ["aberta", "impressa"]]
-            elif filtro == "Aguardando Pagamento":
-                comandas = [c for c in comandas if c["status"] == "aguardando_pagamento"]
+    def processar_evento(self, evento):
+        """Atualiza o painel quando uma comanda ou seus itens mudam"""
+        if evento.get("tipo") in ("comanda", "item_comanda") and not self.timer_eventos.isActive():
+            self.timer_eventos.start(150)
             
+    def closeEvent(self, event):
+        self.event_stream.parar()
+        self.requisicoes.parar()
+        super().closeEvent(event)
+        
+    def atualizar_apos_evento(self):
+        """Atualiza a lista; se já havia uma busca em andamento, ela pode ser anterior ao evento e é repetida"""
+        if not self.atualizar_comandas():
+            self.atualizacao_pendente = True
+            
+    def atualizar_comandas(self):
+        """Busca as comandas em segundo plano, filtradas no servidor.
+        
+        Retorna False se a mesma busca já estava em andamento.
+        """
+        filtro = self.combo_filter.currentText()
+        if filtro == "Todas":
+            hoje = date.today()
+            parametros = {"data_inicio": hoje, "data_fim": hoje}
+        else:
+            parametros = {"status": self.FILTROS_STATUS[filtro]}
+        self.atualizar_contadores()
+        return self.requisicoes.executar(
+            "listar_comandas",
+            ao_concluir=lambda comandas: self.preencher_comandas(comandas, filtro),
+            ao_falhar=lambda e: QMessageBox.warning(self, "Erro", f"Erro ao carregar comandas: {e}"),
+            **parametros
+        )
+    
+    def preencher_comandas(self, comandas, filtro):
+        """Preenche a lista de comandas e exibe alerta de chamada de garçom se necessário"""
+        if self.atualizacao_pendente:
+            self.atualizacao_pendente = False
+            self.atualizar_comandas()
+        # Resposta de um filtro que já não está selecionado
+        if filtro != self.combo_filter.currentText():
+            return
+        try:
             # Atualizar fila de chamadas
             novas_chamadas = [c for c in comandas if c.get("chamando_garcom")]
             # Ordenar por data_abertura (ou id como fallback)
@@ -121,12 +185,6 @@ class GarcomPanel(QWidget):
             
             self.table_comandas.setRowCount(len(comandas))
             
-            # Contadores para estatísticas
-            total = len(comandas)
-            abertas = len([c for c in comandas if c["status"] == "aberta"])
-            impressao = len([c for c in comandas if c["status"] in ["aberta", "impressa"]])
-            pagamento = len([c for c in comandas if c["status"] == "aguardando_pagamento"])
-            
             for i, comanda in enumerate(comandas):
                 # Mesa
                 self.table_comandas.setItem(i, 0, QTableWidgetItem(f"Mesa {comanda['mesa_numero']}"))
@@ -182,15 +240,23 @@ class GarcomPanel(QWidget):
                 btn_detalhes.clicked.connect(lambda checked, c=comanda: self.ver_detalhes(c))
                 self.table_comandas.setCellWidget(i, 7, btn_detalhes)
             
-            # Atualizar estatísticas
-            self.lbl_total_comandas.setText(f"Total: {total}")
-            self.lbl_comandas_abertas.setText(f"Abertas: {abertas}")
-            self.lbl_comandas_impressao.setText(f"Para Impressão: {impressao}")
-            self.lbl_comandas_pagamento.setText(f"Aguardando Pagamento: {pagamento}")
-            
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao carregar comandas: {e}")
     
+    def atualizar_contadores(self):
+        """Atualiza as estatísticas do dia com os contadores do servidor, independente do filtro"""
+        hoje = date.today()
+        self.requisicoes.executar(
+            "obter_contadores_comandas", data_inicio=hoje, data_fim=hoje,
+            ao_concluir=self.exibir_contadores
+        )
+    
+    def exibir_contadores(self, contadores):
+        self.lbl_total_comandas.setText(f"Total: {contadores['total']}")
+        self.lbl_comandas_abertas.setText(f"Abertas: {contadores['abertas']}")
+        self.lbl_comandas_impressao.setText(f"Para Impressão: {contadores['para_impressao']}")
+        self.lbl_comandas_pagamento.setText(f"Aguardando Pagamento: {contadores['aguardando_pagamento']}")
+    
     def imprimir_comanda(self, comanda):
         """Marca comanda como impressa"""
         try:
@@ -1,16 +1,27 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QTabWidget, QTableWidget, QTableWidgetItem, QPushButton,
+                             QTabWidget, QTableWidget, QTableWidgetItem, QTableView,
+                             QAbstractItemView, QPushButton,
                              QLabel, QLineEdit, QComboBox, QSpinBox, QDoubleSpinBox,
                              QTextEdit, QMessageBox, QGroupBox, QGridLayout, QSplitter,
-                             QDialog, QFormLayout, QHeaderView, QScrollArea, QFileDialog)
+                             QDialog, QFormLayout, QHeaderView, QScrollArea, QFileDialog,
+                             QListWidget)
 from PyQt5.QtCore import QTimer, Qt
 from PyQt5.QtGui import QFont, QIcon
 from ..services.api_client import APIClient
+from ..services.event_stream import EventStream
+from ..services.requisicoes import ExecutorRequisicoes
 import json
 from datetime import datetime, date
-import csv
 import os
 from .charts_widget import ChartsWidget
+from .table_models import BotaoDelegate, ModeloTabela
+
+# Status exibidos na lista de "Comandas Ativas"
+STATUS_COMANDAS_ATIVAS = ["aberta", "impressa", "aguardando_pagamento"]
+# Quantidade de pedidos online mais recentes exibidos na aba de pedidos
+LIMITE_PEDIDOS_ONLINE = 200
+# Espera (ms) para agrupar eventos do backend antes de sincronizar
+INTERVALO_AGRUPAMENTO_EVENTOS = 150
 
 class ConfiguracaoMesasDialog(QDialog):
     """Diálogo para configurar o número de mesas no início"""
@@ -67,18 +78,17 @@ class ConfiguracaoMesasDialog(QDialog):
         return 0
 
 class AdicionarProdutoDialog(QDialog):
-    """Diálogo para adicionar produto à comanda"""
+    """Diálogo para adicionar um ou mais produtos à comanda"""
     def __init__(self, produtos, parent=None):
         super().__init__(parent)
         self.produtos = produtos
-        self.produto_selecionado = None
-        self.quantidade = 1
+        self.itens = []  # (produto, quantidade) incluídos na lista
         self.init_ui()
         
     def init_ui(self):
-        self.setWindowTitle("Adicionar Produto à Comanda")
+        self.setWindowTitle("Adicionar Produtos à Comanda")
         self.setModal(True)
-        self.setFixedSize(300, 150)
+        self.setFixedSize(360, 320)
         
         layout = QFormLayout(self)
         
@@ -95,6 +105,13 @@ class AdicionarProdutoDialog(QDialog):
         self.spin_quantidade.setValue(1)
         layout.addRow("Quantidade:", self.spin_quantidade)
         
+        # Vários produtos vão para a comanda de uma vez (POST /comandas/{id}/itens/lote)
+        btn_incluir = QPushButton("Incluir na lista")
+        btn_incluir.clicked.connect(self.incluir_item)
+        layout.addRow(btn_incluir)
+        self.lista_itens = QListWidget()
+        layout.addRow("Itens:", self.lista_itens)
+        
         # Botões
         btn_layout = QHBoxLayout()
         btn_ok = QPushButton("Adicionar")
@@ -106,18 +123,34 @@ class AdicionarProdutoDialog(QDialog):
         btn_layout.addWidget(btn_cancel)
         layout.addRow(btn_layout)
         
-    def get_produto_quantidade(self):
-        """Retorna o produto e quantidade selecionados"""
-        if self.result() == QDialog.Accepted:
-            produto = self.combo_produtos.currentData()
-            quantidade = self.spin_quantidade.value()
-            return produto, quantidade
-        return None, 0
+    def incluir_item(self):
+        """Inclui o produto e a quantidade selecionados na lista"""
+        produto = self.combo_produtos.currentData()
+        quantidade = self.spin_quantidade.value()
+        if produto is None:
+            return
+        self.itens.append((produto, quantidade))
+        self.lista_itens.addItem(f"{quantidade}x {produto['nome']}")
+        self.spin_quantidade.setValue(1)
+        
+    def get_itens(self):
+        """Retorna os itens (produto, quantidade) a adicionar.
+
+        Se nada foi incluído na lista, usa o produto selecionado no combo.
+        """
+        if self.result() != QDialog.Accepted:
+            return []
+        if not self.itens:
+            self.incluir_item()
+        return list(self.itens)
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.api_client = APIClient()
+        # Chamadas feitas pelos timers e eventos rodam fora da thread da interface
+        self.requisicoes = ExecutorRequisicoes(self.api_client, self)
+        self.sincronizacao_pendente = False
         self.comanda_atual = None
         self.pedido_online_atual = None
         self.ultima_data = None
@@ -180,19 +213,22 @@ class MainWindow(QMainWindow):
         self.btn_nova_comanda = QPushButton("Nova Comanda")
         self.btn_nova_comanda.clicked.connect(self.nova_comanda)
         self.btn_atualizar = QPushButton("Atualizar")
-        self.btn_atualizar.clicked.connect(self.atualizar_comandas)
+        self.btn_atualizar.clicked.connect(self.atualizar_dados)
         
         btn_layout.addWidget(self.btn_nova_comanda)
         btn_layout.addWidget(self.btn_atualizar)
         left_layout.addLayout(btn_layout)
         
         # Tabela de comandas
-        self.table_comandas = QTableWidget()
-        self.table_comandas.setColumnCount(6)
-        self.table_comandas.setHorizontalHeaderLabels([
-            "ID", "Mesa", "Status", "Total", "Itens", "Ações"
-        ])
-        self.table_comandas.itemSelectionChanged.connect(self.selecionar_comanda)
+        self.table_comandas, self.modelo_comandas = self.criar_tabela([
+            ("ID", lambda c: str(c["id"])),
+            ("Mesa", lambda c: str(c["mesa_numero"])),
+            ("Status", lambda c: c["status"]),
+            ("Total", lambda c: f"R$ {c['total']:.2f}"),
+            ("Itens", lambda c: str(c["quantidade_itens"])),
+            ("Ações", lambda c: ""),
+        ], botoes={5: ("Ver", self.ver_comanda)})
+        self.table_comandas.selectionModel().selectionChanged.connect(self.selecionar_comanda)
         left_layout.addWidget(self.table_comandas)
         
         # Painel direito - Detalhes da comanda
@@ -288,10 +324,12 @@ class MainWindow(QMainWindow):
         layout.addWidget(form_group)
         
         # Tabela de produtos
-        self.table_produtos = QTableWidget()
-        self.table_produtos.setColumnCount(5)
-        self.table_produtos.setHorizontalHeaderLabels([
-            "ID", "Nome", "Preço", "Categoria", "Descrição"
+        self.table_produtos, self.modelo_produtos = self.criar_tabela([
+            ("ID", lambda p: str(p["id"])),
+            ("Nome", lambda p: p["nome"]),
+            ("Preço", lambda p: f"R$ {p['preco']:.2f}"),
+            ("Categoria", lambda p: p["categoria"]),
+            ("Descrição", lambda p: p.get("descricao") or ""),
         ])
         layout.addWidget(self.table_produtos)
         
@@ -325,11 +363,13 @@ class MainWindow(QMainWindow):
         mesas_layout.addWidget(form_group)
         
         # Tabela de mesas
-        self.table_mesas = QTableWidget()
-        self.table_mesas.setColumnCount(5)
-        self.table_mesas.setHorizontalHeaderLabels([
-            "ID", "Número", "Status", "Reserva", "Ações"
-        ])
+        self.table_mesas, self.modelo_mesas = self.criar_tabela([
+            ("ID", lambda m: str(m["id"])),
+            ("Número", lambda m: str(m["numero"])),
+            ("Status", lambda m: m["status"]),
+            ("Reserva", lambda m: ""),
+            ("Ações", lambda m: ""),
+        ], botoes={4: ("Abrir Comanda", self.abrir_comanda_mesa)})
         mesas_layout.addWidget(self.table_mesas)
         
         # Aba de Reservas
@@ -424,18 +464,22 @@ class MainWindow(QMainWindow):
         # Botões de ação
         btn_layout = QHBoxLayout()
         self.btn_atualizar_pedidos = QPushButton("Atualizar")
-        self.btn_atualizar_pedidos.clicked.connect(self.atualizar_pedidos_online)
+        self.btn_atualizar_pedidos.clicked.connect(self.atualizar_dados)
         
         btn_layout.addWidget(self.btn_atualizar_pedidos)
         left_layout.addLayout(btn_layout)
         
         # Tabela de pedidos
-        self.table_pedidos_online = QTableWidget()
-        self.table_pedidos_online.setColumnCount(7)
-        self.table_pedidos_online.setHorizontalHeaderLabels([
-            "ID", "Cliente", "Telefone", "Total", "Status", "Data", "Ações"
-        ])
-        self.table_pedidos_online.itemSelectionChanged.connect(self.selecionar_pedido_online)
+        self.table_pedidos_online, self.modelo_pedidos_online = self.criar_tabela([
+            ("ID", lambda p: str(p["id"])),
+            ("Cliente", lambda p: p["nome_cliente"]),
+            ("Telefone", lambda p: p["telefone"]),
+            ("Total", lambda p: f"R$ {p['total']:.2f}"),
+            ("Status", lambda p: p["status"]),
+            ("Data", lambda p: str(p["data_pedido"])),
+            ("Ações", lambda p: ""),
+        ], botoes={6: ("Ver", self.ver_pedido_online)})
+        self.table_pedidos_online.selectionModel().selectionChanged.connect(self.selecionar_pedido_online)
         left_layout.addWidget(self.table_pedidos_online)
         
         # Painel direito - Detalhes do pedido
@@ -554,7 +598,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(stats_group)
         
         # Gráficos
-        self.charts_widget = ChartsWidget(self.api_client)
+        self.charts_widget = ChartsWidget(self.api_client, self.requisicoes)
         layout.addWidget(self.charts_widget)
         
         # Histórico de comandas
@@ -573,131 +617,163 @@ class MainWindow(QMainWindow):
         self.tab_widget.addTab(relatorios_widget, "Relatórios")
         
     def setup_timer(self):
-        """Configura timer para atualização automática"""
+        """Configura as atualizações automáticas.
+        
+        As telas são atualizadas pelos eventos do backend; o timer de 30
+        segundos só fica ligado enquanto o stream de eventos estiver desconectado.
+        """
         self.timer = QTimer()
         self.timer.timeout.connect(self.atualizar_dados)
         self.timer.start(30000)  # Atualizar a cada 30 segundos
         
+        # Agrupa rajadas de eventos em uma única sincronização
+        self.timer_eventos = QTimer()
+        self.timer_eventos.setSingleShot(True)
+        self.timer_eventos.timeout.connect(self.atualizar_dados)
+        self.reservas_alteradas = False
+        
+        self.event_stream = EventStream(self.api_client.base_url, self)
+        self.event_stream.evento_recebido.connect(self.processar_evento)
+        self.event_stream.conexao_alterada.connect(self.on_conexao_eventos)
+        self.event_stream.start()
+        
+    def on_conexao_eventos(self, conectado):
+        """Liga ou desliga o polling conforme o estado do stream de eventos"""
+        if conectado:
+            self.timer.stop()
+            # Recuperar o que mudou enquanto estava desconectado
+            self.atualizar_dados()
+        elif not self.timer.isActive():
+            self.timer.start(30000)
+            
+    def processar_evento(self, evento):
+        """Agenda uma sincronização ao receber um evento do backend"""
+        if evento.get("tipo") == "reserva":
+            self.reservas_alteradas = True
+        if not self.timer_eventos.isActive():
+            self.timer_eventos.start(INTERVALO_AGRUPAMENTO_EVENTOS)
+            
+    def closeEvent(self, event):
+        self.event_stream.parar()
+        self.requisicoes.parar()
+        super().closeEvent(event)
+        
     def atualizar_dados(self):
-        """Atualiza todos os dados"""
-        self.atualizar_comandas()
-        self.atualizar_produtos()
-        self.atualizar_mesas()
-        self.atualizar_pedidos_online()
-        self.atualizar_relatorios()
-        
-    def atualizar_comandas(self):
-        """Atualiza a lista de comandas"""
+        """Pede as alterações ao backend em segundo plano; as telas são redesenhadas quando chegarem"""
+        iniciada = self.requisicoes.executar(
+            "buscar_alteracoes", self.api_client.versao_sincronizada,
+            ao_concluir=self.aplicar_alteracoes
+        )
+        if not iniciada:
+            # A sincronização em andamento pode não incluir a alteração mais recente
+            self.sincronizacao_pendente = True
+        
+    def aplicar_alteracoes(self, delta):
+        """Aplica as alterações recebidas e redesenha apenas as telas que mudaram"""
+        alteradas = self.api_client.aplicar_alteracoes(delta)
+        if "comandas" in alteradas:
+            self.preencher_tabela_comandas()
+        if "produtos" in alteradas:
+            self.preencher_tabela_produtos()
+        if "mesas" in alteradas:
+            self.preencher_tabela_mesas()
+        if "pedidos_online" in alteradas:
+            self.preencher_tabela_pedidos_online()
+        if "comandas" in alteradas or "pedidos_online" in alteradas:
+            self.atualizar_relatorios()
+        if self.reservas_alteradas:
+            self.reservas_alteradas = False
+            self.atualizar_reservas()
+        if self.sincronizacao_pendente:
+            self.sincronizacao_pendente = False
+            self.atualizar_dados()
+        
+    def criar_tabela(self, colunas, botoes=None):
+        """Cria uma QTableView com um ModeloTabela.
+        
+        `botoes` mapeia o número da coluna para (texto, ação); o delegate de cada
+        coluna é criado aqui uma única vez e chama a ação com o registro da linha.
+        """
+        modelo = ModeloTabela(colunas, self)
+        tabela = QTableView()
+        tabela.setModel(modelo)
+        tabela.setSelectionBehavior(QAbstractItemView.SelectRows)
+        tabela.setSelectionMode(QAbstractItemView.SingleSelection)
+        for coluna, (texto, acao) in (botoes or {}).items():
+            delegate = BotaoDelegate(texto, tabela)
+            delegate.clicado.connect(acao)
+            tabela.setItemDelegateForColumn(coluna, delegate)
+        return tabela, modelo
+        
+    def preencher_tabela_comandas(self):
+        """Atualiza a lista de comandas ativas a partir do estado sincronizado"""
         try:
-            comandas = self.api_client.listar_comandas()
-            
-            self.table_comandas.setRowCount(len(comandas))
-            for i, comanda in enumerate(comandas):
-                self.table_comandas.setItem(i, 0, QTableWidgetItem(str(comanda["id"])))
-                self.table_comandas.setItem(i, 1, QTableWidgetItem(str(comanda["mesa_numero"])))
-                self.table_comandas.setItem(i, 2, QTableWidgetItem(comanda["status"]))
-                self.table_comandas.setItem(i, 3, QTableWidgetItem(f"R$ {comanda['total']:.2f}"))
-                self.table_comandas.setItem(i, 4, QTableWidgetItem(str(comanda["quantidade_itens"])))
-                
-                # Botão para ver detalhes
-                btn_ver = QPushButton("Ver")
-                btn_ver.clicked.connect(lambda checked, c=comanda: self.ver_comanda(c))
-                self.table_comandas.setCellWidget(i, 5, btn_ver)
+            comandas = [
+                c for c in self.api_client.registros_sincronizados("comandas")
+                if c["status"] in STATUS_COMANDAS_ATIVAS
+            ]
+            self.modelo_comandas.atualizar(comandas)
                 
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao carregar comandas: {e}")
             
-    def atualizar_produtos(self):
-        """Atualiza a lista de produtos"""
+    def preencher_tabela_produtos(self):
+        """Atualiza a lista de produtos disponíveis a partir do estado sincronizado"""
         try:
-            produtos = self.api_client.listar_produtos()
-            
-            self.table_produtos.setRowCount(len(produtos))
-            for i, produto in enumerate(produtos):
-                self.table_produtos.setItem(i, 0, QTableWidgetItem(str(produto["id"])))
-                self.table_produtos.setItem(i, 1, QTableWidgetItem(produto["nome"]))
-                self.table_produtos.setItem(i, 2, QTableWidgetItem(f"R$ {produto['preco']:.2f}"))
-                self.table_produtos.setItem(i, 3, QTableWidgetItem(produto["categoria"]))
-                self.table_produtos.setItem(i, 4, QTableWidgetItem(produto.get("descricao", "")))
+            produtos = [p for p in self.api_client.registros_sincronizados("produtos") if p["disponivel"]]
+            self.modelo_produtos.atualizar(produtos)
                 
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao carregar produtos: {e}")
             
-    def atualizar_mesas(self):
-        """Atualiza a lista de mesas"""
+    def preencher_tabela_mesas(self):
+        """Atualiza a lista de mesas a partir do estado sincronizado"""
         try:
-            mesas = self.api_client.listar_mesas()
-            
-            self.table_mesas.setRowCount(len(mesas))
-            for i, mesa in enumerate(mesas):
-                self.table_mesas.setItem(i, 0, QTableWidgetItem(str(mesa["id"])))
-                self.table_mesas.setItem(i, 1, QTableWidgetItem(str(mesa["numero"])))
-                self.table_mesas.setItem(i, 2, QTableWidgetItem(mesa["status"]))
-                
-                # Botão para abrir comanda
-                btn_abrir = QPushButton("Abrir Comanda")
-                btn_abrir.clicked.connect(lambda checked, m=mesa: self.abrir_comanda_mesa(m))
-                self.table_mesas.setCellWidget(i, 3, btn_abrir)
+            self.modelo_mesas.atualizar(self.api_client.registros_sincronizados("mesas"))
                 
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao carregar mesas: {e}")
             
-    def atualizar_pedidos_online(self):
-        """Atualiza a lista de pedidos online"""
+    def preencher_tabela_pedidos_online(self):
+        """Atualiza a lista de pedidos online (mais recentes primeiro) a partir do estado sincronizado"""
         try:
-            pedidos = self.api_client.listar_pedidos_online()
-            
-            self.table_pedidos_online.setRowCount(len(pedidos))
-            for i, pedido in enumerate(pedidos):
-                self.table_pedidos_online.setItem(i, 0, QTableWidgetItem(str(pedido["id"])))
-                self.table_pedidos_online.setItem(i, 1, QTableWidgetItem(pedido["nome_cliente"]))
-                self.table_pedidos_online.setItem(i, 2, QTableWidgetItem(pedido["telefone"]))
-                self.table_pedidos_online.setItem(i, 3, QTableWidgetItem(f"R$ {pedido['total']:.2f}"))
-                self.table_pedidos_online.setItem(i, 4, QTableWidgetItem(pedido["status"]))
-                self.table_pedidos_online.setItem(i, 5, QTableWidgetItem(str(pedido["data_pedido"])))
-                
-                # Botão para ver detalhes
-                btn_ver = QPushButton("Ver")
-                btn_ver.clicked.connect(lambda checked, p=pedido: self.ver_pedido_online(p))
-                self.table_pedidos_online.setCellWidget(i, 6, btn_ver)
+            pedidos = self.api_client.registros_sincronizados("pedidos_online")[::-1][:LIMITE_PEDIDOS_ONLINE]
+            self.modelo_pedidos_online.atualizar(pedidos)
                 
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao carregar pedidos online: {e}")
             
+    def atualizar_contadores(self):
+        """Atualiza as estatísticas do dia com os contadores de comandas do servidor"""
+        hoje = date.today()
+        self.requisicoes.executar(
+            "obter_contadores_comandas", data_inicio=hoje, data_fim=hoje,
+            ao_concluir=self.exibir_contadores
+        )
+    
+    def exibir_contadores(self, contadores):
+        self.lbl_total_comandas.setText(str(contadores["total"]))
+        self.lbl_comandas_abertas.setText(str(contadores["abertas"]))
+        self.lbl_comandas_fechadas.setText(str(contadores["fechadas"]))
+        self.lbl_faturamento_dia.setText(f"R$ {contadores['faturamento']:.2f}")
+    
     def atualizar_relatorios(self):
         """Atualiza os relatórios"""
         try:
-            comandas = self.api_client.listar_comandas()
-            
-            total = len(comandas)
-            abertas = len([c for c in comandas if c["status"] == "aberta"])
-            fechadas = len([c for c in comandas if c["status"] == "fechada"])
-            faturamento = sum([c["total"] for c in comandas if c["status"] == "fechada"])
+            hoje = date.today()
+            self.atualizar_contadores()
             
-            self.lbl_total_comandas.setText(str(total))
-            self.lbl_comandas_abertas.setText(str(abertas))
-            self.lbl_comandas_fechadas.setText(str(fechadas))
-            self.lbl_faturamento_dia.setText(f"R$ {faturamento:.2f}")
+            # Histórico: comandas do dia já presentes no estado sincronizado
+            comandas_do_dia = [
+                c for c in self.api_client.registros_sincronizados("comandas")
+                if str(c["data_abertura"]).startswith(hoje.isoformat())
+            ]
             
             # Atualizar gráficos
             if hasattr(self, 'charts_widget'):
                 self.charts_widget.atualizar_graficos()
             
             # Histórico - mostrar apenas comandas do dia
-            from datetime import datetime
-            hoje = datetime.now().date()
-            comandas_do_dia = []
-            for c in comandas:
-                data_abertura = c["data_abertura"]
-                if isinstance(data_abertura, str):
-                    if 'T' in data_abertura:
-                        data = datetime.fromisoformat(data_abertura.replace('Z', '+00:00')).date()
-                    else:
-                        data = datetime.strptime(data_abertura, '%Y-%m-%d').date()
-                else:
-                    data = data_abertura.date()
-                if data == hoje:
-                    comandas_do_dia.append(c)
             self.table_historico.setRowCount(len(comandas_do_dia))
             for i, comanda in enumerate(comandas_do_dia):
                 self.table_historico.setItem(i, 0, QTableWidgetItem(str(comanda["id"])))
@@ -717,21 +793,15 @@ class MainWindow(QMainWindow):
         
     def selecionar_comanda(self):
         """Seleciona uma comanda da lista"""
-        current_row = self.table_comandas.currentRow()
-        if current_row >= 0:
-            item = self.table_comandas.item(current_row, 0)
-            if item is not None:
-                comanda_id = int(item.text())
-                self.carregar_detalhes_comanda(comanda_id)
+        comanda = self.modelo_comandas.registro(self.table_comandas.currentIndex().row())
+        if comanda is not None:
+            self.carregar_detalhes_comanda(comanda["id"])
             
     def selecionar_pedido_online(self):
         """Seleciona um pedido online da lista"""
-        current_row = self.table_pedidos_online.currentRow()
-        if current_row >= 0:
-            item = self.table_pedidos_online.item(current_row, 0)
-            if item is not None:
-                pedido_id = int(item.text())
-                self.carregar_detalhes_pedido_online(pedido_id)
+        pedido = self.modelo_pedidos_online.registro(self.table_pedidos_online.currentIndex().row())
+        if pedido is not None:
+            self.carregar_detalhes_pedido_online(pedido["id"])
             
     def carregar_detalhes_comanda(self, comanda_id):
         """Carrega detalhes de uma comanda"""
@@ -794,7 +864,7 @@ class MainWindow(QMainWindow):
         try:
             self.api_client.fechar_comanda(self.comanda_atual["id"])
             QMessageBox.information(self, "Sucesso", "Comanda fechada com sucesso")
-            self.atualizar_comandas()
+            self.atualizar_dados()
             self.comanda_atual = None
             self.limpar_detalhes_comanda()
         except Exception as e:
@@ -809,7 +879,7 @@ class MainWindow(QMainWindow):
         try:
             self.api_client.finalizar_comanda(self.comanda_atual["id"])
             QMessageBox.information(self, "Sucesso", "Pagamento finalizado com sucesso")
-            self.atualizar_comandas()
+            self.atualizar_dados()
             self.comanda_atual = None
             self.limpar_detalhes_comanda()
         except Exception as e:
@@ -848,7 +918,7 @@ class MainWindow(QMainWindow):
             self.api_client.criar_produto(nome, preco, categoria, descricao)
             QMessageBox.information(self, "Sucesso", "Produto cadastrado com sucesso")
             self.limpar_form_produto()
-            self.atualizar_produtos()
+            self.atualizar_dados()
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao cadastrar produto: {e}")
             
@@ -871,7 +941,7 @@ class MainWindow(QMainWindow):
             self.api_client.criar_mesa(numero)
             QMessageBox.information(self, "Sucesso", "Mesa cadastrada com sucesso")
             self.spin_numero_mesa.setValue(1)
-            self.atualizar_mesas()
+            self.atualizar_dados()
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao cadastrar mesa: {e}")
             
@@ -890,8 +960,7 @@ class MainWindow(QMainWindow):
         try:
             self.api_client.criar_comanda(mesa["id"])
             QMessageBox.information(self, "Sucesso", f"Comanda aberta para mesa {mesa['numero']}")
-            self.atualizar_comandas()
-            self.atualizar_mesas()
+            self.atualizar_dados()
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao abrir comanda: {e}")
             
@@ -909,25 +978,27 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Aviso", "Nenhum produto cadastrado")
                 return
                 
-            # Abrir diálogo para selecionar produto
+            # Abrir diálogo para selecionar os produtos
             dialog = AdicionarProdutoDialog(produtos, self)
             if dialog.exec_() == QDialog.Accepted:
-                produto, quantidade = dialog.get_produto_quantidade()
+                itens = dialog.get_itens()
                 
-                if produto and quantidade > 0:
-                    # Adicionar item à comanda
-                    self.api_client.adicionar_item_comanda(
+                if itens:
+                    # Todos os itens em uma única requisição e transação
+                    adicionados = self.api_client.adicionar_itens_comanda(
                         self.comanda_atual["id"],
-                        produto["id"],
-                        quantidade
+                        [{"produto_id": produto["id"], "quantidade": quantidade} for produto, quantidade in itens]
                     )
+                    if adicionados is None:
+                        QMessageBox.warning(self, "Erro", "Não foi possível adicionar os produtos à comanda")
+                        return
                     
-                    QMessageBox.information(self, "Sucesso", 
-                                          f"Produto '{produto['nome']}' adicionado à comanda")
+                    nomes = ", ".join(f"{quantidade}x {produto['nome']}" for produto, quantidade in itens)
+                    QMessageBox.information(self, "Sucesso", f"Adicionado à comanda: {nomes}")
                     
                     # Atualizar detalhes da comanda
                     self.carregar_detalhes_comanda(self.comanda_atual["id"])
-                    self.atualizar_comandas()
+                    self.atualizar_dados()
                     
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao adicionar produto: {e}")
@@ -942,7 +1013,7 @@ class MainWindow(QMainWindow):
         try:
             self.api_client.atualizar_status_pedido_online(self.pedido_online_atual["id"], "confirmado")
             QMessageBox.information(self, "Sucesso", "Pedido confirmado com sucesso")
-            self.atualizar_pedidos_online()
+            self.atualizar_dados()
             self.carregar_detalhes_pedido_online(self.pedido_online_atual["id"])
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao confirmar pedido: {e}")
@@ -956,7 +1027,7 @@ class MainWindow(QMainWindow):
         try:
             self.api_client.atualizar_status_pedido_online(self.pedido_online_atual["id"], "preparando")
             QMessageBox.information(self, "Sucesso", "Pedido marcado como em preparação")
-            self.atualizar_pedidos_online()
+            self.atualizar_dados()
             self.carregar_detalhes_pedido_online(self.pedido_online_atual["id"])
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao atualizar status: {e}")
@@ -970,7 +1041,7 @@ class MainWindow(QMainWindow):
         try:
             self.api_client.atualizar_status_pedido_online(self.pedido_online_atual["id"], "entregando")
             QMessageBox.information(self, "Sucesso", "Pedido marcado como entregando")
-            self.atualizar_pedidos_online()
+            self.atualizar_dados()
             self.carregar_detalhes_pedido_online(self.pedido_online_atual["id"])
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao atualizar status: {e}")
@@ -984,7 +1055,7 @@ class MainWindow(QMainWindow):
         try:
             self.api_client.atualizar_status_pedido_online(self.pedido_online_atual["id"], "entregue")
             QMessageBox.information(self, "Sucesso", "Pedido marcado como entregue")
-            self.atualizar_pedidos_online()
+            self.atualizar_dados()
             self.pedido_online_atual = None
             self.limpar_detalhes_pedido_online()
         except Exception as e:
@@ -999,7 +1070,7 @@ class MainWindow(QMainWindow):
             try:
                 self.api_client.cancelar_comanda(self.comanda_atual["id"])
                 QMessageBox.information(self, "Sucesso", "Comanda cancelada com sucesso.")
-                self.atualizar_comandas()
+                self.atualizar_dados()
                 self.limpar_detalhes_comanda()
             except Exception as e:
                 QMessageBox.warning(self, "Erro", f"Erro ao cancelar comanda: {e}")
@@ -1013,7 +1084,7 @@ class MainWindow(QMainWindow):
             try:
                 self.api_client.atualizar_status_pedido_online(self.pedido_online_atual["id"], "cancelado")
                 QMessageBox.information(self, "Sucesso", "Pedido cancelado com sucesso.")
-                self.atualizar_pedidos_online()
+                self.atualizar_dados()
                 self.limpar_detalhes_pedido_online()
             except Exception as e:
                 QMessageBox.warning(self, "Erro", f"Erro ao cancelar pedido: {e}") 
@@ -1036,25 +1107,25 @@ class MainWindow(QMainWindow):
         # Limpar detalhes de comanda
         self.comanda_atual = None
         self.limpar_detalhes_comanda()
-        if hasattr(self, 'table_comandas'):
-            self.table_comandas.setRowCount(0)
+        if hasattr(self, 'modelo_comandas'):
+            self.modelo_comandas.atualizar([])
         
         # Limpar detalhes de pedido online
         self.pedido_online_atual = None
         self.limpar_detalhes_pedido_online()
-        if hasattr(self, 'table_pedidos_online'):
-            self.table_pedidos_online.setRowCount(0)
+        if hasattr(self, 'modelo_pedidos_online'):
+            self.modelo_pedidos_online.atualizar([])
         
         # Limpar formulário de produto
         self.limpar_form_produto()
-        if hasattr(self, 'table_produtos'):
-            self.table_produtos.setRowCount(0)
+        if hasattr(self, 'modelo_produtos'):
+            self.modelo_produtos.atualizar([])
         
         # Limpar formulário de mesa
         if hasattr(self, 'spin_numero_mesa'):
             self.spin_numero_mesa.setValue(1)
-        if hasattr(self, 'table_mesas'):
-            self.table_mesas.setRowCount(0)
+        if hasattr(self, 'modelo_mesas'):
+            self.modelo_mesas.atualizar([])
         
         # Limpar histórico de comandas
         if hasattr(self, 'table_historico'):
@@ -1074,6 +1145,9 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'lbl_faturamento_dia'):
             self.lbl_faturamento_dia.setText("R$ 0,00")
         
+        # Descartar o estado sincronizado para recarregar tudo na próxima atualização
+        self.api_client.versao_sincronizada = 0
+        
         # Limpar gráficos
         if hasattr(self, 'charts_widget'):
             self.charts_widget.limpar_graficos() if hasattr(self.charts_widget, 'limpar_graficos') else None
@@ -1081,78 +1155,26 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "Limpeza", "Todas as telas foram limpas com sucesso.")
     
     def baixar_relatorio(self):
-        """Baixa relatório em formato CSV"""
+        """Baixa o relatório gerado pelo backend (CSV, ou XLSX se o servidor tiver openpyxl)"""
         try:
-            # Obter dados para o relatório
-            comandas = self.api_client.listar_comandas()
-            pedidos_online = self.api_client.listar_pedidos_online()
-            produtos = self.api_client.listar_produtos()
-            
             # Solicitar local para salvar
-            filename, _ = QFileDialog.getSaveFileName(
+            filename, filtro = QFileDialog.getSaveFileName(
                 self, 
                 "Salvar Relatório", 
                 f"relatorio_padaria_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                "Arquivos CSV (*.csv)"
+                "Arquivos CSV (*.csv);;Planilhas Excel (*.xlsx)"
             )
             
             if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    
-                    # Cabeçalho
-                    writer.writerow(['RELATÓRIO PADARIA - ' + datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
-                    writer.writerow([])
-                    
-                    # Estatísticas gerais
-                    writer.writerow(['ESTATÍSTICAS GERAIS'])
-                    writer.writerow(['Total de Comandas', len(comandas)])
-                    writer.writerow(['Comandas Abertas', len([c for c in comandas if c['status'] == 'aberta'])])
-                    writer.writerow(['Comandas Fechadas', len([c for c in comandas if c['status'] == 'fechada'])])
-                    writer.writerow(['Comandas Canceladas', len([c for c in comandas if c['status'] == 'cancelada'])])
-                    writer.writerow(['Total de Pedidos Online', len(pedidos_online)])
-                    writer.writerow(['Faturamento Total', f"R$ {sum([c['total'] for c in comandas if c['status'] == 'fechada']):.2f}"])
-                    writer.writerow([])
-                    
-                    # Comandas
-                    writer.writerow(['COMANDA', 'MESA', 'STATUS', 'TOTAL', 'ITENS', 'DATA ABERTURA', 'DATA FECHAMENTO'])
-                    for comanda in comandas:
-                        writer.writerow([
-                            comanda['id'],
-                            comanda['mesa_numero'],
-                            comanda['status'],
-                            f"R$ {comanda['total']:.2f}",
-                            comanda['quantidade_itens'],
-                            comanda['data_abertura'],
-                            comanda.get('data_fechamento', '')
-                        ])
-                    writer.writerow([])
-                    
-                    # Pedidos Online
-                    writer.writerow(['PEDIDO ONLINE', 'CLIENTE', 'TELEFONE', 'STATUS', 'TOTAL', 'ITENS', 'DATA PEDIDO'])
-                    for pedido in pedidos_online:
-                        writer.writerow([
-                            pedido['id'],
-                            pedido['nome_cliente'],
-                            pedido['telefone'],
-                            pedido['status'],
-                            f"R$ {pedido['total']:.2f}",
-                            pedido['quantidade_itens'],
-                            pedido['data_pedido']
-                        ])
-                    writer.writerow([])
-                    
-                    # Produtos
-                    writer.writerow(['PRODUTO', 'CATEGORIA', 'PREÇO', 'DESCRIÇÃO'])
-                    for produto in produtos:
-                        writer.writerow([
-                            produto['nome'],
-                            produto['categoria'],
-                            f"R$ {produto['preco']:.2f}",
-                            produto.get('descricao', '')
-                        ])
+                formato = "xlsx" if filename.lower().endswith(".xlsx") or "xlsx" in filtro else "csv"
+                if not filename.lower().endswith(f".{formato}"):
+                    filename = f"{os.path.splitext(filename)[0]}.{formato}"
                 
-                QMessageBox.information(self, "Sucesso", f"Relatório salvo com sucesso em:\n{filename}")
+                # O arquivo é gravado em blocos enquanto o backend lê as linhas do banco
+                if self.api_client.baixar_relatorio(filename, formato):
+                    QMessageBox.information(self, "Sucesso", f"Relatório salvo com sucesso em:\n{filename}")
+                else:
+                    QMessageBox.warning(self, "Erro", "Não foi possível baixar o relatório do servidor")
                 
         except Exception as e:
             QMessageBox.warning(self, "Erro", f"Erro ao gerar relatório: {e}")
@@ -1163,11 +1185,11 @@ class MainWindow(QMainWindow):
     
     def atualizar_reservas(self):
         """Atualiza a lista de reservas"""
-        try:
-            reservas = self.api_client.listar_reservas()
-            self.preencher_tabela_reservas(reservas)
-        except Exception as e:
-            QMessageBox.warning(self, "Erro", f"Erro ao carregar reservas: {e}")
+        self.requisicoes.executar(
+            "listar_reservas",
+            ao_concluir=self.preencher_tabela_reservas,
+            ao_falhar=lambda e: QMessageBox.warning(self, "Erro", f"Erro ao carregar reservas: {e}")
+        )
     
     def preencher_tabela_reservas(self, reservas):
         """Preenche a tabela de reservas"""
@@ -1263,7 +1285,7 @@ class MainWindow(QMainWindow):
                 
                 # Atualizar tabelas
                 self.atualizar_reservas()
-                self.atualizar_mesas()
+                self.atualizar_dados()
                 
                 # Limpar detalhes
                 self.limpar_detalhes_reserva()
@@ -1299,8 +1321,7 @@ class MainWindow(QMainWindow):
                 
                 # Atualizar tabelas
                 self.atualizar_reservas()
-                self.atualizar_mesas()
-                self.atualizar_comandas()
+                self.atualizar_dados()
                 
                 # Limpar detalhes
                 self.limpar_detalhes_reserva()
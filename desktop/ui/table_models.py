@@ -0,0 +1,130 @@
+"""
+Modelos de tabela das listas da janela principal
+
+As listas de comandas, produtos, mesas e pedidos online eram QTableWidgets
+recriadas a cada atualização (setRowCount, um QTableWidgetItem por célula e
+um QPushButton por linha). Aqui cada lista é um QAbstractTableModel indexado
+pelo id do registro: `atualizar` compara os registros novos com as linhas
+atuais e avisa a view apenas das linhas removidas, inseridas ou alteradas.
+
+Os botões das linhas ("Ver", "Abrir Comanda") são desenhados por um único
+delegate por coluna, criado junto com a tabela.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import QAbstractTableModel, QEvent, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+# Título da coluna e função que formata o registro para exibição
+Coluna = Tuple[str, Callable[[Dict], str]]
+
+class ModeloTabela(QAbstractTableModel):
+    """Registros (dicts com "id") exibidos em uma QTableView, uma linha por id"""
+
+    def __init__(self, colunas: Sequence[Coluna], parent=None):
+        super().__init__(parent)
+        self._colunas = list(colunas)
+        self._ids: List[int] = []
+        self._registros: Dict[int, Dict] = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._colunas)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._colunas[section][0]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        registro = self._registros[self._ids[index.row()]]
+        if role == Qt.DisplayRole:
+            return self._colunas[index.column()][1](registro)
+        if role == Qt.UserRole:
+            return registro
+        return None
+
+    def registro(self, linha: int) -> Optional[Dict]:
+        if 0 <= linha < len(self._ids):
+            return self._registros[self._ids[linha]]
+        return None
+
+    def atualizar(self, registros: List[Dict]):
+        """Aplica a nova lista emitindo só os sinais das linhas que mudaram"""
+        novos_ids = [registro["id"] for registro in registros]
+        novos = {registro["id"]: registro for registro in registros}
+
+        # Linhas removidas, em blocos contíguos de baixo para cima
+        linha = len(self._ids) - 1
+        while linha >= 0:
+            if self._ids[linha] in novos:
+                linha -= 1
+                continue
+            fim = linha
+            while linha >= 0 and self._ids[linha] not in novos:
+                linha -= 1
+            self.beginRemoveRows(QModelIndex(), linha + 1, fim)
+            for registro_id in self._ids[linha + 1:fim + 1]:
+                del self._registros[registro_id]
+            del self._ids[linha + 1:fim + 1]
+            self.endRemoveRows()
+
+        # As linhas que ficaram mudaram de ordem: redesenha a tabela inteira
+        if self._ids != [registro_id for registro_id in novos_ids if registro_id in self._registros]:
+            self.beginResetModel()
+            self._ids, self._registros = novos_ids, novos
+            self.endResetModel()
+            return
+
+        # Linhas inseridas, também em blocos contíguos
+        linha = 0
+        while linha < len(novos_ids):
+            if linha < len(self._ids) and self._ids[linha] == novos_ids[linha]:
+                linha += 1
+                continue
+            fim = linha
+            while fim < len(novos_ids) and novos_ids[fim] not in self._registros:
+                fim += 1
+            self.beginInsertRows(QModelIndex(), linha, fim - 1)
+            self._ids[linha:linha] = novos_ids[linha:fim]
+            for registro_id in novos_ids[linha:fim]:
+                self._registros[registro_id] = novos[registro_id]
+            self.endInsertRows()
+            linha = fim
+
+        # Linhas alteradas
+        ultima_coluna = len(self._colunas) - 1
+        for linha, registro_id in enumerate(self._ids):
+            if self._registros[registro_id] != novos[registro_id]:
+                self._registros[registro_id] = novos[registro_id]
+                self.dataChanged.emit(self.index(linha, 0), self.index(linha, ultima_coluna))
+
+class BotaoDelegate(QStyledItemDelegate):
+    """Desenha um botão na célula e emite `clicado` com o registro da linha"""
+
+    clicado = pyqtSignal(dict)
+
+    def __init__(self, texto: str, parent=None):
+        super().__init__(parent)
+        self.texto = texto
+
+    def paint(self, painter, option, index):
+        botao = QStyleOptionButton()
+        botao.rect = option.rect.adjusted(2, 2, -2, -2)
+        botao.text = self.texto
+        botao.state = QStyle.State_Enabled
+        estilo = option.widget.style() if option.widget else QApplication.style()
+        estilo.drawControl(QStyle.CE_PushButton, botao, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and option.rect.contains(event.pos())):
+            registro = index.data(Qt.UserRole)
+            if registro is not None:
+                self.clicado.emit(registro)
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -9,7 +9,8 @@ import sys
 sys.path.append('backend')
 
 from backend.app.database import engine
-from backend.app.models import Base, Produto, Mesa, Comanda, ItemComanda, Garcom, AtendimentoGarcom, SincronizacaoOffline, PedidoOnline, ItemPedidoOnline
+from backend.app.configuracoes import DATABASE_PATH
+from backend.app.migracoes import atualizar_banco
 
 def create_database():
     print("🍞 Forçando criação do banco de dados...")
@@ -17,14 +18,14 @@ def create_database():
     
     try:
         # Remover banco existente se estiver vazio
-        db_path = "backend/database/padaria.db"
+        db_path = DATABASE_PATH
         if os.path.exists(db_path) and os.path.getsize(db_path) == 0:
             os.remove(db_path)
             print("🗑️ Removido banco vazio")
         
         # Criar todas as tabelas
         print("📝 Criando tabelas...")
-        Base.metadata.create_all(bind=engine)
+        atualizar_banco(engine)
         print("✅ Tabelas criadas com sucesso!")
         
         # Verificar se funcionou
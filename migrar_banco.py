@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Script para atualizar o esquema do banco de dados até a versão mais recente
+
+Uso:
+    python migrar_banco.py            # aplica todas as migrações pendentes
+    python migrar_banco.py --status   # só mostra a versão atual e as pendentes
+
+Substitui os antigos scripts add_*_field.py, fix_database.py e
+create_reservas_tables.py. Funciona tanto em bancos novos quanto em bancos
+alterados por esses scripts. No SQLite, um backup do arquivo é criado antes
+de aplicar as migrações.
+"""
+import argparse
+import os
+import shutil
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.engine import make_url
+
+from backend.app.database import engine, eh_sqlite, SQLALCHEMY_DATABASE_URL
+from backend.app.migracoes import atualizar_banco, migracoes_pendentes, versao_esquema, versao_mais_recente
+
+def arquivo_sqlite():
+    """Caminho do arquivo do banco, se for um SQLite que já existe"""
+    if not eh_sqlite(SQLALCHEMY_DATABASE_URL):
+        return None
+    caminho = make_url(SQLALCHEMY_DATABASE_URL).database
+    if not caminho or not os.path.exists(caminho):
+        return None
+    return caminho
+
+def fazer_backup(caminho):
+    """Copia o arquivo SQLite antes de alterar o esquema"""
+    backup = f"{caminho}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    shutil.copy2(caminho, backup)
+    return backup
+
+def main():
+    parser = argparse.ArgumentParser(description="Atualiza o esquema do banco da padaria")
+    parser.add_argument("--status", action="store_true", help="Apenas mostra as migrações pendentes")
+    args = parser.parse_args()
+
+    print("🍞 Migrações do banco de dados da padaria")
+    print("=" * 60)
+
+    # Verificado antes de conectar, pois a conexão cria o arquivo
+    caminho = arquivo_sqlite()
+
+    try:
+        with engine.connect() as conn:
+            atual = versao_esquema(conn)
+        pendentes = migracoes_pendentes(engine)
+    except Exception as e:
+        print(f"❌ Erro ao acessar o banco: {e}")
+        return 1
+
+    print(f"📋 Versão atual do esquema: {atual} (mais recente: {versao_mais_recente()})")
+    if not pendentes:
+        print("✅ Banco de dados já está atualizado!")
+        return 0
+
+    for m in pendentes:
+        print(f"  - {m.versao:03d}: {m.descricao}")
+    if args.status:
+        return 0
+
+    if caminho:
+        backup = fazer_backup(caminho)
+        print(f"✅ Backup criado: {backup}")
+
+    try:
+        for m in atualizar_banco(engine):
+            print(f"✅ Migração {m.versao:03d} aplicada")
+    except Exception as e:
+        print(f"❌ Erro ao aplicar migrações: {e}")
+        return 1
+
+    print("\n🎉 Banco de dados atualizado com sucesso!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
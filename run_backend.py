@@ -22,6 +22,12 @@ def main():
     #     print("Erro ao instalar dependências")
     #     sys.exit(1)
     
+    # Atualizar o esquema do banco antes de subir a API
+    resultado = subprocess.run([sys.executable, "migrar_banco.py"])
+    if resultado.returncode != 0:
+        print("Erro ao atualizar o banco de dados")
+        sys.exit(1)
+    
     # Executar o backend
     print("Iniciando backend...")
     print("API estará disponível em: http://localhost:8000")
@@ -9,13 +9,14 @@ import os
 sys.path.insert(0, os.path.join(os.getcwd(), "backend"))
 
 from app.database import engine, SessionLocal
-from app.models import Base, Mesa, Produto, PedidoOnline, ItemPedidoOnline
+from app.migracoes import atualizar_banco
+from app.models import Mesa, Produto, PedidoOnline, ItemPedidoOnline
 from app.schemas import MesaCreate, ProdutoCreate
 
 def criar_tabelas():
     """Cria as tabelas no banco de dados"""
     print("Criando tabelas...")
-    Base.metadata.create_all(bind=engine)
+    atualizar_banco(engine)
     print("Tabelas criadas com sucesso!")
 
 def inserir_dados_iniciais():
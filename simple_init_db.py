@@ -10,7 +10,8 @@ import sqlite3
 sys.path.append('backend')
 
 from backend.app.database import engine
-from backend.app.models import Base
+from backend.app.configuracoes import DATABASE_PATH
+from backend.app.migracoes import atualizar_banco
 
 def init_database():
     print("🍞 Inicializando banco de dados da padaria...")
@@ -19,11 +20,11 @@ def init_database():
     try:
         # Criar todas as tabelas usando SQLAlchemy
         print("📝 Criando tabelas...")
-        Base.metadata.create_all(bind=engine)
+        atualizar_banco(engine)
         print("✅ Tabelas criadas com sucesso!")
         
         # Verificar se o banco foi criado
-        db_path = "backend/database/padaria.db"
+        db_path = DATABASE_PATH
         if not os.path.exists(db_path):
             print(f"❌ Banco não foi criado em: {db_path}")
             return False
@@ -130,11 +130,11 @@ import sys
 import os
 sys.path.append('backend')
 from app.database import engine, SessionLocal
-from app import models
+from app.migracoes import atualizar_banco
 from app.models import Mesa, Produto, Garcom
 
-# Criar tabelas
-models.Base.metadata.create_all(bind=engine)
+# Criar/atualizar tabelas
+atualizar_banco(engine)
 print("[OK] Tabelas criadas com sucesso")
 
 # Inserir dados iniciais
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Testes dos agregados de vendas, dos relatórios (/relatorios/) e dos
+contadores de comandas em memória
+
+Uso: python test_agregados_vendas.py   (ou via pytest)
+"""
+import asyncio
+import csv
+import io
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models, schemas
+from backend.app.agregados import recalcular_agregados
+from backend.app.exportacao import LINHAS_POR_BLOCO
+from conftest import contar_consultas, executar_testes, popular
+
+ONTEM = datetime.now() - timedelta(days=1)
+
+def preparar(banco):
+    """Mesas 1 a 3, pão e café, e uma comanda antiga, já fechada, aberta ontem"""
+    engine, Session = banco
+    popular(Session, mesas=3, produtos=["Pão Francês", "Café"])
+    db = Session()
+    db.add(models.Comanda(mesa_id=3, status="fechada", total=20.0, data_abertura=ONTEM))
+    db.commit()
+    db.close()
+    return engine, Session
+
+def movimentar(Session):
+    """Sequência típica de um dia: comandas e pedidos passando por vários status"""
+    db = Session()
+    try:
+        comanda = api.criar_comanda(schemas.ComandaCreate(mesa_id=1), db=db)
+        api.adicionar_itens_comanda(comanda.id, [
+            schemas.ItemComandaCreate(produto_id=1, quantidade=10, preco_unitario=0),
+            schemas.ItemComandaCreate(produto_id=2, quantidade=2, preco_unitario=0),
+        ], db=db)
+        api.fechar_comanda(comanda.id, db=db)
+        api.finalizar_comanda(comanda.id, db=db)
+
+        cancelada = api.criar_comanda(schemas.ComandaCreate(mesa_id=2), db=db)
+        api.adicionar_item_comanda(cancelada.id, schemas.ItemComandaCreate(produto_id=2, quantidade=1, preco_unitario=0), db=db)
+        api.cancelar_comanda(cancelada.id, db=db)
+
+        aberta = api.criar_comanda(schemas.ComandaCreate(mesa_id=2), db=db)
+        api.adicionar_item_comanda(aberta.id, schemas.ItemComandaCreate(produto_id=1, quantidade=4, preco_unitario=0), db=db)
+
+        for status in ("confirmado", "entregue", None):
+            pedido = asyncio.run(api.criar_pedido_online(schemas.PedidoOnlineCreate(
+                nome_cliente="Maria Santos", telefone="(11) 99999-2222", endereco="Av. Principal, 456",
+                forma_pagamento="pix",
+                itens=[schemas.ItemPedidoOnlineCreate(produto_id=2, quantidade=2, preco_unitario=0)]
+            ), db=db))
+            if status:
+                api.atualizar_status_pedido(pedido.id, "confirmado", db=db)
+                api.atualizar_status_pedido(pedido.id, status, db=db)
+    finally:
+        db.close()
+
+def ler_agregados(conn):
+    tabela = models.VendaAgregada.__table__
+    linhas = conn.execute(select(
+        tabela.c.data, tabela.c.hora, tabela.c.origem, tabela.c.status, tabela.c.quantidade, tabela.c.faturamento
+    )).all()
+    return sorted((*linha[:5], round(linha[5], 2)) for linha in linhas if linha.quantidade)
+
+def test_incremental_igual_a_recalculado(banco):
+    engine, Session = preparar(banco)
+    movimentar(Session)
+    with engine.begin() as conn:
+        incremental = ler_agregados(conn)
+        recalcular_agregados(conn)
+        assert incremental == ler_agregados(conn)
+
+def test_resumo_por_periodo(banco):
+    engine, Session = preparar(banco)
+    movimentar(Session)
+    db = Session()
+    # Data gravada pelo banco na abertura (no SQLite, CURRENT_TIMESTAMP em UTC)
+    hoje = db.query(func.max(models.Comanda.data_abertura)).scalar().date()
+
+    resumo = api.relatorio_resumo(data_inicio=hoje, data_fim=hoje, db=db)
+    assert resumo.comandas["fechada"] == schemas.TotalVendas(quantidade=1, faturamento=12.0)
+    assert resumo.comandas["cancelado"].quantidade == 1
+    assert resumo.comandas["aberta"] == schemas.TotalVendas(quantidade=1, faturamento=2.0)
+    assert "aguardando_pagamento" not in resumo.comandas
+    assert resumo.pedidos_online["entregue"] == schemas.TotalVendas(quantidade=1, faturamento=7.0)
+    assert {s: t.quantidade for s, t in resumo.pedidos_online.items()} == {
+        "confirmado": 1, "entregue": 1, "pendente": 1
+    }
+
+    # Sem período, inclui a comanda de ontem
+    assert api.relatorio_resumo(db=db).comandas["fechada"].faturamento == 32.0
+
+    por_dia = api.relatorio_vendas(data_inicio=ONTEM.date(), data_fim=ONTEM.date(), db=db)
+    assert [(v.origem, v.status, v.quantidade, v.hora) for v in por_dia] == [("comanda", "fechada", 1, None)]
+    por_hora = api.relatorio_vendas(data_inicio=ONTEM.date(), data_fim=ONTEM.date(), agrupamento="hora", db=db)
+    assert por_hora[0].hora == ONTEM.hour
+    db.close()
+
+def test_produtos_mais_vendidos(banco):
+    engine, Session = preparar(banco)
+    movimentar(Session)
+    db = Session()
+
+    # A comanda cancelada (1 Café) fica de fora
+    por_quantidade = api.relatorio_produtos_mais_vendidos(db=db)
+    assert [(p.nome, p.quantidade, p.faturamento) for p in por_quantidade] == [
+        ("Pão Francês", 14, 7.0), ("Café", 8, 28.0)
+    ]
+    por_faturamento = api.relatorio_produtos_mais_vendidos(limite=1, ordenar_por="faturamento", db=db)
+    assert [p.nome for p in por_faturamento] == ["Café"]
+    assert api.relatorio_produtos_mais_vendidos(data_inicio=ONTEM.date(), data_fim=ONTEM.date(), db=db) == []
+    db.close()
+
+def exportar_csv(Session, **filtros):
+    """Consome a StreamingResponse como o cliente faria; retorna (blocos, secoes)"""
+    db = Session()
+    resposta = api.exportar_relatorio(db=db, **filtros)
+    db.close()  # a resposta usa uma sessão própria
+
+    async def ler():
+        return [bloco async for bloco in resposta.body_iterator]
+
+    blocos = asyncio.run(ler())
+    assert resposta.headers["content-disposition"].startswith('attachment; filename="relatorio_padaria_')
+    secoes, atual = {}, None
+    for linha in list(csv.reader(io.StringIO("".join(blocos))))[2:]:
+        if len(linha) == 1:
+            atual = secoes.setdefault(linha[0], [])
+        elif linha and atual is not None:
+            atual.append(linha)
+    return blocos, secoes
+
+def test_exportar_relatorio_csv(banco):
+    engine, Session = preparar(banco)
+    movimentar(Session)
+
+    _, secoes = exportar_csv(Session)
+    assert secoes["COMANDAS"][0] == ["COMANDA", "MESA", "STATUS", "TOTAL", "ITENS", "DATA ABERTURA", "DATA FECHAMENTO"]
+    assert [(c[0], c[2], c[3], c[4]) for c in secoes["COMANDAS"][1:]] == [
+        ("1", "fechada", "20.0", "0"), ("2", "fechada", "12.0", "2"),
+        ("3", "cancelado", "3.5", "1"), ("4", "aberta", "2.0", "1"),
+    ]
+    assert len(secoes["PEDIDOS ONLINE"]) == 4
+    assert [p[0] for p in secoes["PRODUTOS"][1:]] == ["Pão Francês", "Café"]
+    assert ["comanda", "fechada", "2", "32.0"] in secoes["RESUMO"]
+
+    _, secoes = exportar_csv(Session, status=["fechada"], data_inicio=ONTEM.date(), data_fim=ONTEM.date())
+    assert [c[0] for c in secoes["COMANDAS"][1:]] == ["1"]
+    assert len(secoes["PEDIDOS ONLINE"]) == 1
+    assert secoes["RESUMO"][1:] == [["comanda", "fechada", "1", "20.0"]]
+
+    # Muitas linhas: o CSV sai em vários blocos em vez de uma única string
+    db = Session()
+    db.add_all([models.Comanda(mesa_id=3, status="fechada", total=1.0) for _ in range(2 * LINHAS_POR_BLOCO)])
+    db.commit()
+    db.close()
+    blocos, secoes = exportar_csv(Session, status=["fechada"])
+    assert len(secoes["COMANDAS"]) == 2 * LINHAS_POR_BLOCO + 3
+    assert len(blocos) >= 3
+
+def test_contadores_comandas(banco):
+    engine, Session = preparar(banco)
+    db = Session()
+    hoje = datetime.now().date()
+    assert api.contadores_comandas(db=db).total == 1  # Carrega o contador
+
+    movimentar(Session)
+
+    # Depois de carregado, o contador acompanha os commits sem consultar o banco
+    with contar_consultas(engine) as consultas:
+        contadores = api.contadores_comandas(db=db)
+    assert consultas == []
+    esperado = dict(
+        db.query(models.Comanda.status, func.count(models.Comanda.id)).group_by(models.Comanda.status).all()
+    )
+    assert {s: t.quantidade for s, t in contadores.por_status.items()} == esperado
+    assert (contadores.total, contadores.abertas, contadores.para_impressao) == (4, 1, 1)
+    assert (contadores.fechadas, contadores.faturamento) == (2, 32.0)
+
+    # Período: só a comanda de ontem
+    ontem = api.contadores_comandas(data_inicio=ONTEM.date(), data_fim=ONTEM.date(), db=db)
+    assert (ontem.total, ontem.fechadas, ontem.faturamento) == (1, 1, 20.0)
+
+    # Rollback não altera o contador; commit sim
+    aberta = db.query(models.Comanda).filter(models.Comanda.status == "aberta").one()
+    aberta.status = "aguardando_pagamento"
+    db.flush()
+    db.rollback()
+    assert api.contadores_comandas(db=db).aguardando_pagamento == 0
+    api.solicitar_fechamento_comanda(aberta.id, db=db)
+    contadores = api.contadores_comandas(db=db)
+    assert (contadores.abertas, contadores.aguardando_pagamento) == (0, 1)
+    db.close()
+
+def main():
+    return executar_testes("Testes dos agregados de vendas", [
+        test_incremental_igual_a_recalculado,
+        test_resumo_por_periodo,
+        test_produtos_mais_vendidos,
+        test_exportar_relatorio_csv,
+        test_contadores_comandas,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Testes do cardápio público em cache (GET /menu/{mesa_id}): leitura sem
+consultar o banco, ETag e 304, e o que invalida o cache
+
+Uso: python test_cardapio_publico.py   (ou via pytest)
+"""
+import json
+import os
+import sys
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import models
+from backend.app.main import obter_menu_publico
+from conftest import contar_consultas, executar_testes, popular
+
+PRODUTOS = ["Pão Francês", "Café", "Torta"]  # A torta está indisponível
+
+def requisicao(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/menu", "headers": headers})
+
+def pedir_menu(Session, engine, mesa_id, etag=None):
+    """Retorna (resposta, número de consultas SQL)"""
+    db = Session()
+    try:
+        with contar_consultas(engine) as consultas:
+            resposta = obter_menu_publico(mesa_id, requisicao(etag), db=db)
+        return resposta, len(consultas)
+    finally:
+        db.close()
+
+def test_cardapio_em_cache_e_304(banco):
+    engine, Session = banco
+    popular(Session, mesas=2, produtos=PRODUTOS)
+
+    resposta, consultas = pedir_menu(Session, engine, 1)
+    assert resposta.status_code == 200 and consultas > 0
+    menu = json.loads(resposta.body)
+    assert menu["mesa"] == {"id": 1, "numero": 1}
+    assert [p["nome"] for p in menu["produtos"]] == ["Pão Francês", "Café"]
+    assert menu["categorias"] == ["Pães", "Bebidas", "Doces"]
+    etag = resposta.headers["etag"]
+
+    resposta, consultas = pedir_menu(Session, engine, 1)
+    assert (resposta.status_code, consultas) == (200, 0)
+    assert resposta.headers["etag"] == etag
+
+    resposta, consultas = pedir_menu(Session, engine, 1, etag)
+    assert (resposta.status_code, consultas) == (304, 0)
+
+    # A outra mesa reaproveita o catálogo já carregado
+    resposta, consultas = pedir_menu(Session, engine, 2)
+    assert consultas == 0 and json.loads(resposta.body)["mesa"]["numero"] == 2
+
+def test_alteracao_de_produto_invalida(banco):
+    engine, Session = banco
+    popular(Session, mesas=2, produtos=PRODUTOS)
+    etag = pedir_menu(Session, engine, 1)[0].headers["etag"]
+
+    db = Session()
+    db.query(models.Produto).filter(models.Produto.nome == "Café").one().preco = 4.0
+    db.commit()
+    db.close()
+
+    resposta, consultas = pedir_menu(Session, engine, 1, etag)
+    assert resposta.status_code == 200 and consultas > 0
+    assert resposta.headers["etag"] != etag
+    assert json.loads(resposta.body)["produtos"][1]["preco"] == 4.0
+
+def test_status_da_mesa_e_rollback_nao_invalidam(banco):
+    engine, Session = banco
+    popular(Session, mesas=2, produtos=PRODUTOS)
+    pedir_menu(Session, engine, 1)
+
+    db = Session()
+    db.query(models.Mesa).filter(models.Mesa.id == 1).one().status = "ocupada"
+    db.commit()
+    db.query(models.Produto).filter(models.Produto.id == 1).one().preco = 1.0
+    db.flush()
+    db.rollback()
+    db.close()
+
+    assert pedir_menu(Session, engine, 1)[1] == 0
+
+def test_mesa_inexistente(banco):
+    engine, Session = banco
+    popular(Session, mesas=2, produtos=PRODUTOS)
+    try:
+        pedir_menu(Session, engine, 99)
+        assert False, "esperava 404"
+    except HTTPException as e:
+        assert e.status_code == 404
+
+    # Uma mesa nova passa a ter cardápio logo após o commit
+    db = Session()
+    db.add(models.Mesa(numero=99))
+    db.commit()
+    mesa_id = db.query(models.Mesa.id).filter(models.Mesa.numero == 99).scalar()
+    db.close()
+    assert pedir_menu(Session, engine, mesa_id)[0].status_code == 200
+
+def main():
+    return executar_testes("Testes do cardápio público em cache", [
+        test_cardapio_em_cache_e_304,
+        test_alteracao_de_produto_invalida,
+        test_status_da_mesa_e_rollback_nao_invalidam,
+        test_mesa_inexistente,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
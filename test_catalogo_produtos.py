@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Testes do cache do catálogo de produtos (backend/app/catalogo.py): listagens
+e itens de comanda sem consultar a tabela produtos, e write-through após o
+commit
+
+Uso: python test_catalogo_produtos.py   (ou via pytest)
+"""
+import os
+import sys
+
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models, schemas
+from backend.app.catalogo import cache_catalogo
+from conftest import contar_consultas, executar_testes, popular
+
+PRODUTOS = ["Pão Francês", "Café", "Torta"]  # A torta está indisponível
+
+def executar(Session, engine, chamada):
+    """Retorna (resultado, consultas SQL que leram a tabela produtos)"""
+    db = Session()
+    try:
+        with contar_consultas(engine) as consultas:
+            resultado = chamada(db)
+    finally:
+        db.close()
+    return resultado, [sql for sql in consultas if "FROM produtos" in sql]
+
+def test_listagens_em_cache(banco):
+    engine, Session = banco
+    popular(Session, mesas=1, produtos=PRODUTOS)
+    inicio = cache_catalogo.estatisticas()
+
+    produtos, consultas = executar(Session, engine, lambda db: api.listar_produtos(db=db))
+    assert [p.nome for p in produtos] == ["Pão Francês", "Café"] and len(consultas) == 1
+
+    _, consultas = executar(Session, engine, lambda db: (
+        api.listar_produtos(db=db),
+        api.listar_categorias(db=db),
+        api.listar_produtos_por_categoria("Bebidas", db=db),
+    ))
+    assert consultas == []
+    assert api.listar_categorias(db=None) == ["Pães", "Bebidas", "Doces"]
+    assert [p.nome for p in api.listar_produtos_por_categoria("Doces", db=None)] == []
+
+    fim = cache_catalogo.estatisticas()
+    assert fim["falhas"] - inicio["falhas"] == 1
+    assert fim["acertos"] - inicio["acertos"] == 5
+
+def test_criar_produto_escreve_no_cache(banco):
+    engine, Session = banco
+    popular(Session, mesas=1, produtos=PRODUTOS)
+    executar(Session, engine, lambda db: api.listar_produtos(db=db))
+    falhas = cache_catalogo.falhas
+
+    novo = schemas.ProdutoCreate(nome="Suco", preco=6.0, categoria="Bebidas")
+    executar(Session, engine, lambda db: api.criar_produto(novo, db=db))
+
+    produtos, consultas = executar(Session, engine, lambda db: api.listar_produtos_por_categoria("Bebidas", db=db))
+    assert [p.nome for p in produtos] == ["Café", "Suco"]
+    assert consultas == [] and cache_catalogo.falhas == falhas
+
+def test_alteracao_remocao_e_rollback(banco):
+    engine, Session = banco
+    popular(Session, mesas=1, produtos=PRODUTOS)
+    executar(Session, engine, lambda db: api.listar_produtos(db=db))
+
+    db = Session()
+    torta = db.query(models.Produto).filter(models.Produto.nome == "Torta").one()
+    torta.disponivel = True
+    db.delete(db.query(models.Produto).filter(models.Produto.nome == "Café").one())
+    db.commit()
+    db.query(models.Produto).filter(models.Produto.nome == "Torta").one().preco = 1.0
+    db.flush()
+    db.rollback()
+    db.close()
+
+    produtos = api.listar_produtos(db=None)
+    assert [(p.nome, p.preco) for p in produtos] == [("Pão Francês", 0.5), ("Torta", 9.0)]
+
+def test_itens_da_comanda_sem_consultar_produtos(banco):
+    engine, Session = banco
+    popular(Session, mesas=1, produtos=PRODUTOS)
+    comanda = executar(Session, engine, lambda db: api.criar_comanda(schemas.ComandaCreate(mesa_id=1), db=db))[0]
+    executar(Session, engine, lambda db: api.listar_produtos(db=db))
+
+    item = schemas.ItemComandaCreate(produto_id=2, quantidade=2, preco_unitario=0)
+    resposta, consultas = executar(Session, engine, lambda db: api.adicionar_item_comanda(comanda.id, item, db=db))
+    assert consultas == []
+    assert (resposta.produto.nome, resposta.preco_unitario) == ("Café", 3.5)
+
+    itens = [
+        schemas.ItemComandaCreate(produto_id=1, quantidade=4, preco_unitario=0),
+        schemas.ItemComandaCreate(produto_id=2, quantidade=1, preco_unitario=0),
+    ]
+    resposta, consultas = executar(Session, engine, lambda db: api.adicionar_itens_comanda(comanda.id, itens, db=db))
+    assert consultas == [] and [i.produto.nome for i in resposta] == ["Pão Francês", "Café"]
+
+    for produto_id, status in ((3, 400), (99, 404)):
+        item = schemas.ItemComandaCreate(produto_id=produto_id, quantidade=1, preco_unitario=0)
+        try:
+            executar(Session, engine, lambda db: api.adicionar_item_comanda(comanda.id, item, db=db))
+            assert False, f"esperava {status}"
+        except HTTPException as e:
+            assert e.status_code == status
+
+def main():
+    return executar_testes("Testes do cache do catálogo de produtos", [
+        test_listagens_em_cache,
+        test_criar_produto_escreve_no_cache,
+        test_alteracao_remocao_e_rollback,
+        test_itens_da_comanda_sem_consultar_produtos,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
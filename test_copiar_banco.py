@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Testes da cópia de banco (copiar_banco.py): um banco anterior às migrações
+copiado para um banco novo tem os agregados de vendas reconstruídos
+
+Uso: python test_copiar_banco.py   (ou via pytest)
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models
+from backend.app.database import criar_engine
+from copiar_banco import copiar_banco
+from conftest import executar_testes
+
+# Banco de antes das migrações (sem vendas_agregadas), versionado no repositório
+BANCO_ANTIGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "database", "padaria.db.backup_reservas")
+
+def test_copia_reconstroi_agregados():
+    with tempfile.TemporaryDirectory() as tmp:
+        # A cópia de trabalho evita que o engine (WAL) altere o arquivo versionado
+        origem = os.path.join(tmp, "origem.db")
+        shutil.copy(BANCO_ANTIGO, origem)
+        url_destino = f"sqlite:///{os.path.join(tmp, 'destino.db')}"
+        copiar_banco(f"sqlite:///{origem}", url_destino)
+
+        engine = criar_engine(url_destino)
+        db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        esperado = {
+            status: (quantidade, round(total or 0.0, 2))
+            for status, quantidade, total in db.query(
+                models.Comanda.status, func.count(models.Comanda.id), func.sum(models.Comanda.total)
+            ).group_by(models.Comanda.status)
+        }
+        assert sum(quantidade for quantidade, _ in esperado.values()) == 9
+
+        resumo = api.relatorio_resumo(db=db)
+        assert {s: (t.quantidade, t.faturamento) for s, t in resumo.comandas.items()} == esperado
+        assert {s: t.quantidade for s, t in resumo.pedidos_online.items()} == dict(
+            db.query(models.PedidoOnline.status, func.count(models.PedidoOnline.id)).group_by(models.PedidoOnline.status).all()
+        )
+        contadores = api.contadores_comandas(db=db)
+        assert (contadores.total, contadores.fechadas) == (9, esperado["fechada"][0])
+        db.close()
+        engine.dispose()
+
+def main():
+    return executar_testes("Testes da cópia de banco", [
+        test_copia_reconstroi_agregados,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Testes da disponibilidade de mesas para reservas (GET
+/reservas/disponibilidade) e da verificação de sobreposição em POST /reservas/
+
+Uso: python test_disponibilidade_reservas.py   (ou via pytest)
+"""
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models, schemas
+from conftest import contar_consultas, executar_testes, popular
+
+AMANHA = date.today() + timedelta(days=1)
+
+def reservar(db, mesa_id, horario, dia=AMANHA):
+    return api.criar_reserva(schemas.ReservaCreate(
+        mesa_id=mesa_id, cliente_id=1, horario_reserva=horario,
+        data_reserva=datetime.combine(dia, datetime.min.time())
+    ), db=db)
+
+def livres(db, dia=AMANHA, **parametros):
+    resultado = api.disponibilidade_reservas(data=dia, db=db, **parametros)
+    return {mesa.numero: mesa.livres for mesa in resultado.mesas}
+
+def test_horarios_livres_em_uma_consulta(banco):
+    engine, Session = banco
+    popular(Session, mesas=3, clientes=1)
+    db = Session()
+    todos = api.disponibilidade_reservas(data=AMANHA, db=db).horarios
+    assert todos[0] == "12:00" and todos[-1] == "21:00" and len(todos) == 12
+
+    reservar(db, 1, "19:00")
+    with contar_consultas(engine) as consultas:
+        mesas = livres(db)
+    assert len(consultas) == 1
+
+    # 19:00 ocupa até 20:30 (90 min): 18:00 também sobreporia; 20:30 encosta no fim e fica livre
+    assert mesas[1] == ["12:00", "12:30", "13:00", "13:30", "14:00", "20:30", "21:00"]
+    assert mesas[2] == mesas[3] == todos
+
+    # Duração maior bloqueia mais horários antes da reserva
+    assert livres(db, duracao=30)[1][5:] == ["18:00", "18:30", "20:30", "21:00"]
+    assert livres(db, duracao=180)[1][5:] == ["20:30", "21:00"]
+
+    # Outro dia continua livre
+    assert livres(db, dia=AMANHA + timedelta(days=1))[1] == todos
+    db.close()
+
+def test_criar_reserva_com_sobreposicao(banco):
+    engine, Session = banco
+    popular(Session, mesas=3, clientes=1)
+    db = Session()
+    reservar(db, 1, "12:00")
+    # Mesma mesa, mais tarde no mesmo dia e em outro dia: permitido
+    reservar(db, 1, "13:30")
+    reservar(db, 1, "12:00", dia=AMANHA + timedelta(days=1))
+    assert db.get(models.Mesa, 1).status == "reservada"
+
+    for mesa_id, horario, detalhe in [
+        (1, "13:00", "Mesa já reservada para este horário"),
+        (1, "14:00", "Mesa já reservada para este horário"),
+        (1, "19h", "Horário inválido (use HH:MM)"),
+    ]:
+        try:
+            reservar(db, mesa_id, horario)
+            assert False, f"esperava 400 para {horario}"
+        except HTTPException as e:
+            assert (e.status_code, e.detail) == (400, detalhe), horario
+    assert livres(db)[1] == ["18:00", "18:30", "19:00", "19:30", "20:00", "20:30", "21:00"]
+    db.close()
+
+def main():
+    return executar_testes("Testes da disponibilidade de mesas para reservas", [
+        test_horarios_livres_em_uma_consulta,
+        test_criar_reserva_com_sobreposicao,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Testes da fila de mensagens do WhatsApp (backend/app/fila_whatsapp.py):
+enfileiramento junto com o pedido, envio em lotes, espera exponencial e
+limite de tentativas
+
+Uso: python test_fila_whatsapp.py   (ou via pytest)
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import fila_whatsapp, models, schemas
+from backend.app.config_whatsapp import WhatsAppServiceLocal
+from backend.app.main import criar_pedido_online
+from conftest import executar_testes, popular
+
+class ProvedorComErro:
+    """Provedor que sempre lança exceção, como uma API fora do ar"""
+    def enviar_pedido_whatsapp(self, pedido):
+        raise ConnectionError("API do WhatsApp indisponível")
+
+def criar_pedido(Session):
+    pedido = schemas.PedidoOnlineCreate(
+        nome_cliente="Maria Santos",
+        telefone="(11) 99999-2222",
+        endereco="Av. Principal, 456",
+        forma_pagamento="pix",
+        itens=[schemas.ItemPedidoOnlineCreate(produto_id=1, quantidade=6, preco_unitario=0)]
+    )
+    db = Session()
+    try:
+        resposta = asyncio.run(criar_pedido_online(pedido, db=db))
+        return resposta.id, resposta.whatsapp_enviado
+    finally:
+        db.close()
+
+def estado(Session, pedido_id):
+    db = Session()
+    try:
+        mensagem = db.query(models.MensagemWhatsApp).filter(models.MensagemWhatsApp.pedido_id == pedido_id).one()
+        pedido = db.query(models.PedidoOnline).filter(models.PedidoOnline.id == pedido_id).one()
+        return mensagem.status, mensagem.tentativas, mensagem.proxima_tentativa, pedido.whatsapp_enviado
+    finally:
+        db.close()
+
+def test_pedido_enviado_em_segundo_plano(banco):
+    engine, Session = banco
+    popular(Session, produtos=["Pão Francês"])
+    provedor = WhatsAppServiceLocal()
+    fila = fila_whatsapp.FilaWhatsApp(Session, provedor)
+
+    pedido_id, enviado_na_resposta = criar_pedido(Session)
+    assert not enviado_na_resposta
+    assert estado(Session, pedido_id)[0] == "pendente"
+
+    assert fila.processar_pendentes() == 1
+    status, tentativas, _, whatsapp_enviado = estado(Session, pedido_id)
+    assert (status, tentativas, whatsapp_enviado) == ("enviada", 1, True)
+    assert provedor.enviados[0]["id"] == pedido_id
+    assert provedor.enviados[0]["itens"][0]["produto"]["nome"] == "Pão Francês"
+
+def test_espera_exponencial_entre_tentativas(banco):
+    engine, Session = banco
+    popular(Session, produtos=["Pão Francês"])
+    fila = fila_whatsapp.FilaWhatsApp(Session, WhatsAppServiceLocal(falhas=2))
+    pedido_id, _ = criar_pedido(Session)
+    agora = datetime.now()
+
+    assert fila.processar_lote(agora) == 1
+    status, tentativas, proxima, _ = estado(Session, pedido_id)
+    assert (status, tentativas) == ("pendente", 1)
+    assert proxima == agora + timedelta(seconds=fila_whatsapp.ESPERA_INICIAL)
+
+    # Antes do prazo a mensagem não é tentada de novo
+    assert fila.processar_lote(agora + timedelta(seconds=1)) == 0
+
+    agora = proxima
+    assert fila.processar_lote(agora) == 1
+    _, tentativas, proxima, _ = estado(Session, pedido_id)
+    assert tentativas == 2
+    assert proxima == agora + timedelta(seconds=fila_whatsapp.ESPERA_INICIAL * 2)
+
+    assert fila.processar_lote(proxima) == 1
+    status, tentativas, _, whatsapp_enviado = estado(Session, pedido_id)
+    assert (status, tentativas, whatsapp_enviado) == ("enviada", 3, True)
+
+def test_limite_de_tentativas(banco):
+    engine, Session = banco
+    popular(Session, produtos=["Pão Francês"])
+    fila = fila_whatsapp.FilaWhatsApp(Session, ProvedorComErro())
+    pedido_id, _ = criar_pedido(Session)
+
+    agora = datetime.now()
+    for _ in range(fila_whatsapp.MAXIMO_TENTATIVAS):
+        assert fila.processar_lote(agora) == 1
+        agora += timedelta(seconds=fila_whatsapp.ESPERA_MAXIMA)
+
+    status, tentativas, _, whatsapp_enviado = estado(Session, pedido_id)
+    assert (status, tentativas, whatsapp_enviado) == ("falhou", fila_whatsapp.MAXIMO_TENTATIVAS, False)
+    assert fila.processar_lote(agora) == 0
+
+def test_envio_em_lotes(banco):
+    engine, Session = banco
+    popular(Session, produtos=["Pão Francês"])
+    provedor = WhatsAppServiceLocal()
+    fila = fila_whatsapp.FilaWhatsApp(Session, provedor)
+    quantidade = fila_whatsapp.TAMANHO_LOTE * 2 + 5
+    for _ in range(quantidade):
+        criar_pedido(Session)
+
+    assert fila.processar_lote() == fila_whatsapp.TAMANHO_LOTE
+    assert fila.processar_pendentes() == quantidade - fila_whatsapp.TAMANHO_LOTE
+    assert len(provedor.enviados) == quantidade
+
+def main():
+    return executar_testes("Testes da fila do WhatsApp", [
+        test_pedido_enviado_em_segundo_plano,
+        test_espera_exponencial_entre_tentativas,
+        test_limite_de_tentativas,
+        test_envio_em_lotes,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
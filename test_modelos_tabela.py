@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Testes do modelo de tabela das listas do desktop (desktop/ui/table_models.py)
+
+Confere que `ModeloTabela.atualizar` compara os registros pelo id e emite só
+os sinais das linhas removidas, inseridas ou alteradas, e que recria a tabela
+inteira apenas quando a ordem das linhas existentes muda.
+
+Uso: python test_modelos_tabela.py   (ou via pytest)
+"""
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+
+from desktop.ui.table_models import ModeloTabela
+
+app = QApplication.instance() or QApplication([])
+
+COLUNAS = [("ID", lambda r: str(r["id"])), ("Status", lambda r: r["status"])]
+
+def registros(*itens):
+    return [{"id": registro_id, "status": status} for registro_id, status in itens]
+
+def criar_modelo():
+    modelo = ModeloTabela(COLUNAS)
+    sinais = []
+    modelo.rowsInserted.connect(lambda _pai, inicio, fim: sinais.append(("inseridas", inicio, fim)))
+    modelo.rowsRemoved.connect(lambda _pai, inicio, fim: sinais.append(("removidas", inicio, fim)))
+    modelo.dataChanged.connect(lambda inicio, fim, *_: sinais.append(("alterada", inicio.row())))
+    modelo.modelReset.connect(lambda: sinais.append(("recriada",)))
+    return modelo, sinais
+
+def conteudo(modelo):
+    return [
+        tuple(modelo.data(modelo.index(linha, coluna)) for coluna in range(modelo.columnCount()))
+        for linha in range(modelo.rowCount())
+    ]
+
+def test_atualizar_emite_so_as_linhas_alteradas():
+    modelo, sinais = criar_modelo()
+    modelo.atualizar(registros((1, "aberta"), (2, "aberta"), (3, "aberta"), (4, "aberta")))
+    assert sinais == [("inseridas", 0, 3)]
+
+    sinais.clear()
+    modelo.atualizar(registros((1, "aberta"), (2, "impressa"), (4, "aberta"), (5, "aberta"), (6, "aberta")))
+    assert sinais == [("removidas", 2, 2), ("inseridas", 3, 4), ("alterada", 1)]
+    assert conteudo(modelo) == [("1", "aberta"), ("2", "impressa"), ("4", "aberta"), ("5", "aberta"), ("6", "aberta")]
+
+    # Nada mudou: nenhum sinal
+    sinais.clear()
+    modelo.atualizar(registros((1, "aberta"), (2, "impressa"), (4, "aberta"), (5, "aberta"), (6, "aberta")))
+    assert sinais == []
+
+    # Novo registro no início (lista de pedidos, mais recentes primeiro)
+    modelo.atualizar(registros((7, "pendente"), (1, "aberta"), (2, "impressa"), (4, "aberta"), (5, "aberta"), (6, "aberta")))
+    assert sinais == [("inseridas", 0, 0)]
+    assert modelo.registro(0) == {"id": 7, "status": "pendente"}
+    assert modelo.data(modelo.index(0, 0), Qt.UserRole) == {"id": 7, "status": "pendente"}
+
+def test_ordem_diferente_recria_a_tabela():
+    modelo, sinais = criar_modelo()
+    modelo.atualizar(registros((1, "a"), (2, "b"), (3, "c")))
+    sinais.clear()
+    modelo.atualizar(registros((3, "c"), (1, "a"), (2, "b")))
+    assert sinais == [("recriada",)]
+    assert [linha[0] for linha in conteudo(modelo)] == ["3", "1", "2"]
+
+    sinais.clear()
+    modelo.atualizar([])
+    assert sinais == [("removidas", 0, 2)] and modelo.rowCount() == 0 and modelo.registro(0) is None
+
+def main():
+    print("🍞 Testes do modelo de tabela do desktop")
+    print("=" * 60)
+    testes = [
+        test_atualizar_emite_so_as_linhas_alteradas,
+        test_ordem_diferente_recria_a_tabela,
+    ]
+    falhas = 0
+    for teste in testes:
+        try:
+            teste()
+            print(f"✅ {teste.__name__}")
+        except AssertionError as e:
+            falhas += 1
+            print(f"❌ {teste.__name__}: {e}")
+    print("=" * 60)
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Testes da paginação por cursor de GET /comandas/ (apos_id) e GET
+/pedidos-online/ (antes_id): percorrer as páginas pelo header
+X-Proximo-Cursor devolve cada linha uma única vez, com os filtros aplicados
+
+Uso: python test_paginacao_listagens.py   (ou via pytest)
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+from fastapi import Response
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models
+from conftest import executar_testes, popular
+
+HOJE = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+ONTEM = HOJE - timedelta(days=1)
+# Status e dia de cada linha, intercalados para os filtros cortarem o meio das páginas
+STATUS_COMANDAS = ["aberta", "fechada", "cancelado"]
+STATUS_PEDIDOS = ["pendente", "confirmado", "entregue"]
+QUANTIDADE = 23
+
+def preparar(banco):
+    engine, Session = banco
+    popular(Session, mesas=1)
+    db = Session()
+    for i in range(QUANTIDADE):
+        dia = ONTEM if i % 2 else HOJE
+        db.add(models.Comanda(mesa_id=1, status=STATUS_COMANDAS[i % 3], total=1.0, data_abertura=dia))
+        db.add(models.PedidoOnline(
+            nome_cliente="Maria", telefone="1", endereco="Rua", forma_pagamento="pix",
+            status=STATUS_PEDIDOS[i % 3], total=1.0, data_pedido=dia
+        ))
+    db.commit()
+    return db
+
+def percorrer(listar, parametro_cursor, limite, **filtros):
+    """Segue X-Proximo-Cursor até a última página; retorna (ids, tamanhos das páginas)"""
+    ids, tamanhos, cursor = [], [], None
+    while True:
+        response = Response()
+        pagina = listar(response, limite=limite, **filtros, **({parametro_cursor: cursor} if cursor else {}))
+        ids += [linha.id for linha in pagina]
+        tamanhos.append(len(pagina))
+        cursor = response.headers.get("X-Proximo-Cursor")
+        if cursor is None:
+            return ids, tamanhos
+        assert cursor == str(pagina[-1].id)
+        cursor = int(cursor)
+
+def verificar(db, listar, parametro_cursor, ordem, filtros_esperados):
+    """Paginado = lista completa, sem lacunas nem repetições, para cada filtro e limite"""
+    for filtros, esperados in filtros_esperados:
+        completa = [linha.id for linha in listar(Response(), db=db, **filtros)]
+        assert completa == sorted(esperados, reverse=ordem == "desc"), filtros
+        for limite in (1, 4, len(esperados), len(esperados) + 1):
+            ids, tamanhos = percorrer(listar, parametro_cursor, limite, db=db, **filtros)
+            assert ids == completa, (filtros, limite)
+            assert len(set(ids)) == len(ids)
+            # Páginas cheias até a última; divisão exata não gera página vazia no fim
+            assert all(tamanho == limite for tamanho in tamanhos[:-1]), (filtros, limite)
+            assert 0 < tamanhos[-1] <= limite and len(tamanhos) == -(-len(esperados) // limite)
+
+def test_comandas_em_ordem_de_abertura(banco):
+    db = preparar(banco)
+    comandas = db.query(models.Comanda.id, models.Comanda.status, models.Comanda.data_abertura).all()
+    verificar(db, api.listar_comandas, "apos_id", "asc", [
+        ({}, [c.id for c in comandas]),
+        ({"status": ["aberta", "cancelado"]}, [c.id for c in comandas if c.status != "fechada"]),
+        ({"data_inicio": ONTEM.date(), "data_fim": ONTEM.date()}, [c.id for c in comandas if c.data_abertura == ONTEM]),
+        ({"status": ["fechada"], "data_inicio": HOJE.date()},
+         [c.id for c in comandas if c.status == "fechada" and c.data_abertura == HOJE]),
+    ])
+    db.close()
+
+def test_pedidos_online_do_mais_recente(banco):
+    db = preparar(banco)
+    pedidos = db.query(models.PedidoOnline.id, models.PedidoOnline.status, models.PedidoOnline.data_pedido).all()
+    verificar(db, api.listar_pedidos_online, "antes_id", "desc", [
+        ({}, [p.id for p in pedidos]),
+        ({"status": ["entregue"]}, [p.id for p in pedidos if p.status == "entregue"]),
+        ({"data_fim": ONTEM.date()}, [p.id for p in pedidos if p.data_pedido == ONTEM]),
+        ({"status": ["pendente", "confirmado"], "data_inicio": HOJE.date(), "data_fim": HOJE.date()},
+         [p.id for p in pedidos if p.status != "entregue" and p.data_pedido == HOJE]),
+    ])
+    db.close()
+
+def main():
+    return executar_testes("Testes da paginação das listagens", [
+        test_comandas_em_ordem_de_abertura,
+        test_pedidos_online_do_mais_recente,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
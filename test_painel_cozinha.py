@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Testes do painel da cozinha (GET /cozinha/painel): retrato completo agrupado,
+atualização incremental (?since=) e versão atribuída no commit
+
+Uso: python test_painel_cozinha.py   (ou via pytest)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models, schemas
+from conftest import contar_consultas, executar_testes, popular
+
+def preparar(banco):
+    engine, Session = banco
+    popular(Session, mesas=2, produtos=["Café", "Pão na chapa"])
+    return engine, Session()
+
+def adicionar(db, comanda_id, *itens):
+    return api.adicionar_itens_comanda(comanda_id, [
+        schemas.ItemComandaCreate(produto_id=produto_id, quantidade=quantidade, preco_unitario=0)
+        for produto_id, quantidade in itens
+    ], db=db)
+
+def test_retrato_completo_agrupado(banco):
+    engine, db = preparar(banco)
+    c1 = api.criar_comanda(schemas.ComandaCreate(mesa_id=1), db=db).id
+    c2 = api.criar_comanda(schemas.ComandaCreate(mesa_id=2), db=db).id
+    a, b = adicionar(db, c1, (1, 2), (2, 1))
+    c, = adicionar(db, c2, (1, 1))
+    api.atualizar_status_item(b.id, "preparando", db=db)
+    api.atualizar_status_item(c.id, "preparando", db=db)
+    api.atualizar_status_item(c.id, "pronto", db=db)
+    d, = adicionar(db, c2, (2, 3))
+
+    with contar_consultas(engine) as consultas:
+        painel = api.painel_cozinha(db=db)
+    assert len(consultas) == 2  # Versão atual e itens
+
+    assert painel.completo and painel.removidos == []
+    assert [item.id for item in painel.itens] == [a.id, b.id, d.id]
+    assert painel.itens[0].mesa_numero == 1 and painel.itens[0].produto == "Café"
+    assert [(g.produto, g.pendente, g.preparando, g.itens) for g in painel.por_produto] == [
+        ("Café", 2, 0, [a.id]),
+        ("Pão na chapa", 3, 1, [b.id, d.id]),
+    ]
+    assert [(g.mesa_numero, g.comandas, g.itens) for g in painel.por_mesa] == [
+        (1, [c1], [a.id, b.id]),
+        (2, [c2], [d.id]),
+    ]
+    db.close()
+
+def test_atualizacao_incremental(banco):
+    engine, db = preparar(banco)
+    c1 = api.criar_comanda(schemas.ComandaCreate(mesa_id=1), db=db).id
+    c2 = api.criar_comanda(schemas.ComandaCreate(mesa_id=2), db=db).id
+    a, b = adicionar(db, c1, (1, 1), (2, 1))
+    c, = adicionar(db, c2, (1, 1))
+    versao = api.painel_cozinha(db=db).versao
+
+    # Nada mudou
+    delta = api.painel_cozinha(since=versao, db=db)
+    assert not delta.completo and delta.itens == [] and delta.removidos == []
+
+    # Item pronto sai da fila; item novo entra; os demais não vêm
+    api.atualizar_status_item(a.id, "preparando", db=db)
+    api.atualizar_status_item(a.id, "pronto", db=db)
+    d, = adicionar(db, c2, (2, 2))
+    delta = api.painel_cozinha(since=versao, db=db)
+    assert [item.id for item in delta.itens] == [c.id, d.id]  # c vem junto: a comanda mudou
+    assert delta.removidos == [a.id]
+    assert [(g.produto, g.pendente) for g in delta.por_produto] == [("Café", 1), ("Pão na chapa", 2)]
+    versao = delta.versao
+
+    # Comanda cancelada: os itens saem; produto renomeado: os itens voltam com o nome novo
+    api.cancelar_comanda(c2, db=db)
+    db.get(models.Produto, 2).nome = "Misto quente"
+    db.commit()
+    delta = api.painel_cozinha(since=versao, db=db)
+    assert [(item.id, item.produto) for item in delta.itens] == [(b.id, "Misto quente")]
+    assert sorted(delta.removidos) == sorted([c.id, d.id])
+    versao = delta.versao
+
+    # Item removido direto no banco também aparece em removidos
+    db.delete(db.get(models.ItemComanda, b.id))
+    db.commit()
+    delta = api.painel_cozinha(since=versao, db=db)
+    assert delta.itens == [] and delta.removidos == [b.id]
+    # O /sync continua ignorando os itens removidos
+    assert api.sincronizar_alteracoes(since=versao, db=db).removidos.comandas == []
+
+    # Versão desconhecida: retrato completo
+    assert api.painel_cozinha(since=delta.versao + 100, db=db).completo
+    db.close()
+
+def test_versao_atribuida_no_commit(banco):
+    engine, db = preparar(banco)
+    versao = api.painel_cozinha(db=db).versao
+
+    # Os flushes não tocam no contador: ele só é travado no commit
+    with contar_consultas(engine) as consultas:
+        comanda = models.Comanda(mesa_id=1, status="aberta")
+        db.add(comanda)
+        db.flush()
+        db.add(models.ItemComanda(comanda_id=comanda.id, produto_id=1, quantidade=1, preco_unitario=3.5))
+        db.flush()
+        assert not [sql for sql in consultas if "versao_sincronizacao" in sql]
+        db.commit()
+    assert len([sql for sql in consultas if sql.startswith("UPDATE versao_sincronizacao")]) == 1
+
+    # Uma versão por transação, para a comanda e o item
+    delta = api.painel_cozinha(since=versao, db=db)
+    assert delta.versao == versao + 1 and [item.comanda_id for item in delta.itens] == [comanda.id]
+    db.close()
+
+def main():
+    return executar_testes("Testes do painel da cozinha", [
+        test_retrato_completo_agrupado,
+        test_atualizacao_incremental,
+        test_versao_atribuida_no_commit,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
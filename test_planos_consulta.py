@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Teste de regressão dos planos de consulta (SQLite): pelo EXPLAIN QUERY PLAN
+do SQL dos endpoints mais usados, as tabelas filtradas são lidas por índice
+(SEARCH ... USING INDEX), nunca varridas inteiras (SCAN)
+
+Uso: python test_planos_consulta.py   (ou via pytest)
+"""
+import asyncio
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+from fastapi import Response
+from starlette.requests import Request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models, schemas
+from conftest import banco_temporario, contar_consultas, popular
+
+HOJE = date.today()
+
+# (descrição, chamada do endpoint, tabelas que precisam ser lidas por índice)
+CONSULTAS_QUENTES = [
+    ("GET /comandas/?status=aberta",
+     lambda db: api.listar_comandas(Response(), status=["aberta"], db=db),
+     ["comandas", "itens_comanda"]),
+    ("GET /comandas/?data_inicio&data_fim",
+     lambda db: api.listar_comandas(Response(), data_inicio=HOJE, data_fim=HOJE, limite=50, db=db),
+     ["comandas", "itens_comanda"]),
+    ("GET /comandas/abertas/",
+     lambda db: api.listar_comandas_abertas(db=db),
+     ["comandas", "itens_comanda"]),
+    ("POST /comandas/ (comanda já aberta na mesa)",
+     lambda db: api.criar_comanda(schemas.ComandaCreate(mesa_id=2), db=db),
+     ["comandas"]),
+    ("GET /comandas/{id}/itens/",
+     lambda db: api.listar_itens_comanda(1, db=db),
+     ["itens_comanda"]),
+    ("GET /comandas/{id}/status",
+     lambda db: asyncio.run(api.status_comanda(1, Request({"type": "http", "headers": []}), Response(), db=db)),
+     ["comandas", "itens_comanda", "mesas", "produtos"]),
+    ("POST /reservas/ (mesa já reservada na data)",
+     lambda db: api.criar_reserva(schemas.ReservaCreate(
+         mesa_id=1, cliente_id=1, data_reserva=datetime.combine(HOJE + timedelta(days=1), datetime.min.time()),
+         horario_reserva="19:00"), db=db),
+     ["reservas"]),
+    ("GET /reservas/mesa/{id}",
+     lambda db: api.obter_reservas_mesa(1, db=db),
+     ["reservas"]),
+    ("GET /reservas/disponibilidade?data",
+     lambda db: api.disponibilidade_reservas(data=HOJE + timedelta(days=1), db=db),
+     ["reservas"]),
+    ("GET /pedidos-online/?data_inicio&data_fim",
+     lambda db: api.listar_pedidos_online(Response(), data_inicio=HOJE, data_fim=HOJE, db=db),
+     ["pedidos_online", "itens_pedido_online"]),
+    ("GET /sincronizacao/pendentes/",
+     lambda db: api.listar_sincronizacoes_pendentes(db=db),
+     ["sincronizacoes_offline"]),
+    ("GET /relatorios/resumo?data_inicio&data_fim",
+     lambda db: api.relatorio_resumo(data_inicio=HOJE, data_fim=HOJE, db=db),
+     ["vendas_agregadas"]),
+    ("GET /relatorios/produtos-mais-vendidos?data_inicio&data_fim",
+     lambda db: api.relatorio_produtos_mais_vendidos(data_inicio=HOJE, data_fim=HOJE, db=db),
+     ["comandas", "itens_comanda", "pedidos_online", "itens_pedido_online", "produtos"]),
+    ("GET /sync?since=1",
+     lambda db: api.sincronizar_alteracoes(since=1, db=db),
+     ["comandas", "itens_comanda", "pedidos_online", "produtos", "mesas", "registros_removidos"]),
+]
+
+def popular_banco(Session):
+    """Mesas 1 a 3, um produto e um cliente, e uma linha em cada tabela consultada"""
+    popular(Session, mesas=3, produtos=["Pão Francês"], clientes=1)
+    db = Session()
+    comanda = models.Comanda(mesa_id=2, status="aberta", total=0.5)
+    pedido = models.PedidoOnline(nome_cliente="Maria", telefone="1", endereco="Rua", forma_pagamento="pix", total=1.0)
+    db.add_all([comanda, pedido])
+    db.flush()
+    db.add_all([
+        models.ItemComanda(comanda_id=comanda.id, produto_id=1, quantidade=1, preco_unitario=0.5),
+        models.ItemPedidoOnline(pedido_id=pedido.id, produto_id=1, quantidade=2, preco_unitario=0.5),
+        models.Reserva(mesa_id=1, cliente_id=1, horario_reserva="19:00",
+                       data_reserva=datetime.combine(HOJE + timedelta(days=1), datetime.min.time())),
+        models.SincronizacaoOffline(dispositivo_id="tablet-1", tipo_operacao="create", tabela="comandas", dados_json="{}"),
+    ])
+    db.commit()
+    db.close()
+
+def planos_das_consultas(engine, chamada, db):
+    """Executa o endpoint e devolve [(sql, [linhas do plano])] dos SELECT/UPDATE/DELETE emitidos"""
+    with contar_consultas(engine, com_parametros=True) as capturadas:
+        try:
+            chamada(db)
+        except api.HTTPException:
+            # Os casos de conflito (comanda/reserva já existente) respondem 400 depois da consulta
+            db.rollback()
+
+    with engine.connect() as conn:
+        return [
+            (sql, [linha[-1] for linha in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parametros)])
+            for sql, parametros in capturadas
+            if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))
+        ]
+
+def verificar_planos(banco):
+    """Retorna {descrição: [problemas]} para todas as consultas quentes"""
+    engine, Session = banco
+    popular_banco(Session)
+    db = Session()
+
+    resultado = {}
+    for descricao, chamada, tabelas in CONSULTAS_QUENTES:
+        planos = planos_das_consultas(engine, chamada, db)
+        linhas = [linha for _, plano in planos for linha in plano]
+        problemas = []
+        for tabela in tabelas:
+            if any(linha.startswith(f"SCAN {tabela}") for linha in linhas):
+                problemas.append(f"varredura completa em '{tabela}'")
+            elif not any(linha.startswith(f"SEARCH {tabela} USING") for linha in linhas):
+                problemas.append(f"nenhuma consulta lê '{tabela}' por índice")
+        if problemas:
+            problemas.append("plano: " + " | ".join(linhas))
+        resultado[descricao] = problemas
+    db.close()
+    return resultado
+
+def test_consultas_quentes_usam_indices(banco):
+    falhas = {descricao: problemas for descricao, problemas in verificar_planos(banco).items() if problemas}
+    assert not falhas, falhas
+
+def main():
+    print("🍞 Teste dos planos de consulta")
+    print("=" * 60)
+    falhou = False
+    with banco_temporario() as banco:
+        planos = verificar_planos(banco)
+    for descricao, problemas in planos.items():
+        if problemas:
+            falhou = True
+            print(f"❌ {descricao}")
+            for problema in problemas:
+                print(f"   - {problema}")
+        else:
+            print(f"✅ {descricao}")
+    print("=" * 60)
+    if falhou:
+        print("❌ Há consultas sem índice. Verifique os índices em models.py e as migrações.")
+        return 1
+    print("🎉 Todas as consultas usam índices!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Testes dos QR codes das mesas: ETag/304 do PNG, cache em disco e a folha
+de impressão em PDF
+
+Uso: python test_qr_codes.py   (ou via pytest)
+"""
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+
+from starlette.requests import Request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, qr_codes
+from conftest import executar_testes, popular
+
+@contextmanager
+def cache_vazio():
+    """Diretório de cache em disco novo e LRU limpo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        qr_codes.obter_qr_png.cache_clear()
+        with mock.patch.object(qr_codes, "QR_CODE_CACHE_DIR", tmp):
+            try:
+                yield tmp
+            finally:
+                qr_codes.obter_qr_png.cache_clear()
+
+def requisicao(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+def test_png_com_etag_e_304(banco):
+    engine, Session = banco
+    popular(Session, mesas=1)
+    db = Session()
+    with cache_vazio():
+        resposta = api.obter_qr_code_png(1, requisicao(), db=db)
+        etag = resposta.headers["etag"]
+        assert resposta.status_code == 200
+        assert resposta.body.startswith(b"\x89PNG")
+        assert etag == f'"{qr_codes.chave_qr(api._menu_url(1))}"'
+
+        revalidacao = api.obter_qr_code_png(1, requisicao(etag), db=db)
+        assert revalidacao.status_code == 304
+        assert revalidacao.body == b""
+        assert revalidacao.headers["etag"] == etag
+        assert api.obter_qr_code_png(1, requisicao('"outro"'), db=db).status_code == 200
+    db.close()
+
+def test_cache_em_disco_apos_limpar_memoria():
+    url = "http://localhost:8000/menu/1"
+    with cache_vazio() as tmp:
+        png = qr_codes.obter_qr_png(url)
+        assert os.listdir(tmp) == [f"{qr_codes.chave_qr(url)}.png"]
+
+        # Sem o LRU o PNG vem do disco, sem gerar de novo
+        qr_codes.obter_qr_png.cache_clear()
+        with mock.patch.object(qr_codes, "renderizar_qr", side_effect=AssertionError("gerou de novo")):
+            assert qr_codes.obter_qr_png(url) == png
+
+def test_varios_qr_iguais_aos_individuais():
+    urls = [f"http://localhost:8000/menu/{i}" for i in (1, 2, 3, 2)]
+    esperado = [qr_codes.renderizar_qr(url) for url in urls]
+    # Com uma CPU gera no próprio processo; com mais, no ProcessPoolExecutor
+    for cpus in (1, 4):
+        with cache_vazio() as tmp, mock.patch.object(qr_codes.os, "cpu_count", return_value=cpus):
+            assert qr_codes.obter_varios_qr_png(urls) == esperado
+            assert len(os.listdir(tmp)) == 3
+            assert qr_codes.obter_qr_png.cache_info().currsize == 3
+
+def test_folha_pdf_tem_uma_pagina_por_grade(banco):
+    engine, Session = banco
+    popular(Session, mesas=13)
+    db = Session()
+    with cache_vazio():
+        resposta = api.gerar_folha_qr_codes(requisicao(), formato="pdf", colunas=3, linhas=4, db=db)
+        assert resposta.media_type == "application/pdf"
+        # 13 mesas em grades de 3x4: uma folha cheia e uma com 1 mesa
+        assert len(re.findall(rb"/Type\s*/Page(?!s)", resposta.body)) == 2
+
+        etag = resposta.headers["etag"]
+        assert api.gerar_folha_qr_codes(requisicao(etag), formato="pdf", colunas=3, linhas=4, db=db).status_code == 304
+        assert api.gerar_folha_qr_codes(requisicao(etag), formato="pdf", colunas=4, linhas=4, db=db).status_code == 200
+    db.close()
+
+def main():
+    return executar_testes("Testes dos QR codes das mesas", [
+        test_png_com_etag_e_304,
+        test_cache_em_disco_apos_limpar_memoria,
+        test_varios_qr_iguais_aos_individuais,
+        test_folha_pdf_tem_uma_pagina_por_grade,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
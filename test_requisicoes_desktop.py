@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Testes do executor de requisições do desktop (desktop/services/requisicoes.py)
+
+Usa um cliente falso, lento, no lugar do APIClient: as chamadas não bloqueiam
+a thread da interface, chamadas iguais em andamento viram uma só requisição,
+os resultados chegam na thread da interface e os erros vão para ao_falhar.
+O APIClient usa uma requests.Session por thread.
+
+Uso: python test_requisicoes_desktop.py   (ou via pytest)
+"""
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtCore import QCoreApplication
+
+from desktop.services.api_client import APIClient
+from desktop.services.requisicoes import ExecutorRequisicoes
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class ClienteLento:
+    def __init__(self):
+        self.chamadas = []
+
+    def listar_comandas(self, status=None):
+        self.chamadas.append(status)
+        time.sleep(0.2)
+        return [{"id": 1, "status": (status or ["aberta"])[0]}]
+
+    def obter_comanda(self, comanda_id):
+        raise ValueError(f"comanda {comanda_id} inválida")
+
+def esperar(executor, limite=5):
+    fim = time.monotonic() + limite
+    while executor.em_andamento() and time.monotonic() < fim:
+        app.processEvents()
+        time.sleep(0.01)
+    assert executor.em_andamento() == 0, "requisições não terminaram"
+
+def test_chamadas_iguais_sao_agrupadas():
+    cliente = ClienteLento()
+    executor = ExecutorRequisicoes(cliente)
+    resultados = []
+
+    def guardar(tela):
+        return lambda comandas: resultados.append((tela, comandas, threading.current_thread() is threading.main_thread()))
+
+    inicio = time.monotonic()
+    iniciadas = [executor.executar("listar_comandas", status=["aberta"], ao_concluir=guardar(tela)) for tela in range(3)]
+    executor.executar("listar_comandas", status=["fechada"], ao_concluir=guardar("fechadas"))
+    assert time.monotonic() - inicio < 0.1  # Não bloqueia quem chamou
+    assert iniciadas == [True, False, False]
+
+    esperar(executor)
+    assert sorted(cliente.chamadas) == [["aberta"], ["fechada"]]
+    assert sorted(r[0] for r in resultados if r[0] != "fechadas") == [0, 1, 2]
+    assert all(r[2] for r in resultados)  # Entregues na thread da interface
+    assert [r[1][0]["status"] for r in resultados if r[0] == "fechadas"] == ["fechada"]
+
+    # Terminada a primeira, uma nova chamada igual faz outra requisição
+    assert executor.executar("listar_comandas", status=["aberta"]) is True
+    esperar(executor)
+    assert len(cliente.chamadas) == 3
+
+def test_erros_vao_para_ao_falhar():
+    executor = ExecutorRequisicoes(ClienteLento())
+    erros = []
+    executor.executar("obter_comanda", 7, ao_concluir=lambda _: erros.append("não devia concluir"), ao_falhar=erros.append)
+    executor.executar("listar_comandas", ao_concluir=lambda _: 1 / 0, ao_falhar=erros.append)
+    esperar(executor)
+    assert sorted(type(e).__name__ for e in erros) == ["ValueError", "ZeroDivisionError"]
+
+def test_uma_sessao_http_por_thread():
+    cliente = APIClient()
+    sessoes = []
+    threads = [threading.Thread(target=lambda: sessoes.append(cliente.session)) for _ in range(ExecutorRequisicoes.MAXIMO_THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cliente.session is cliente.session
+    assert len({id(sessao) for sessao in sessoes + [cliente.session]}) == len(threads) + 1
+
+def main():
+    print("🍞 Testes do executor de requisições do desktop")
+    print("=" * 60)
+    testes = [
+        test_chamadas_iguais_sao_agrupadas,
+        test_erros_vao_para_ao_falhar,
+        test_uma_sessao_http_por_thread,
+    ]
+    falhas = 0
+    for teste in testes:
+        try:
+            teste()
+            print(f"✅ {teste.__name__}")
+        except AssertionError as e:
+            falhas += 1
+            print(f"❌ {teste.__name__}: {e}")
+    print("=" * 60)
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
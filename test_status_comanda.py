@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Testes do status da comanda (GET /comandas/{id}/status): versão, 304 sem
+consultar o banco e long-poll
+
+Uso: python test_status_comanda.py   (ou via pytest)
+"""
+import asyncio
+import os
+import sys
+import time
+
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models, schemas
+from backend.app.versoes_comandas import versoes_comandas
+from conftest import contar_consultas, executar_testes, popular
+
+def abrir_comanda(banco):
+    """Comanda aberta na mesa 1; retorna (engine, Session, id da comanda)"""
+    engine, Session = banco
+    popular(Session, mesas=2, produtos=["Café"])
+    db = Session()
+    comanda = api.criar_comanda(schemas.ComandaCreate(mesa_id=1), db=db)
+    db.close()
+    return engine, Session, comanda.id
+
+def requisicao(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "headers": headers})
+
+def consultar(Session, comanda_id, etag=None, **parametros):
+    """Retorna (status HTTP, ETag, corpo)"""
+    db = Session()
+    resposta = Response()
+    try:
+        resultado = asyncio.run(api.status_comanda(comanda_id, requisicao(etag), resposta, db=db, **parametros))
+    finally:
+        db.close()
+    if isinstance(resultado, Response):
+        return resultado.status_code, resultado.headers["etag"], None
+    return 200, resposta.headers["etag"], resultado
+
+def test_versao_e_304_sem_consultar_o_banco(banco):
+    engine, Session, comanda_id = abrir_comanda(banco)
+    status, etag, corpo = consultar(Session, comanda_id)
+    assert status == 200 and etag == f'"{corpo["versao"]}"'
+    assert (corpo["mesa_numero"], corpo["status_comanda"], corpo["status_geral_itens"], corpo["itens"]) == (
+        1, "aberta", "pendente", []
+    )
+
+    with contar_consultas(engine) as consultas:
+        assert consultar(Session, comanda_id, versao=corpo["versao"])[0] == 304
+        assert consultar(Session, comanda_id, etag=etag)[0] == 304
+    assert consultas == []
+
+    # Novo item: nova versão
+    db = Session()
+    api.adicionar_item_comanda(comanda_id, schemas.ItemComandaCreate(produto_id=1, quantidade=2, preco_unitario=0), db=db)
+    db.close()
+    status, _, novo = consultar(Session, comanda_id, versao=corpo["versao"])
+    assert status == 200 and novo["versao"] != corpo["versao"]
+    assert novo["itens"] == [{"produto": "Café", "status": "pendente"}]
+
+    # Rollback e mudança de status da mesa não mudam a versão; o número da mesa sim
+    db = Session()
+    db.get(models.Comanda, comanda_id).status = "cancelado"
+    db.flush()
+    db.rollback()
+    db.get(models.Mesa, 1).status = "livre"
+    db.commit()
+    assert consultar(Session, comanda_id, versao=novo["versao"])[0] == 304
+    db.get(models.Mesa, 1).numero = 10
+    db.commit()
+    db.close()
+    status, _, renumerada = consultar(Session, comanda_id, versao=novo["versao"])
+    assert status == 200 and renumerada["mesa_numero"] == 10
+
+    try:
+        consultar(Session, 999)
+        assert False, "esperava 404"
+    except HTTPException as e:
+        assert e.status_code == 404
+
+def test_long_poll(banco):
+    engine, Session, comanda_id = abrir_comanda(banco)
+    versao = consultar(Session, comanda_id)[2]["versao"]
+
+    def finalizar():
+        time.sleep(0.2)
+        db = Session()
+        api.solicitar_fechamento_comanda(comanda_id, db=db)
+        db.close()
+
+    async def aguardar_alteracao():
+        db = Session()
+        try:
+            espera = asyncio.create_task(
+                api.status_comanda(comanda_id, requisicao(), Response(), versao=versao, aguardar=10, db=db)
+            )
+            await asyncio.sleep(0.05)
+            assert versoes_comandas.quantidade_aguardando() == 1
+            await asyncio.to_thread(finalizar)
+            return await espera
+        finally:
+            db.close()
+
+    inicio = time.monotonic()
+    corpo = asyncio.run(aguardar_alteracao())
+    assert time.monotonic() - inicio < 5
+    assert corpo["status_comanda"] == "aguardando_pagamento" and corpo["versao"] != versao
+    assert versoes_comandas.quantidade_aguardando() == 0
+
+    # Sem alteração: 304 ao fim do tempo
+    inicio = time.monotonic()
+    assert consultar(Session, comanda_id, versao=corpo["versao"], aguardar=1)[0] == 304
+    assert 0.9 < time.monotonic() - inicio < 5
+
+def main():
+    return executar_testes("Testes do status da comanda (versão e long-poll)", [
+        test_versao_e_304_sem_consultar_o_banco,
+        test_long_poll,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Testes da atualização de status de itens em lote (PUT /itens/status)
+
+Uso: python test_status_itens_lote.py   (ou via pytest)
+"""
+import asyncio
+import os
+import sys
+
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import main as api, models, schemas
+from backend.app.eventos import barramento
+from backend.app.versoes_comandas import versoes_comandas
+from conftest import contar_consultas, executar_testes, popular
+
+def abrir_comandas(banco):
+    """Comandas nas mesas 1 (3 itens) e 2 (2 itens); retorna (engine, db, (c1, itens1), (c2, itens2))"""
+    engine, Session = banco
+    popular(Session, mesas=2, produtos=["Pão de queijo"])
+    db = Session()
+    c1 = api.criar_comanda(schemas.ComandaCreate(mesa_id=1), db=db).id
+    c2 = api.criar_comanda(schemas.ComandaCreate(mesa_id=2), db=db).id
+    item = schemas.ItemComandaCreate(produto_id=1, quantidade=1, preco_unitario=0)
+    itens1 = [i.id for i in api.adicionar_itens_comanda(c1, [item] * 3, db=db)]
+    itens2 = [i.id for i in api.adicionar_itens_comanda(c2, [item] * 2, db=db)]
+    return engine, db, (c1, itens1), (c2, itens2)
+
+def atualizar(db, **dados):
+    return api.atualizar_status_itens(schemas.AtualizacaoStatusItens(**dados), db=db)
+
+def status_itens(db):
+    return dict(db.query(models.ItemComanda.id, models.ItemComanda.status))
+
+def test_lote_em_um_update(banco):
+    engine, db, (c1, itens1), (c2, itens2) = abrir_comandas(banco)
+    versao_c1 = versoes_comandas.versao(c1)
+    versao_sync = api.painel_cozinha(db=db).versao
+
+    async def atualizar_e_receber_eventos():
+        fila = barramento.assinar()
+        try:
+            resultado = await asyncio.to_thread(
+                atualizar, db, status="preparando", item_ids=itens1[:2] + itens2[:1] + [999]
+            )
+            await asyncio.sleep(0.05)
+            eventos = []
+            while not fila.empty():
+                eventos.append(fila.get_nowait())
+            return resultado, eventos
+        finally:
+            barramento.cancelar_assinatura(fila)
+
+    with contar_consultas(engine) as consultas:
+        resultado, eventos = asyncio.run(atualizar_e_receber_eventos())
+    # Um UPDATE muda o status; a versão de sincronização é gravada no commit
+    assert len([sql for sql in consultas if sql.startswith("UPDATE itens_comanda SET status")]) == 1
+    assert resultado.atualizados == sorted(itens1[:2] + itens2[:1]) and resultado.ignorados == [999]
+    assert [(c.comanda_id, c.status_geral_itens) for c in resultado.comandas] == [(c1, "preparando"), (c2, "preparando")]
+    assert sorted(e["id"] for e in eventos if e["tipo"] == "item_comanda") == resultado.atualizados
+    assert {e["versao"] for e in eventos if e["tipo"] == "item_comanda"} == {versao_sync + 1}
+
+    # Versões acompanham: comanda (status/long-poll) e sincronização (painel da cozinha)
+    assert versoes_comandas.versao(c1) != versao_c1
+    delta = api.painel_cozinha(since=versao_sync, db=db)
+    assert sorted(item.id for item in delta.itens if item.status == "preparando") == resultado.atualizados
+
+    # Por comanda: só os itens em preparo ficam prontos; o pendente vem em ignorados
+    resultado = atualizar(db, status="pronto", comanda_id=c1)
+    assert resultado.atualizados == itens1[:2] and resultado.ignorados == itens1[2:]
+    assert [(c.comanda_id, c.status_geral_itens) for c in resultado.comandas] == [(c1, "parcial")]
+    resultado = atualizar(db, status="pronto", item_ids=itens1)
+    assert resultado.atualizados == [] and resultado.ignorados == itens1
+
+    # Pronto -> pendente não é uma transição válida
+    resultado = atualizar(db, status="pendente", item_ids=itens1[:1])
+    assert resultado.atualizados == [] and status_itens(db)[itens1[0]] == "pronto"
+    db.close()
+
+def test_item_individual_usa_as_mesmas_transicoes(banco):
+    engine, db, (c1, itens1), _ = abrir_comandas(banco)
+    for item_id, status in [(itens1[0], "pronto"), (itens1[0], "entregue")]:
+        try:
+            api.atualizar_status_item(item_id, status, db=db)
+            assert False, f"esperava 400 para {status}"
+        except HTTPException as e:
+            assert e.status_code == 400
+    for status in ("preparando", "pronto", "preparando", "pendente"):
+        api.atualizar_status_item(itens1[0], status, db=db)
+        assert status_itens(db)[itens1[0]] == status
+    db.close()
+
+def test_validacoes(banco):
+    engine, db, (c1, itens1), (c2, itens2) = abrir_comandas(banco)
+    api.cancelar_comanda(c2, db=db)
+    # Itens de comanda cancelada não mudam
+    resultado = atualizar(db, status="preparando", item_ids=itens2)
+    assert resultado.atualizados == [] and resultado.ignorados == itens2
+
+    for dados, codigo in [
+        ({"status": "entregue", "item_ids": itens1}, 400),
+        ({"status": "pronto"}, 400),
+        ({"status": "pronto", "item_ids": itens1, "comanda_id": c1}, 400),
+        ({"status": "pronto", "item_ids": []}, 400),
+        ({"status": "pronto", "comanda_id": 999}, 404),
+        ({"status": "pronto", "comanda_id": c2}, 400),
+    ]:
+        try:
+            atualizar(db, **dados)
+            assert False, f"esperava {codigo} para {dados}"
+        except HTTPException as e:
+            assert e.status_code == codigo, dados
+    assert set(status_itens(db).values()) == {"pendente"}
+    db.close()
+
+def main():
+    return executar_testes("Testes da atualização de status de itens em lote", [
+        test_lote_em_um_update,
+        test_validacoes,
+        test_item_individual_usa_as_mesmas_transicoes,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
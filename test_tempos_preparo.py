@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Testes do histórico de status dos itens e do relatório de tempos de preparo
+(GET /relatorios/tempos-preparo)
+
+Uso: python test_tempos_preparo.py   (ou via pytest)
+"""
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app import historico_itens, main as api, models, schemas
+from conftest import executar_testes, popular
+
+def preparar(banco):
+    engine, Session = banco
+    popular(Session, mesas=1, produtos=["Café", "Pão na chapa"])
+    return engine, Session()
+
+def agregados(db):
+    tabela = models.TempoItemAgregado
+    return sorted(db.execute(select(
+        tabela.granularidade, tabela.data, tabela.dimensao, tabela.chave,
+        tabela.intervalo, tabela.faixa, tabela.quantidade
+    )).all())
+
+def test_eventos_e_relatorio(banco):
+    engine, db = preparar(banco)
+    comanda_id = api.criar_comanda(schemas.ComandaCreate(mesa_id=1), db=db).id
+    item = lambda produto_id: schemas.ItemComandaCreate(produto_id=produto_id, quantidade=1, preco_unitario=0)
+    cafe, pao1, pao2 = (i.id for i in api.adicionar_itens_comanda(comanda_id, [item(1), item(2), item(2)], db=db))
+
+    api.atualizar_status_itens(schemas.AtualizacaoStatusItens(status="preparando", item_ids=[pao1, pao2]), db=db)
+    # O café continua pendente (não pode pular o preparo): nenhum intervalo fechado
+    resultado = api.atualizar_status_itens(schemas.AtualizacaoStatusItens(status="pronto", comanda_id=comanda_id), db=db)
+    assert resultado.ignorados == [cafe]
+
+    eventos = db.execute(
+        select(models.EventoItemComanda.item_id, models.EventoItemComanda.status)
+        .order_by(models.EventoItemComanda.id)
+    ).all()
+    assert eventos == [
+        (cafe, "pendente"), (pao1, "pendente"), (pao2, "pendente"),
+        (pao1, "preparando"), (pao2, "preparando"),
+        (pao1, "pronto"), (pao2, "pronto"),
+    ]
+
+    relatorio = api.relatorio_tempos_preparo(db=db)
+    pao, = relatorio.por_produto
+    assert (pao.produto_id, pao.nome) == (2, "Pão na chapa")
+    assert pao.espera.quantidade == 2 and pao.preparo.quantidade == 2
+    assert pao.preparo.p95 < 5 and not pao.preparo.aproximado  # Segundos, no teste tudo é imediato
+    hora, = relatorio.por_hora
+    assert hora.hora == datetime.now().hour and hora.espera.quantidade == 2
+
+    # O histograma mantido nas gravações é o mesmo que a reconstrução gera
+    mantidos = agregados(db)
+    historico_itens.recalcular_tempos(db.connection())
+    assert agregados(db) == mantidos
+    db.rollback()
+    db.close()
+
+def test_percentis_e_periodo(banco):
+    engine, db = preparar(banco)
+    conn = db.connection()
+    # Produto 1: preparos de 10 a 1000 s em 15/08 e 01/09; produto 2: 60 s em 20/09
+    for dia, produto_id, duracoes in [
+        (datetime(2026, 8, 15, 12), 1, range(10, 510, 10)),
+        (datetime(2026, 9, 1, 12), 1, range(510, 1010, 10)),
+        (datetime(2026, 9, 20, 18), 2, [60] * 10),
+    ]:
+        for indice, segundos in enumerate(duracoes):
+            item_id = produto_id * 10000 + dia.day * 100 + indice
+            historico_itens.registrar_eventos(conn, [(item_id, produto_id, "preparando")], dia)
+            historico_itens.registrar_eventos(conn, [(item_id, produto_id, "pronto")], dia + timedelta(seconds=segundos))
+    db.commit()
+
+    def tempos(data_inicio=None, data_fim=None, limite_exato=historico_itens.LIMITE_PERCENTIL_EXATO):
+        grupos = historico_itens.tempos_por_grupo(db, data_inicio, data_fim, limite_exato)
+        return (
+            {g.chave: g for g in grupos if g.dimensao == "produto" and g.intervalo == "preparo"},
+            {g.chave: g.quantidade for g in grupos if g.dimensao == "hora" and g.intervalo == "preparo"},
+        )
+
+    def perto(valor, esperado):
+        # Limite superior da faixa: até 10% acima do valor exato
+        return esperado <= valor <= esperado * historico_itens.FATOR_FAIXA + 1
+
+    # Poucos intervalos: percentis exatos, a partir dos eventos
+    relatorio = api.relatorio_tempos_preparo(db=db)
+    assert [(g.produto_id, g.preparo.p50, g.preparo.p95, g.preparo.aproximado) for g in relatorio.por_produto] == [
+        (1, 500, 950, False), (2, 60, 60, False)
+    ]
+
+    # Acima do limite: histograma, aproximado
+    produtos, horas = tempos(limite_exato=0)
+    assert produtos[1].quantidade == 100 and produtos[1].aproximado
+    assert perto(produtos[1].p50, 500) and perto(produtos[1].p95, 950)
+    assert produtos[2].quantidade == 10 and perto(produtos[2].p50, 60)
+    assert horas == tempos()[1] == {12: 100, 18: 10}
+
+    # Histograma: mês inteiro (setembro) pelas linhas mensais, pontas pelas diárias.
+    # Eventos: o mesmo recorte pela data de início do intervalo
+    for periodo, quantidade in [
+        ((date(2026, 9, 1), date(2026, 9, 30)), 50),
+        ((date(2026, 8, 15), date(2026, 9, 1)), 100),
+        ((date(2026, 8, 16), date(2026, 9, 30)), 50),
+        ((date(2026, 8, 1), date(2026, 8, 31)), 50),
+        ((date(2026, 8, 16), date(2026, 8, 31)), None),
+        ((None, date(2026, 8, 31)), 50),
+        ((date(2026, 9, 2), None), None),
+    ]:
+        for limite in (0, historico_itens.LIMITE_PERCENTIL_EXATO):
+            produtos, _ = tempos(*periodo, limite_exato=limite)
+            assert (produtos[1].quantidade if 1 in produtos else None) == quantidade, (periodo, limite)
+    setembro = (date(2026, 9, 1), date(2026, 9, 30))
+    assert tempos(*setembro)[0][1].p50 == 750 and perto(tempos(*setembro, limite_exato=0)[0][1].p50, 750)
+    relatorio = api.relatorio_tempos_preparo(*setembro, db=db)
+    assert [g.produto_id for g in relatorio.por_produto] == [1, 2]  # Mais lento primeiro
+    db.close()
+
+def main():
+    return executar_testes("Testes dos tempos de preparo dos itens", [
+        test_eventos_e_relatorio,
+        test_percentis_e_periodo,
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())